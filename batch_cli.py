@@ -0,0 +1,307 @@
+"""
+Non-interactive command line interface.
+
+Runs one analysis on a capture file and writes the result to stdout as a JSON
+document, or as NDJSON with one record per line. Only the capture sections
+and build phases the analysis needs are run, unless a snapshot of the fully
+built fabric is already cached for the capture. A directory or glob pattern
+of captures is ingested in parallel and merged into one fabric before the
+analysis runs. Diagnostics go to stderr.
+
+Usage:
+    python batch_cli.py [--format json|ndjson] [--no-cache] [--workers N] [-v|-q] CAPTURE COMMAND
+
+Commands:
+    analyze isl           Node link and ISL oversubscription analysis
+    check-path SRC DST    Fabric path between two endpoint WWPNs
+    paths                 Fabric paths of every zoned host/target pair
+    hosts                 Per-host, per-array node coverage of every zoned host
+    blast-radius NAME     Hosts zoned to a target port WWPN or an array node
+    sysinfo               Switch, storage node and initiator information
+    connections           Every port and what it is connected to
+
+Exit codes:
+    0  The analysis ran and found no problems
+    1  The analysis found a problem (oversubscription, no path, hosts not fully connected)
+    2  Usage error, unreadable capture or unknown WWPN
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+
+import start
+from port_class import Initiator, Target, Switch
+from snapshot_cache import load_snapshot
+from logging_config import configure_logging
+
+EXIT_OK = 0
+EXIT_FINDINGS = 1
+EXIT_ERROR = 2
+
+# Command -> (capture sections, build host mapping). Every command connects the switch ports,
+# and reads Switch info so switch ports are grouped under their real switches.
+COMMAND_PHASES = {
+    "isl": (("showsys", "switch_info") + start.PORT_SECTIONS, False),
+    "check-path": (("showsys", "showport", "showhost", "showportdev", "switch_info"), False),
+    "paths": (("showsys", "switch_info") + start.PORT_SECTIONS, True),
+    "hosts": (("showsys", "switch_info") + start.PORT_SECTIONS, True),
+    "blast-radius": (("showsys", "switch_info") + start.PORT_SECTIONS, True),
+    "sysinfo": (("showsys", "showport", "showhost", "showportdev") + start.NODE_SECTIONS, False),
+    "connections": (("showsys", "showport", "showhost", "showportdev", "switch_info"), False),
+}
+
+
+class BatchError(Exception):
+    """Raised for problems with the input that make a command impossible to run."""
+
+
+def to_json_data(value):
+    """
+    Convert analysis results into plain JSON data.
+
+    Tuples and sets become lists (sets sorted), port and node objects become
+    dicts of their slot attributes, and non-finite floats become None.
+    """
+    if isinstance(value, dict):
+        return {str(key) if not isinstance(key, tuple) else "|".join(map(str, key)): to_json_data(item)
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_data(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(to_json_data(item) for item in value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    slots = [slot for cls in type(value).__mro__ for slot in getattr(cls, '__slots__', ())]
+    if slots:
+        return {slot: to_json_data(getattr(value, slot, None)) for slot in slots}
+    return str(value)
+
+
+def load_capture(capture_path, command, use_cache=True, workers=None):
+    """
+    Build the part of the fabric model a command needs.
+
+    A cached snapshot of the full model is used when one exists; otherwise
+    only the sections and phases listed in COMMAND_PHASES are run. A
+    directory or glob pattern is ingested in full from all its captures.
+    """
+    if os.path.isdir(capture_path) or any(char in capture_path for char in "*?["):
+        try:
+            ingested = start.load_captures(capture_path, workers)
+        except ValueError as e:
+            raise BatchError(str(e))
+        if not ingested:
+            raise BatchError(f"No capture files found for {capture_path}")
+        return
+
+    if not os.path.isfile(capture_path):
+        raise BatchError(f"Capture file {capture_path} not found")
+
+    if use_cache:
+        model = load_snapshot(capture_path)
+        if model is not None:
+            start.restore_fabric_model(model)
+            return
+
+    sections, needs_host_mapping = COMMAND_PHASES[command]
+    state = start.parse_capture(capture_path, sections=sections)
+    if state["parse_error"]:
+        raise BatchError(f"Could not parse {capture_path}: {state['parse_error']}")
+    start.establish_switch_connections()
+    start.get_fabric_graph()
+    if needs_host_mapping:
+        start.build_host_mapping()
+
+
+def port_record(port):
+    """Return the JSON record of one port."""
+    record = {"wwpn": port.wwpn, "type": port.port_type, "port_id": port.port_id,
+              "speed": port.speed, "speed_gbps": port.speed_gbps, "data_rate": port.data_rate,
+              "connection": port.connection}
+    if isinstance(port, Initiator):
+        record["host_name"] = port.host_name
+    elif isinstance(port, Target):
+        record["array_name"] = port.array_name
+    elif isinstance(port, Switch):
+        record.update(switch_name=port.switch_name, port_index=port.port_index,
+                      switch_port_type=port.switch_port_type)
+    return record
+
+
+def run_isl():
+    """Run the oversubscription analysis."""
+    result = to_json_data(start.check_isl_oversubscription())
+    records = [{"record": "summary", **{key: value for key, value in result.items()
+                                        if key not in ("oversubscribed_isls", "oversubscribed_nodes", "isl_loads")}}]
+    records += [{"record": "oversubscribed_node", **node} for node in result.get("oversubscribed_nodes", [])]
+    records += [{"record": "oversubscribed_isl", **isl} for isl in result.get("oversubscribed_isls", [])]
+    records += [{"record": "isl_load", **isl} for isl in result.get("isl_loads", [])]
+    found = result.get("oversubscribed_nodes") or result.get("oversubscribed_isls")
+    return result, records, EXIT_FINDINGS if found else EXIT_OK
+
+
+def run_check_path(source_wwpn, destination_wwpn):
+    """Find the fabric path between two endpoints."""
+    for wwpn in (source_wwpn, destination_wwpn):
+        port = start.get_port_by_wwpn(wwpn)
+        if port is None:
+            raise BatchError(f"Port {wwpn} not found in the capture")
+        if not isinstance(port, (Initiator, Target)):
+            raise BatchError(f"Port {wwpn} is not an initiator or target")
+
+    graph = start.get_fabric_graph()
+    route = graph.find_route(source_wwpn, destination_wwpn)
+    result = {
+        "source": source_wwpn,
+        "destination": destination_wwpn,
+        "source_switch": graph.switch_of(source_wwpn),
+        "destination_switch": graph.switch_of(destination_wwpn),
+        "reachable": route is not None,
+        "switch_route": route,
+        "route_cost": graph.route_cost(route[0], route[-1]) if route else None,
+        "equal_cost_routes": graph.find_switch_route_dag(route[0], route[-1]) if route else None,
+        "path": graph.expand_route(source_wwpn, destination_wwpn, route) if route else None,
+    }
+    return result, [result], EXIT_OK if route else EXIT_FINDINGS
+
+
+def run_paths():
+    """Find the fabric paths of every zoned host/target pair, one traversal per source switch."""
+    records = [{"record": "path", "source": source, "destination": destination,
+                "reachable": path is not None, "path": path}
+               for source, destination, path in start.find_paths(start.zoned_pairs())]
+    unreachable = sum(1 for record in records if not record["reachable"])
+    result = {"total_pairs": len(records), "unreachable_pairs": unreachable, "paths": records}
+    return result, records, EXIT_FINDINGS if unreachable else EXIT_OK
+
+
+def run_hosts():
+    """Compute the array node coverage table of every zoned host."""
+    rows = start.compute_hosts_connectivity()
+    summaries = start.summarize_hosts_connectivity(rows)
+    partial = sum(1 for summary in summaries.values() if summary["partially_connected"])
+    result = {"total_hosts": len(start.host_mapping), "hosts_not_fully_connected": partial,
+              "hosts": summaries, "coverage": rows}
+    return result, [{"record": "coverage", **row} for row in rows], EXIT_FINDINGS if partial else EXIT_OK
+
+
+def run_blast_radius(name):
+    """List the hosts zoned to a target port or to any port of an array node."""
+    if name in start.node_hosts:
+        kind, hosts = "array_node", start.hosts_zoned_to_node(name)
+    elif isinstance(start.get_port_by_wwpn(name), Target):
+        kind, hosts = "target", start.hosts_zoned_to_target(name)
+    else:
+        raise BatchError(f"{name} is neither a target port nor a zoned array node")
+
+    result = {"name": name, "kind": kind, "host_count": len(hosts), "hosts": hosts}
+    return result, [{"record": "host", "name": name, "host_wwpn": host} for host in hosts], EXIT_OK
+
+
+def run_sysinfo():
+    """Collect switch, storage node, array and initiator information."""
+    result = {
+        "switches": [{"name": name, **to_json_data(node)} for name, node in start.switch_nodes.items()],
+        "storage_nodes": [{"name": name, **to_json_data(node)} for name, node in start.target_nodes.items()],
+        "arrays": [to_json_data(array) for array in start.target_arrays.values()],
+        "initiators": [{"name": name, **to_json_data(node)} for name, node in start.initiator_nodes.items()],
+        "summary": {
+            "switches": len(start.switch_nodes),
+            "storage_nodes": len(start.target_nodes),
+            "initiators": len(start.initiator_nodes),
+            "target_ports": len(start.target_ports),
+            "host_ports": len(start.host_ports),
+            "switch_ports": len(start.switch_ports),
+        },
+    }
+    records = []
+    for kind in ("switches", "storage_nodes", "arrays", "initiators"):
+        records += [{"record": kind.rstrip("s"), **item} for item in result[kind]]
+    records.append({"record": "summary", **result["summary"]})
+    return result, records, EXIT_OK
+
+
+def run_connections():
+    """List every port and its connection."""
+    ports = [port_record(port) for index in (start.host_ports, start.target_ports, start.switch_ports)
+             for port in index.values()]
+    return {"ports": ports}, ports, EXIT_OK
+
+
+def write_output(result, records, output_format, stream=None):
+    """Write a result as one JSON document, or its records as NDJSON."""
+    stream = stream or sys.stdout
+    if output_format == "ndjson":
+        for record in records:
+            stream.write(json.dumps(record) + "\n")
+    else:
+        json.dump(result, stream, indent=2)
+        stream.write("\n")
+
+
+def build_parser():
+    """Return the argument parser of the batch CLI."""
+    parser = argparse.ArgumentParser(description="Run one fabric analysis on a capture and print the result.")
+    parser.add_argument("capture", help="Path to the capture file, or a directory or glob of captures")
+    parser.add_argument("--format", choices=("json", "ndjson"), default="json", help="Output format")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached fabric snapshots")
+    parser.add_argument("--workers", type=int, help="Worker processes for multi-capture ingest")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="More diagnostics on stderr")
+    parser.add_argument("-q", "--quiet", action="count", default=0, help="Fewer diagnostics on stderr")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    analyze = commands.add_parser("analyze", help="Run a fabric analysis")
+    analyze.add_argument("analysis", choices=("isl",), help="Analysis to run")
+    check_path = commands.add_parser("check-path", help="Find the path between two endpoints")
+    check_path.add_argument("source", help="Source endpoint WWPN")
+    check_path.add_argument("destination", help="Destination endpoint WWPN")
+    commands.add_parser("paths", help="Find the paths of every zoned host/target pair")
+    commands.add_parser("hosts", help="Check host connectivity to array nodes")
+    blast_radius = commands.add_parser("blast-radius", help="List the hosts zoned to a target or array node")
+    blast_radius.add_argument("name", help="Target port WWPN or array node name")
+    commands.add_parser("sysinfo", help="Show system information")
+    commands.add_parser("connections", help="List all port connections")
+    return parser
+
+
+def main(argv=None):
+    """Run the batch CLI and return its exit code."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # Warnings only by default, so stderr stays quiet in scripts
+    configure_logging(args.verbose - args.quiet - 1, stream=sys.stderr)
+
+    command = args.analysis if args.command == "analyze" else args.command
+    try:
+        # Keep stdout for the result; anything the analyses print goes to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            load_capture(args.capture, command, use_cache=not args.no_cache, workers=args.workers)
+            if command == "isl":
+                result, records, exit_code = run_isl()
+            elif command == "check-path":
+                result, records, exit_code = run_check_path(args.source, args.destination)
+            elif command == "paths":
+                result, records, exit_code = run_paths()
+            elif command == "hosts":
+                result, records, exit_code = run_hosts()
+            elif command == "blast-radius":
+                result, records, exit_code = run_blast_radius(args.name)
+            elif command == "sysinfo":
+                result, records, exit_code = run_sysinfo()
+            else:
+                result, records, exit_code = run_connections()
+    except BatchError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    write_output(result, records, args.format)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
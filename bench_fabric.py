@@ -0,0 +1,229 @@
+"""
+Benchmark suite for the fabric analysis phases.
+
+Generates synthetic captures of increasing size with generate_fabric and runs
+every analysis phase over them: capture parsing, switch connections and graph
+build, host mapping, endpoint path search, ISL oversubscription analysis and
+the all-hosts connectivity check. For each size and phase it reports wall
+time and peak traced memory, and for each phase the scaling exponent k of
+time ~ ports^k fitted over the sizes.
+
+Every size runs in fresh worker processes, since start.py keeps the fabric
+in module globals. Timing and memory are measured in separate workers so the
+tracemalloc overhead does not distort the timings. Output of the phases
+themselves is discarded.
+
+Usage:
+    python bench_fabric.py [--sizes 1000 10000 100000] [--output bench_results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from generate_fabric import generate_capture
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+PATH_QUERIES = 100
+
+
+def layout_for_ports(port_count):
+    """
+    Return generate_capture arguments for a core-edge fabric of about port_count ports.
+
+    Half of the ports are hosts and targets, the other half the switch ports
+    they log in through plus the E-ports of the ISLs. Every host gets one zone
+    with two targets, so targets make up 2/5 of the devices to keep the target
+    node ratio at 3:1, below the 4:1 at which the ISL analysis stops at the
+    node links.
+    """
+    device_count = max(port_count // 2, 20)
+    target_count = max(device_count * 2 // 5, 4)
+    host_count = device_count - target_count
+    # Targets attach to the core switches and hosts to the edges, about 256
+    # devices per switch, leaving room for one ISL to every switch of the other tier
+    core_switches = max(1, math.ceil(target_count / 256))
+    switch_count = core_switches + max(1, math.ceil(host_count / 256))
+    return {
+        "switch_count": switch_count,
+        "ports_per_switch": 512,
+        "topology": "core-edge",
+        "host_count": host_count,
+        "target_count": target_count,
+        "zone_count": host_count,
+        "core_switches": core_switches,
+    }
+
+
+def run_phases(capture_path, measure_memory):
+    """
+    Run every phase on a capture in this process.
+
+    Returns:
+        dict: phase -> {"seconds": wall time, "peak_bytes": peak traced memory or None}
+    """
+    import start
+
+    def sample_pairs():
+        pairs = []
+        for zone in start.all_zones:
+            if len(zone) >= 2:
+                pairs.append((zone[0], zone[1]))
+            if len(pairs) == PATH_QUERIES:
+                break
+        return pairs
+
+    def find_paths():
+        for source, destination in sample_pairs():
+            start.find_path_between_endpoints(source, destination)
+
+    def connect():
+        start.establish_switch_connections()
+        start.connect_switches_internally()
+
+    phases = [
+        ("parse", lambda: start.parse_capture(capture_path)),
+        ("connect_switches", connect),
+        ("host_mapping", start.build_host_mapping),
+        ("find_path", find_paths),
+        ("isl_analysis", start.check_isl_oversubscription),
+        ("hosts_connectivity", start.check_all_hosts_connectivity),
+    ]
+
+    results = {}
+    if measure_memory:
+        tracemalloc.start()
+    for name, phase in phases:
+        if measure_memory:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        begin = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            phase()
+        elapsed = time.perf_counter() - begin
+        peak = None
+        if measure_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            peak -= base
+        results[name] = {"seconds": elapsed, "peak_bytes": peak}
+    if measure_memory:
+        tracemalloc.stop()
+    return results
+
+
+def run_worker(capture_path, measure_memory):
+    """Run the phases of one capture in a fresh interpreter and return its results."""
+    command = [sys.executable, os.path.abspath(__file__), "--worker", capture_path]
+    if measure_memory:
+        command.append("--memory")
+    output = subprocess.run(command, check=True, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def scaling_exponent(points):
+    """
+    Fit time ~ ports^k by least squares on log-log points.
+
+    Args:
+        points (list): (port count, seconds) pairs
+
+    Returns:
+        float: The exponent k, or None with fewer than two usable points
+    """
+    points = [(math.log(ports), math.log(seconds)) for ports, seconds in points if seconds > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def git_revision():
+    """Return the current git commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], check=True, capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, output_path, measure_memory=True):
+    """Benchmark every size, print a report and write the results as JSON."""
+    results = {
+        "commit": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": [],
+        "scaling": {},
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in sizes:
+            capture_path = os.path.join(temp_dir, f"fabric_{size}.txt")
+            layout = generate_capture(capture_path, **layout_for_ports(size))
+            print(f"\n=== {size} ports requested: {layout.port_count} ports, {layout.switch_count} switches, "
+                  f"{len(layout.isls)} ISLs, {layout.zone_count} zones ===")
+
+            phases = run_worker(capture_path, measure_memory=False)
+            if measure_memory:
+                for name, memory in run_worker(capture_path, measure_memory=True).items():
+                    phases[name]["peak_bytes"] = memory["peak_bytes"]
+
+            for name, phase in phases.items():
+                peak = phase["peak_bytes"]
+                memory = f"{peak / 2**20:9.1f} MiB" if peak is not None else "        n/a"
+                print(f"  {name:<20} {phase['seconds']:10.3f} s  {memory}")
+
+            results["sizes"].append({
+                "requested_ports": size,
+                "ports": layout.port_count,
+                "switches": layout.switch_count,
+                "isls": len(layout.isls),
+                "zones": layout.zone_count,
+                "phases": phases,
+            })
+
+    print("\n=== Scaling exponent (time ~ ports^k) ===")
+    for name in results["sizes"][0]["phases"] if results["sizes"] else []:
+        exponent = scaling_exponent([(size["ports"], size["phases"][name]["seconds"])
+                                     for size in results["sizes"]])
+        results["scaling"][name] = exponent
+        print(f"  {name:<20} {'n/a' if exponent is None else f'{exponent:.2f}'}")
+
+    with open(output_path, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults written to {output_path}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fabric analysis phases.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Fabric sizes in ports")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory measurement")
+    parser.add_argument("--worker", metavar="CAPTURE", help=argparse.SUPPRESS)
+    parser.add_argument("--memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_phases(args.worker, args.memory)))
+        return
+
+    run(args.sizes, args.output, measure_memory=not args.no_memory)
+
+
+if __name__ == "__main__":
+    main()
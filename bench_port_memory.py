@@ -0,0 +1,104 @@
+"""
+Memory benchmark for the port classes.
+
+Creates the same set of initiator, target and switch ports twice: once with
+plain __dict__-based classes laid out like the original port classes, and once
+with the slotted classes from port_class. Reports the bytes used per port for
+each. WWPN strings are created before measuring so only the port objects are
+counted.
+
+Usage:
+    python bench_port_memory.py [port_count]
+"""
+import sys
+import tracemalloc
+
+from port_class import Initiator, Target, Switch
+
+
+class DictPort:
+    """Port with a per-instance __dict__, as the port classes were before slots."""
+
+    def __init__(self, wwpn=None, port_id=None, wwnn=None, port_type=None,
+                 if_switch_port=None, speed=None, connection=None):
+        self.wwpn = wwpn
+        self.port_id = port_id
+        self.wwnn = wwnn
+        self.port_type = port_type
+        self.speed = speed
+        self.connection = connection
+
+
+class DictInitiator(DictPort):
+    def __init__(self, wwpn=None, port_id=None, wwnn=None, speed=None,
+                 connection=None, host_name=None):
+        super().__init__(wwpn, port_id, wwnn, 'initiator', None, speed, connection)
+        self.host_name = host_name
+
+
+class DictTarget(DictPort):
+    def __init__(self, wwpn=None, port_id=None, wwnn=None, speed=None,
+                 connection=None, array_name=None):
+        super().__init__(wwpn, port_id, wwnn, 'target', None, speed, connection)
+        self.array_name = array_name
+
+
+class DictSwitch(DictPort):
+    def __init__(self, wwpn=None, port_id=None, wwnn=None, speed=None,
+                 connection=None, switch_name=None, port_index=None, switch_port_type=None):
+        super().__init__(wwpn, port_id, wwnn, 'switch', None, speed, connection)
+        self.switch_name = switch_name
+        self.port_index = port_index
+        self.switch_port_type = switch_port_type
+        self.alt_connections = []  # The parser attached this to every first-seen switch port
+
+
+def make_wwpns(count):
+    """Generate unique 16-character hex WWPNs."""
+    return [f"{0x2000000000000000 + i:016X}" for i in range(count)]
+
+
+def measure(build):
+    """Return (bytes still allocated, objects) after running build()."""
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, objects
+
+
+def build_ports(wwpns, initiator_cls, target_cls, switch_cls):
+    """Create one third of the WWPNs as each port type."""
+    ports = []
+    third = len(wwpns) // 3
+    for i, wwpn in enumerate(wwpns):
+        if i < third:
+            ports.append(initiator_cls(wwpn=wwpn, port_id="N/A", wwnn="N/A", speed="32Gbps",
+                                       host_name="Host"))
+        elif i < 2 * third:
+            ports.append(target_cls(wwpn=wwpn, port_id="0:1:1", wwnn="N/A", speed="32Gbps",
+                                    array_name="array-node0"))
+        else:
+            ports.append(switch_cls(wwpn=wwpn, port_id="1", wwnn="N/A", speed="32Gbps",
+                                    connection=wwpn, switch_name="Switch", port_index="1",
+                                    switch_port_type="F-Port"))
+    return ports
+
+
+def run(port_count):
+    """Run the benchmark and print bytes per port before and after."""
+    wwpns = make_wwpns(port_count)
+
+    before, ports = measure(lambda: build_ports(wwpns, DictInitiator, DictTarget, DictSwitch))
+    del ports
+    after, ports = measure(lambda: build_ports(wwpns, Initiator, Target, Switch))
+    del ports
+
+    print(f"Ports created:            {port_count}")
+    print(f"__dict__ classes (before): {before / port_count:8.1f} bytes/port  ({before / 2**20:.1f} MiB)")
+    print(f"__slots__ classes (after): {after / port_count:8.1f} bytes/port  ({after / 2**20:.1f} MiB)")
+    print(f"Reduction:                 {(1 - after / before) * 100:8.1f}%")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 300000)
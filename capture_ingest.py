@@ -0,0 +1,187 @@
+"""
+Parallel ingest of several captures into one fabric model.
+
+Each array capture only shows the fabric as that array sees it, so a fabric
+is described by one capture per array. Captures are parsed independently in
+worker processes; every worker returns compact records (plain tuples and
+lists) and the parent merges them, keeping one port per WWPN. Switch ports
+reported by several arrays keep the union of their logins in one edge table,
+and zones reported by several arrays are kept once.
+"""
+import glob
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from port_class import Port, Initiator, Target, Switch, EdgeTable, EDGE_PHYSICAL, EDGE_LOGIN
+from instrumentation import stats
+
+log = logging.getLogger(__name__)
+
+# Captures picked up when a directory is given
+CAPTURE_PATTERN = "*.txt"
+
+PORT_CLASSES = {cls.__name__: cls for cls in (Port, Initiator, Target, Switch)}
+
+
+def _slots_of(cls):
+    """Return all slot names of a port class, base class slots first."""
+    return tuple(slot for klass in reversed(cls.__mro__) for slot in getattr(klass, '__slots__', ()))
+
+PORT_SLOTS = {name: _slots_of(cls) for name, cls in PORT_CLASSES.items()}
+
+
+def capture_files(source):
+    """
+    Return the capture files named by a file, directory or glob pattern.
+
+    Args:
+        source (str): A capture file, a directory of CAPTURE_PATTERN files, or a glob pattern
+
+    Returns:
+        list: Sorted capture file paths
+    """
+    if os.path.isdir(source):
+        source = os.path.join(source, CAPTURE_PATTERN)
+    elif os.path.isfile(source):
+        return [source]
+    return sorted(path for path in glob.glob(source) if os.path.isfile(path))
+
+
+def port_record(port):
+    """Return a port as a (class name, slot values) record."""
+    name = type(port).__name__
+    return name, tuple(getattr(port, slot, None) for slot in PORT_SLOTS[name])
+
+
+def port_from_record(record):
+    """Rebuild a port object from a record made by port_record()."""
+    name, values = record
+    cls = PORT_CLASSES[name]
+    port = cls.__new__(cls)
+    for slot, value in zip(PORT_SLOTS[name], values):
+        setattr(port, slot, value)
+    return port
+
+
+def parse_capture_records(file_path):
+    """
+    Parse one capture and return its content as compact records.
+
+    Runs in a worker process. The worker's fabric model is reset first,
+    since a worker parses several captures in turn. A capture that fails
+    to parse raises ValueError, which the pool passes on to the caller.
+
+    Returns:
+        dict: "ports" (port records), "edges" (physical and login edge records),
+              "zones" ((name, WWPN list) pairs) and the
+              "target_arrays", "target_nodes", "switch_nodes" and "initiator_nodes" tables
+    """
+    import start
+
+    start.reset_fabric_model()
+    state = start.parse_capture(file_path)
+    # A partly parsed capture would silently drop ports from the merged model
+    if state["parse_error"]:
+        raise ValueError(f"Could not parse {file_path}: {state['parse_error']}")
+    return {
+        "capture": file_path,
+        "ports": [port_record(port) for port in state["ports"]],
+        # Switch-internal edges are rebuilt from the merged ports
+        "edges": start.fabric_edges.records((EDGE_PHYSICAL, EDGE_LOGIN)),
+        "zones": list(zip(start.zone_db.names, start.zone_db.members)),
+        "target_arrays": dict(start.target_arrays),
+        "target_nodes": dict(start.target_nodes),
+        "switch_nodes": dict(start.switch_nodes),
+        "initiator_nodes": dict(start.initiator_nodes),
+    }
+
+
+def merge_capture_records(results):
+    """
+    Merge the records of several captures.
+
+    The first capture that reports a WWPN provides its port. Edges of all
+    captures go into one edge table, so a switch port has the union of the
+    logins every capture saw; a physical link reported for a port that
+    already has one becomes a login. Identical zones are kept once, and node
+    tables keep the first entry of each name.
+
+    Args:
+        results (iterable): Records returned by parse_capture_records()
+
+    Returns:
+        dict: "captures" (file paths), "ports" (port objects), "edges" (EdgeTable),
+              "zones" and the node tables
+    """
+    ports = {}
+    edges = EdgeTable()
+    zones = []
+    seen_zones = set()
+    captures = []
+    merged = {"target_arrays": {}, "target_nodes": {}, "switch_nodes": {}, "initiator_nodes": {}}
+    duplicates = 0
+
+    for result in results:
+        captures.append(result["capture"])
+        for record in result["ports"]:
+            port = port_from_record(record)
+            key = port.wwpn.upper()
+            existing = ports.get(key)
+            if existing is None:
+                ports[key] = port
+                continue
+            duplicates += 1
+            if isinstance(existing, Switch) and isinstance(port, Switch) and existing.connection is None:
+                existing.connection = port.connection
+        for wwpn, other_wwpn, kind in result["edges"]:
+            edges.add(wwpn, other_wwpn, kind)
+
+        for name, members in result["zones"]:
+            member_set = frozenset(wwpn.upper() for wwpn in members)
+            if member_set not in seen_zones:
+                seen_zones.add(member_set)
+                zones.append((name, members))
+
+        for name, table in merged.items():
+            for key, value in result[name].items():
+                table.setdefault(key, value)
+
+    log.info("Merged %d ports (%d reported by more than one capture) and %d zones",
+             len(ports), duplicates, len(zones))
+    stats.count("duplicate_ports_merged", duplicates)
+    merged.update(captures=captures, ports=list(ports.values()), edges=edges, zones=zones)
+    return merged
+
+
+@stats.timed()
+def ingest_captures(source, workers=None):
+    """
+    Parse every capture named by a file, directory or glob and merge them.
+
+    Captures are parsed in a pool of worker processes; a single capture, or
+    workers=1, is parsed in this process instead.
+
+    Args:
+        source (str): A capture file, a directory of captures, or a glob pattern
+        workers (int): Number of worker processes, defaults to the CPU count
+
+    Returns:
+        dict: Merged records from merge_capture_records(), or None if no capture matched
+    """
+    files = capture_files(source)
+    if not files:
+        log.error("No capture files found for %s", source)
+        return None
+
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    log.info("Ingesting %d captures with %d worker processes", len(files), workers)
+    if workers == 1:
+        results = [parse_capture_records(file_path) for file_path in files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Results come back in file order, so merging is deterministic
+            results = list(executor.map(parse_capture_records, files))
+
+    stats.count("captures_ingested", len(results))
+    return merge_capture_records(results)
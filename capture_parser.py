@@ -0,0 +1,92 @@
+# Version of the fabric model built from a capture. Bump it whenever parsing
+# or model building changes, so cached snapshots of older models are ignored.
+PARSER_VERSION = 8
+
+
+class CaptureParser:
+    """
+    Streaming parser for array capture files.
+
+    The capture is read once, line by line, and every line is sent to the
+    handler registered for the section it belongs to. Section boundaries are
+    detected from the header lines written by the capture script.
+    """
+
+    # (section, predicate, header_is_data) in the order they are checked.
+    # header_is_data marks sections whose header line also carries a value.
+    SECTION_MARKERS = [
+        ("showsys", lambda line: "showsys output:" in line, False),
+        ("showport", lambda line: "showport output:" in line, False),
+        ("showhost", lambda line: "showhost output:" in line, False),
+        ("showportdev", lambda line: "showportdev fcfabric" in line and "grep \"Online\"" in line, False),
+        ("zoning", lambda line: "zoning info:" in line, False),
+        ("node_info", lambda line: "Node information variables:" in line, False),
+        ("host_info", lambda line: line.startswith("host_info"), True),
+        ("switch_info", lambda line: "Switch info:" in line, False),
+    ]
+
+    def __init__(self):
+        """Initialize a CaptureParser instance with no section handlers."""
+        self.handlers = {}   # section -> (line handler, finish handler)
+        self.state = {}      # Shared state handlers can use across sections
+
+    def register(self, section, handler, finish=None):
+        """
+        Register the handler for a section.
+
+        Args:
+            section (str): Section name from SECTION_MARKERS
+            handler (callable): Called as handler(line, state) for each line of the section
+            finish (callable): Optional, called as finish(state) when the section ends
+        """
+        self.handlers[section] = (handler, finish)
+
+    def detect_section(self, line):
+        """
+        Return the section a header line starts.
+
+        Returns:
+            tuple: (section, header_is_data), or (None, False) if the line is not a header
+        """
+        for section, predicate, header_is_data in self.SECTION_MARKERS:
+            if predicate(line):
+                return section, header_is_data
+        return None, False
+
+    def _finish_section(self, section):
+        """Call the finish handler of a section, if one is registered."""
+        if section in self.handlers and self.handlers[section][1]:
+            self.handlers[section][1](self.state)
+
+    def parse(self, file_path):
+        """
+        Parse the capture file in a single pass.
+
+        Lines belonging to sections without a registered handler are skipped.
+
+        Args:
+            file_path (str): Path to the capture file
+
+        Returns:
+            dict: The shared handler state
+        """
+        current_section = None
+
+        with open(file_path, 'r') as file:
+            for raw_line in file:
+                line = raw_line.strip()
+                if not line:
+                    continue
+
+                section, header_is_data = self.detect_section(line)
+                if section:
+                    self._finish_section(current_section)
+                    current_section = section
+                    if not header_is_data:
+                        continue
+
+                if current_section in self.handlers:
+                    self.handlers[current_section][0](line, self.state)
+
+        self._finish_section(current_section)
+        return self.state
@@ -0,0 +1,710 @@
+from array import array
+from heapq import heappush, heappop
+import logging
+
+from instrumentation import stats
+import port_class
+from port_class import Initiator, Target, Switch, get_port, wwpn_to_int, initiator_index, target_index, switch_index
+
+log = logging.getLogger(__name__)
+
+# FSPF cost of a 1 Gbps link. As with the FC-SW link cost at administrative
+# factor 1, faster links cost proportionally less: 16 Gbps 62, 32 Gbps 31
+FSPF_REFERENCE_COST = 1000
+
+
+def fspf_cost(speed_gbps):
+    """Return the FSPF link cost of an ISL running at a speed in Gbps; links of unknown speed cost like 1 Gbps."""
+    if not speed_gbps:
+        return FSPF_REFERENCE_COST
+    return max(1, FSPF_REFERENCE_COST // speed_gbps)
+
+
+def _is_e_port(switch_port, connected_port):
+    """Check if a switch port is an E-port (one end of an ISL)."""
+    port_type = switch_port.switch_port_type.upper() if switch_port.switch_port_type else ""
+    if "E-PORT" in port_type or "E PORT" in port_type:
+        return True
+    if "F-PORT" in port_type:
+        return False
+    # For ports without explicit type, check the connected switch name
+    return isinstance(connected_port, Switch) and connected_port.switch_name != switch_port.switch_name
+
+
+def bidirectional_search(neighbors_of, source, destination):
+    """
+    Find a shortest route between two vertices with bidirectional BFS.
+
+    Searches run from both ends one BFS level at a time, always expanding the
+    smaller frontier. Each side only keeps a parent pointer and a depth per
+    vertex it reached, and the route is rebuilt from the parent pointers once
+    the two searches meet, so no path lists are built while searching.
+
+    Args:
+        neighbors_of (callable): Returns the neighbours of a vertex; edges are undirected
+        source: Starting vertex
+        destination: Ending vertex
+
+    Returns:
+        list: Vertices from source to destination, or None if they are not connected
+    """
+    if source == destination:
+        return [source]
+
+    parents = ({source: source}, {destination: destination})
+    depths = ({source: 0}, {destination: 0})
+    frontiers = [[source], [destination]]
+    expanded = 0
+    meeting = None
+    while frontiers[0] and frontiers[1] and meeting is None:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own_parents, own_depths, other_depths = parents[side], depths[side], depths[1 - side]
+        best_length = None
+        next_frontier = []
+        for vertex in frontiers[side]:
+            expanded += 1
+            depth = own_depths[vertex] + 1
+            for neighbor in neighbors_of(vertex):
+                # Finish the level so the shortest of the meetings found in it is kept
+                other_depth = other_depths.get(neighbor)
+                if other_depth is not None and (best_length is None or depth + other_depth < best_length):
+                    best_length = depth + other_depth
+                    meeting = (vertex, neighbor) if side == 0 else (neighbor, vertex)
+                if neighbor not in own_parents:
+                    own_parents[neighbor] = vertex
+                    own_depths[neighbor] = depth
+                    next_frontier.append(neighbor)
+        frontiers[side] = next_frontier
+
+    stats.count("bfs_vertices_expanded", expanded)
+    if meeting is None:
+        return None
+
+    # meeting is an edge from the source side to the destination side
+    route = []
+    vertex = meeting[0]
+    while True:
+        route.append(vertex)
+        if vertex == source:
+            break
+        vertex = parents[0][vertex]
+    route.reverse()
+    vertex = meeting[1]
+    while True:
+        route.append(vertex)
+        if vertex == destination:
+            break
+        vertex = parents[1][vertex]
+    return route
+
+
+class RouteDag:
+    """
+    Equal-cost shortest route DAG of one source switch vertex.
+
+    distances[v] is the FSPF cost of the cheapest route from the source to
+    vertex v (-1 if v is unreached) and order lists the reached vertices by
+    increasing cost. The DAG edges into v are the CSR hub edges
+    preds[pred_offsets[v]:pred_offsets[v + 1]], each one leading from v back
+    to a neighbour that is the previous hop of a cheapest route to v.
+    """
+
+    __slots__ = ('source', 'distances', 'order', 'pred_offsets', 'preds')
+
+    def __init__(self, source, distances, order, pred_offsets, preds):
+        self.source = source
+        self.distances = distances
+        self.order = order
+        self.pred_offsets = pred_offsets
+        self.preds = preds
+
+
+class FabricGraph:
+    """
+    Represents the traversable graph of a Fibre Channel SAN fabric.
+
+    The graph has two levels: every switch is a single hub vertex and ISLs are
+    edges between hubs, while devices are attached to the F-port they log in
+    through. Path searches run on the switch level only, and the port-level
+    hop list is rebuilt from the hub route when a caller needs it.
+
+    Switches are numbered with dense vertex IDs and the hub adjacency is kept
+    in CSR form (an offset array and a neighbour array). WWPNs are parsed into
+    integers once when the graph is built, so traversal, component labelling
+    and route lookups only touch integer arrays.
+
+    Routes follow FSPF: every ISL costs fspf_cost() of its speed, a hub edge
+    costs as much as its cheapest ISL, and traffic spreads over every
+    equal-cost route and every cheapest parallel ISL (ECMP).
+    """
+
+    def __init__(self):
+        """Initialize an empty FabricGraph instance."""
+        self.switch_names = []       # vertex ID -> switch_name
+        self.switch_ids = {}         # switch_name -> vertex ID
+        self.switch_groups = {}      # switch_name -> list of switch port WWPNs
+        self.f_ports = {}            # switch_name -> list of F-port WWPNs
+        self.e_ports = {}            # switch_name -> list of E-port WWPNs
+        self.port_vertex = {}        # integer WWPN of a switch port or attached device -> vertex ID
+        self.device_ports = {}       # integer device WWPN -> integer WWPN of its F-port
+
+        # CSR hub adjacency: the neighbours of vertex v are neighbors[offsets[v]:offsets[v + 1]]
+        self.offsets = array('l', [0])
+        self.neighbors = array('l')
+        # ISLs behind CSR edge e are isl_ids[isl_offsets[e]:isl_offsets[e + 1]]
+        self.isl_offsets = array('l', [0])
+        self.isl_ids = array('l')
+        # ISL i joins port isl_ports[2i] on vertex isl_switches[2i] to isl_ports[2i + 1] on isl_switches[2i + 1]
+        self.isl_ports = array('Q')
+        self.isl_switches = array('l')
+        self.isl_pairs = []          # (e_port_wwpn, remote_e_port_wwpn), one entry per ISL
+        self.isl_costs = array('l')  # ISL ID -> FSPF cost
+        self.edge_costs = array('l')  # CSR edge -> FSPF cost of its cheapest ISL
+        self.uniform_costs = True    # All hub edges cost the same, so the fewest hops are also the cheapest
+
+        self.components = array('l')  # vertex ID -> connected component label
+        self.routing_table = {}      # source vertex ID -> RouteDag, built lazily per source
+        self.topology_version = None
+        self._isl_signature = None   # Switches and ISLs the routing table was computed for
+
+    def __str__(self):
+        """String representation of the fabric graph."""
+        return (f"FabricGraph(switches={len(self.switch_names)}, devices={len(self.device_ports)}, "
+                f"isls={len(self.isl_pairs)})")
+
+    def is_stale(self):
+        """Check if the topology has changed since the graph was last built."""
+        return self.topology_version != port_class.topology_version
+
+    @stats.timed("build_fabric_graph")
+    def build(self):
+        """
+        Build the two-level graph from the current port indexes.
+
+        Each switch port is assigned to its switch hub and classified as an
+        F-port or E-port, devices are attached to their F-port, and every ISL
+        adds one edge between the two switch hubs it joins.
+        """
+        self.switch_names = []
+        self.switch_ids = {}
+        self.switch_groups = {}
+        self.f_ports = {}
+        self.e_ports = {}
+        self.port_vertex = {}
+        self.device_ports = {}
+        self.isl_ports = array('Q')
+        self.isl_switches = array('l')
+        self.isl_pairs = []
+        self.isl_costs = array('l')
+
+        # Assign every switch port to its switch hub
+        for wwpn, switch_port in switch_index.items():
+            switch_name = switch_port.switch_name
+            vertex = self.switch_ids.get(switch_name)
+            if vertex is None:
+                vertex = len(self.switch_names)
+                self.switch_ids[switch_name] = vertex
+                self.switch_names.append(switch_name)
+                self.switch_groups[switch_name] = []
+                self.f_ports[switch_name] = []
+                self.e_ports[switch_name] = []
+            self.switch_groups[switch_name].append(wwpn)
+            self.port_vertex[wwpn_to_int(wwpn)] = vertex
+
+        # Classify switch ports and collect the ISLs between hubs
+        seen_isls = set()
+        for wwpn, switch_port in switch_index.items():
+            if not switch_port.is_connected():
+                continue
+            switch_name = switch_port.switch_name
+            connected_port = get_port(switch_port.connection)
+
+            if not _is_e_port(switch_port, connected_port):
+                self.f_ports[switch_name].append(wwpn)
+                if isinstance(connected_port, (Initiator, Target)):
+                    self.device_ports.setdefault(wwpn_to_int(connected_port.wwpn), wwpn_to_int(wwpn))
+                continue
+
+            self.e_ports[switch_name].append(wwpn)
+            local_key = wwpn_to_int(wwpn)
+            remote_key = wwpn_to_int(switch_port.connection)
+            local_vertex = self.port_vertex[local_key]
+            remote_vertex = self.port_vertex.get(remote_key)
+            if remote_vertex is None or remote_vertex == local_vertex:
+                continue
+
+            isl_key = (min(local_key, remote_key), max(local_key, remote_key))
+            if isl_key in seen_isls:
+                continue
+            seen_isls.add(isl_key)
+            self.isl_ports.extend((local_key, remote_key))
+            self.isl_switches.extend((local_vertex, remote_vertex))
+            self.isl_pairs.append((wwpn, connected_port.wwpn))
+            # An ISL runs at the speed of its slower end
+            self.isl_costs.append(fspf_cost(min(switch_port.speed_gbps, connected_port.speed_gbps)))
+
+        # Devices record the switch port they are logged into
+        for index_dict in [initiator_index, target_index]:
+            for wwpn, port in index_dict.items():
+                if port.is_connected():
+                    switch_key = wwpn_to_int(port.connection)
+                    if switch_key in self.port_vertex:
+                        self.device_ports[wwpn_to_int(wwpn)] = switch_key
+        for device_key, switch_key in self.device_ports.items():
+            self.port_vertex[device_key] = self.port_vertex[switch_key]
+
+        self._build_adjacency()
+        self._label_components()
+        # Edges of the two-level graph: one per ISL and one per device attachment
+        stats.count("edges_created", len(self.isl_pairs) + len(self.device_ports))
+
+        log.info("Built fabric graph: %d switches, %d attached devices, %d ISLs",
+                 len(self.switch_names), len(self.device_ports), len(self.isl_pairs))
+
+        # Switch routes only depend on the switches, ISLs and their costs, so device changes keep the table
+        isl_signature = (tuple(self.switch_names),
+                         frozenset((min(local_key, remote_key), max(local_key, remote_key), cost)
+                                   for local_key, remote_key, cost
+                                   in zip(self.isl_ports[::2], self.isl_ports[1::2], self.isl_costs)))
+        if isl_signature != self._isl_signature:
+            self.invalidate_routes()
+            self._isl_signature = isl_signature
+
+        self.topology_version = port_class.topology_version
+        return self
+
+    def _build_adjacency(self):
+        """Build the CSR hub adjacency and the per-edge ISL lists from the ISL arrays."""
+        # Group ISL IDs by directed (vertex, neighbour) edge
+        edges = [{} for _ in self.switch_names]
+        for isl in range(len(self.isl_pairs)):
+            vertex1 = self.isl_switches[2 * isl]
+            vertex2 = self.isl_switches[2 * isl + 1]
+            edges[vertex1].setdefault(vertex2, []).append(isl)
+            edges[vertex2].setdefault(vertex1, []).append(isl)
+
+        self.offsets = array('l', [0])
+        self.neighbors = array('l')
+        self.isl_offsets = array('l', [0])
+        self.isl_ids = array('l')
+        self.edge_costs = array('l')
+        for vertex_edges in edges:
+            for neighbor, isls in vertex_edges.items():
+                self.neighbors.append(neighbor)
+                self.isl_ids.extend(isls)
+                self.isl_offsets.append(len(self.isl_ids))
+                self.edge_costs.append(min(self.isl_costs[isl] for isl in isls))
+            self.offsets.append(len(self.neighbors))
+        self.uniform_costs = len(set(self.edge_costs)) <= 1
+
+    def _label_components(self):
+        """Label every switch vertex with the lowest vertex ID of its connected component."""
+        offsets, neighbors = self.offsets, self.neighbors
+        components = array('l', [-1]) * len(self.switch_names)
+        for start in range(len(self.switch_names)):
+            if components[start] != -1:
+                continue
+            components[start] = start
+            stack = [start]
+            while stack:
+                vertex = stack.pop()
+                for edge in range(offsets[vertex], offsets[vertex + 1]):
+                    neighbor = neighbors[edge]
+                    if components[neighbor] == -1:
+                        components[neighbor] = start
+                        stack.append(neighbor)
+        stats.count("bfs_vertices_expanded", len(self.switch_names))
+        self.components = components
+
+    def vertex_of(self, wwpn):
+        """Return the switch vertex ID of a switch port or attached device, or None."""
+        return self.port_vertex.get(wwpn_to_int(wwpn))
+
+    def switch_of(self, wwpn):
+        """
+        Return the switch hub a port belongs to.
+
+        Args:
+            wwpn (str): WWPN of a switch port or an attached device
+
+        Returns:
+            str: Switch name, or None if the port is not part of the fabric
+        """
+        vertex = self.vertex_of(wwpn)
+        return None if vertex is None else self.switch_names[vertex]
+
+    def component_of(self, wwpn):
+        """
+        Return the connected component a port belongs to.
+
+        Two ports have a fabric path between them exactly when their
+        components are equal, which needs no routing table.
+
+        Returns:
+            int: Component label, or None if the port is not part of the fabric
+        """
+        vertex = self.vertex_of(wwpn)
+        return None if vertex is None else self.components[vertex]
+
+    def attached_port(self, wwpn):
+        """Return the WWPN of the F-port a device is logged into, or None."""
+        switch_key = self.device_ports.get(wwpn_to_int(wwpn))
+        return None if switch_key is None else get_port(switch_key).wwpn
+
+    def isls_between(self, vertex1, vertex2, cheapest=False):
+        """
+        Return the ISLs joining two adjacent switch vertices.
+
+        Args:
+            vertex1 (int): Vertex ID of the local switch
+            vertex2 (int): Vertex ID of the remote switch
+            cheapest (bool): Only return the ISLs with the lowest FSPF cost, the ones FSPF routes over
+
+        Returns:
+            list: (local E-port, remote E-port) integer WWPNs, oriented from vertex1 to vertex2
+        """
+        offsets, neighbors = self.offsets, self.neighbors
+        for edge in range(offsets[vertex1], offsets[vertex1 + 1]):
+            if neighbors[edge] != vertex2:
+                continue
+            isls = []
+            for isl in self.isl_ids[self.isl_offsets[edge]:self.isl_offsets[edge + 1]]:
+                if cheapest and self.isl_costs[isl] != self.edge_costs[edge]:
+                    continue
+                if self.isl_switches[2 * isl] == vertex1:
+                    isls.append((self.isl_ports[2 * isl], self.isl_ports[2 * isl + 1]))
+                else:
+                    isls.append((self.isl_ports[2 * isl + 1], self.isl_ports[2 * isl]))
+            return isls
+        return []
+
+    def isl_loads(self, demands):
+        """
+        Charge switch-to-switch demand to the ISLs the way FSPF spreads it.
+
+        Each demand follows the equal-cost route DAG from its source to its
+        destination. At every switch on the way, the demand that reaches it is
+        split evenly over all its cheapest ISLs towards the destination, across
+        equal-cost next hops and parallel ISLs alike, and added in the
+        direction of travel. Route DAGs are computed once per source switch.
+
+        Args:
+            demands (dict): {(source switch name, destination switch name): demand in Gbps}
+
+        Returns:
+            tuple: (loads, unrouted). loads holds the load of ISL i from
+                   isl_switches[2i] to isl_switches[2i + 1] at index 2i and in the
+                   reverse direction at 2i + 1; unrouted lists the
+                   ((source, destination), demand) entries without a route
+        """
+        isl_offsets, isl_ids, isl_switches = self.isl_offsets, self.isl_ids, self.isl_switches
+        isl_costs, edge_costs = self.isl_costs, self.edge_costs
+
+        loads = array('d', [0.0]) * (2 * len(self.isl_pairs))
+        unrouted = []
+        charged = 0
+        for (source_switch, destination_switch), demand in demands.items():
+            source = self.switch_ids.get(source_switch)
+            destination = self.switch_ids.get(destination_switch)
+            if source is None or destination is None or self.components[source] != self.components[destination]:
+                unrouted.append(((source_switch, destination_switch), demand))
+                continue
+
+            dag = self.route_dag(source)
+            next_hops = self._equal_cost_hops(dag, destination)
+            flow = {source: demand}
+            for vertex in sorted(next_hops, key=dag.distances.__getitem__):
+                isls = [isl for _, edge in next_hops[vertex]
+                        for isl in isl_ids[isl_offsets[edge]:isl_offsets[edge + 1]]
+                        if isl_costs[isl] == edge_costs[edge]]
+                share = flow[vertex] / len(isls)
+                for isl in isls:
+                    forward = isl_switches[2 * isl] == vertex
+                    loads[2 * isl + (not forward)] += share
+                    next_vertex = isl_switches[2 * isl + forward]
+                    flow[next_vertex] = flow.get(next_vertex, 0.0) + share
+                charged += len(isls)
+
+        stats.count("isl_hops_charged", charged)
+        return loads, unrouted
+
+    def invalidate_routes(self):
+        """Discard the cached route DAGs so they are recomputed on next use."""
+        self.routing_table = {}
+
+    def route_dag(self, source):
+        """
+        Return the equal-cost route DAG of a source switch vertex.
+
+        The DAG is computed with Dijkstra over the FSPF hub edge costs on first
+        use and cached per source until the switches or ISLs change.
+
+        Returns:
+            RouteDag: Cheapest route costs and predecessor edges from the source
+        """
+        dag = self.routing_table.get(source)
+        if dag is not None:
+            return dag
+
+        offsets, neighbors, edge_costs = self.offsets, self.neighbors, self.edge_costs
+        distances = array('q', [-1]) * len(self.switch_names)
+        distances[source] = 0
+        order = array('l')
+        heap = [(0, source)]
+        while heap:
+            distance, vertex = heappop(heap)
+            if distance > distances[vertex]:
+                continue
+            order.append(vertex)
+            for edge in range(offsets[vertex], offsets[vertex + 1]):
+                neighbor = neighbors[edge]
+                neighbor_distance = distance + edge_costs[edge]
+                if distances[neighbor] == -1 or neighbor_distance < distances[neighbor]:
+                    distances[neighbor] = neighbor_distance
+                    heappush(heap, (neighbor_distance, neighbor))
+
+        # Hub edges are symmetric, so the edge from v to a neighbour u is a DAG edge
+        # into v when u is reached and the cheapest route to v can end with it
+        pred_offsets = array('l', [0])
+        preds = array('l')
+        for vertex in range(len(self.switch_names)):
+            distance = distances[vertex]
+            if distance > 0:
+                for edge in range(offsets[vertex], offsets[vertex + 1]):
+                    neighbor_distance = distances[neighbors[edge]]
+                    if neighbor_distance != -1 and neighbor_distance + edge_costs[edge] == distance:
+                        preds.append(edge)
+            pred_offsets.append(len(preds))
+
+        stats.count("dijkstra_vertices_settled", len(order))
+        dag = RouteDag(source, distances, order, pred_offsets, preds)
+        self.routing_table[source] = dag
+        return dag
+
+    def _equal_cost_hops(self, dag, destination):
+        """
+        Return the part of a route DAG that leads to one destination.
+
+        Returns:
+            dict: {vertex: [(next hop vertex, CSR edge joining them), ...]} for
+                  every vertex with an equal-cost route to the destination through
+                  it, the destination itself excluded
+        """
+        neighbors, pred_offsets, preds = self.neighbors, dag.pred_offsets, dag.preds
+        next_hops = {}
+        stack = [destination]
+        seen = {destination}
+        while stack:
+            vertex = stack.pop()
+            for edge in preds[pred_offsets[vertex]:pred_offsets[vertex + 1]]:
+                previous = neighbors[edge]
+                next_hops.setdefault(previous, []).append((vertex, edge))
+                if previous not in seen:
+                    seen.add(previous)
+                    stack.append(previous)
+        return next_hops
+
+    @stats.timed()
+    def build_routing_table(self):
+        """
+        Compute the route DAGs of all switches.
+
+        Returns:
+            dict: source vertex ID -> RouteDag
+        """
+        for source in range(len(self.switch_names)):
+            self.route_dag(source)
+        log.debug("Built routing table for %d switches", len(self.routing_table))
+        return self.routing_table
+
+    def get_routing_table(self):
+        """Return the routing table with the route DAG of every switch, building it on first use."""
+        if len(self.routing_table) < len(self.switch_names):
+            self.build_routing_table()
+        return self.routing_table
+
+    def _neighbors_of(self, vertex):
+        """Return the neighbour vertex IDs of a switch vertex."""
+        return self.neighbors[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+    def find_vertex_route(self, source, destination):
+        """
+        Find a cheapest FSPF route between two switch vertices.
+
+        Vertices in different components are rejected from the component
+        labels. If the source's route DAG is cached, the route is read from it
+        by following predecessor edges, so the query costs O(route length).
+        Otherwise, when every hub edge costs the same, a single bidirectional
+        BFS is run between the two vertices; with mixed link speeds the
+        source's route DAG is computed and cached.
+
+        Returns:
+            list: Vertex IDs from source to destination, or None if unreachable
+        """
+        if source is None or destination is None or self.components[source] != self.components[destination]:
+            return None
+
+        dag = self.routing_table.get(source)
+        if dag is None and self.uniform_costs:
+            route = bidirectional_search(self._neighbors_of, source, destination)
+        else:
+            route = self._dag_route(dag or self.route_dag(source), destination)
+        stats.count("paths_computed")
+        return route
+
+    def _dag_route(self, dag, destination):
+        """Return one cheapest route of a route DAG as vertex IDs, following the first predecessor edge of every hop."""
+        neighbors, pred_offsets, preds = self.neighbors, dag.pred_offsets, dag.preds
+        route = [destination]
+        while route[-1] != dag.source:
+            route.append(neighbors[preds[pred_offsets[route[-1]]]])
+        route.reverse()
+        return route
+
+    def find_switch_route_dag(self, source_switch, destination_switch):
+        """
+        Return every equal-cost route between two switches as a DAG.
+
+        Args:
+            source_switch (str): Starting switch name
+            destination_switch (str): Ending switch name
+
+        Returns:
+            dict: {switch name: [next hop switch names]} for the switches on an
+                  equal-cost route, the destination excluded; None if unreachable
+        """
+        source = self.switch_ids.get(source_switch)
+        destination = self.switch_ids.get(destination_switch)
+        if source is None or destination is None or self.components[source] != self.components[destination]:
+            return None
+
+        dag = self.route_dag(source)
+        next_hops = self._equal_cost_hops(dag, destination)
+        return {self.switch_names[vertex]: sorted(self.switch_names[next_vertex] for next_vertex, _ in hops)
+                for vertex, hops in sorted(next_hops.items(), key=lambda item: dag.distances[item[0]])}
+
+    def route_cost(self, source_switch, destination_switch):
+        """Return the FSPF cost of the cheapest route between two switches, or None if unreachable."""
+        source = self.switch_ids.get(source_switch)
+        destination = self.switch_ids.get(destination_switch)
+        if source is None or destination is None or self.components[source] != self.components[destination]:
+            return None
+        return self.route_dag(source).distances[destination]
+
+    def find_switch_route(self, source_switch, destination_switch):
+        """
+        Find the shortest hub-to-hub route between two switches.
+
+        Args:
+            source_switch (str): Starting switch name
+            destination_switch (str): Ending switch name
+
+        Returns:
+            list: Switch names from source to destination, or None if unreachable
+        """
+        route = self.find_vertex_route(self.switch_ids.get(source_switch), self.switch_ids.get(destination_switch))
+        if route is None:
+            return None
+        return [self.switch_names[vertex] for vertex in route]
+
+    def find_route(self, source_wwpn, destination_wwpn):
+        """
+        Find the switch route between two attached devices.
+
+        Returns:
+            list: Switch names traversed from source to destination, or None
+        """
+        route = self.find_vertex_route(self.vertex_of(source_wwpn), self.vertex_of(destination_wwpn))
+        if route is None:
+            return None
+        return [self.switch_names[vertex] for vertex in route]
+
+    def find_routes(self, pairs):
+        """
+        Find the switch routes of many device pairs.
+
+        Pairs are grouped by the switch of their source device, and the route
+        DAG of each distinct source switch is computed once (and cached), so
+        resolving the pairs costs one traversal per source switch plus the
+        length of every route, however many pairs share a source.
+
+        Args:
+            pairs (iterable): (source WWPN, destination WWPN) tuples
+
+        Returns:
+            iterator: (source WWPN, destination WWPN, switch route or None) tuples,
+                      grouped by source switch and in input order within a group;
+                      pairs with a device outside the fabric come first
+        """
+        by_source = {}
+        for source_wwpn, destination_wwpn in pairs:
+            source = self.vertex_of(source_wwpn)
+            destination = self.vertex_of(destination_wwpn)
+            if source is None or destination is None:
+                yield source_wwpn, destination_wwpn, None
+                continue
+            by_source.setdefault(source, []).append((source_wwpn, destination_wwpn, destination))
+
+        switch_names, components = self.switch_names, self.components
+        for source, group in by_source.items():
+            dag = self.route_dag(source)
+            for source_wwpn, destination_wwpn, destination in group:
+                if components[destination] != components[source]:
+                    yield source_wwpn, destination_wwpn, None
+                    continue
+                yield source_wwpn, destination_wwpn, [switch_names[vertex] for vertex in self._dag_route(dag, destination)]
+            stats.count("paths_computed", len(group))
+
+    def find_paths(self, pairs):
+        """
+        Find port-level paths for many device pairs, see find_routes().
+
+        Returns:
+            iterator: (source WWPN, destination WWPN, path as list of WWPNs or None) tuples
+        """
+        for source_wwpn, destination_wwpn, route in self.find_routes(pairs):
+            path = None if route is None else self.expand_route(source_wwpn, destination_wwpn, route)
+            yield source_wwpn, destination_wwpn, path
+
+    def expand_route(self, source_wwpn, destination_wwpn, route):
+        """
+        Rebuild the port-level hop list for a switch route.
+
+        Args:
+            source_wwpn (str): WWPN of the source device
+            destination_wwpn (str): WWPN of the destination device
+            route (list): Switch names as returned by find_route
+
+        Returns:
+            list: WWPNs from source device through F-ports and ISL E-ports to the destination
+        """
+        path = [source_wwpn, self.attached_port(source_wwpn)]
+        vertices = [self.switch_ids[switch_name] for switch_name in route]
+        for vertex1, vertex2 in zip(vertices, vertices[1:]):
+            local_e_port, remote_e_port = self.isls_between(vertex1, vertex2, cheapest=True)[0]
+            path.extend([get_port(local_e_port).wwpn, get_port(remote_e_port).wwpn])
+        destination_f_port = self.attached_port(destination_wwpn)
+        if destination_f_port != path[-1]:
+            path.append(destination_f_port)
+        path.append(destination_wwpn)
+        return path
+
+    def find_path(self, source_wwpn, destination_wwpn):
+        """
+        Find a port-level path between two attached devices.
+
+        Returns:
+            list: Path as list of WWPNs, or None if no path exists
+        """
+        route = self.find_route(source_wwpn, destination_wwpn)
+        if route is None:
+            return None
+        return self.expand_route(source_wwpn, destination_wwpn, route)
+
+    def reachable_switches(self, source_switch):
+        """Return the set of switches in the same component as the given switch."""
+        source = self.switch_ids.get(source_switch)
+        if source is None:
+            return set()
+        label = self.components[source]
+        return {self.switch_names[vertex] for vertex, component in enumerate(self.components) if component == label}
@@ -0,0 +1,277 @@
+"""
+Synthetic capture generator for scale testing.
+
+Writes a capture file in the same section format as the array captures the
+analyzer reads (showsys, showport, showhost, showportdev, zoning info, node
+information, host_info and Switch info), describing a fabric of any size.
+
+Switches use Brocade-style identities: switch N has WWNN 1000D81FCCxxxxxx and
+its port P has WWPN 2pppD81FCCxxxxxx. Arrays use 3PAR-style target WWPNs
+derived from the array serial, and hosts use Emulex-style WWPNs.
+
+Usage:
+    python generate_fabric.py OUTPUT [--switches N] [--ports-per-switch N]
+                              [--topology core-edge|mesh|ring] [--hosts N]
+                              [--targets N] [--zones N]
+"""
+import argparse
+import math
+
+TOPOLOGIES = ("core-edge", "mesh", "ring")
+
+SWITCH_OUI = "D81FCC"
+MAX_SWITCH_PORTS = 0x1000
+TARGET_PORTS_PER_ARRAY = 64   # 2 nodes x 8 slots x 4 ports
+ARRAY_NODE_COUNT = 2
+
+
+def switch_wwnn(switch):
+    """Return the WWNN of switch number `switch` (0-based)."""
+    return f"1000{SWITCH_OUI}{switch + 1:06X}"
+
+
+def switch_port_wwpn(switch, port):
+    """Return the WWPN of port `port` on switch number `switch`."""
+    return f"2{port:03X}{SWITCH_OUI}{switch + 1:06X}"
+
+
+def host_wwpn(host):
+    """Return the WWPN of host initiator number `host`."""
+    return f"10000090FA{host:06X}"
+
+
+def array_serial(array):
+    """Return the 5-digit hex serial of array number `array`."""
+    return 0x10000 + array
+
+
+def target_port(target):
+    """
+    Return the identity of target port number `target`.
+
+    Consecutive ports of an array alternate between its nodes, so an array
+    with fewer than TARGET_PORTS_PER_ARRAY ports still has ports on every node.
+
+    Returns:
+        tuple: (array number, NSP port ID, WWNN, WWPN)
+    """
+    array, index = divmod(target, TARGET_PORTS_PER_ARRAY)
+    index, node = divmod(index, ARRAY_NODE_COUNT)
+    slot, port = divmod(index, 4)
+    serial = array_serial(array)
+    wwnn = f"2FF70002AC0{serial:05X}"
+    wwpn = f"2{node:X}{slot:X}{port + 1:X}0002AC0{serial:05X}"
+    return array, f"{node}:{slot}:{port + 1}", wwnn, wwpn
+
+
+def isl_links(switch_count, topology, core_switches):
+    """
+    Return the switch pairs joined by ISLs for a topology.
+
+    Args:
+        switch_count (int): Number of switches
+        topology (str): "core-edge", "mesh" or "ring"
+        core_switches (int): Number of core switches (core-edge only)
+
+    Returns:
+        list: (switch, switch) pairs, one per inter-switch link
+    """
+    if topology == "core-edge":
+        cores = range(min(core_switches, switch_count))
+        edges = range(len(cores), switch_count)
+        links = [(core, edge) for edge in edges for core in cores]
+        # Join the cores to each other when there are no edges to carry traffic between them
+        if not links:
+            links = [(core, core + 1) for core in cores[:-1]]
+        return links
+    if topology == "mesh":
+        return [(a, b) for a in range(switch_count) for b in range(a + 1, switch_count)]
+    if topology == "ring":
+        if switch_count < 3:
+            return [(a, a + 1) for a in range(switch_count - 1)]
+        return [(a, (a + 1) % switch_count) for a in range(switch_count)]
+    raise ValueError(f"Unknown topology: {topology}")
+
+
+class FabricLayout:
+    """
+    Port-level layout of a synthetic fabric.
+
+    E-ports are assigned first on every switch, in ISL order. Hosts and
+    targets are then spread round-robin over the free ports of the switches
+    they may attach to: on core-edge fabrics hosts go to edge switches and
+    targets to core switches, on other topologies both go to every switch.
+    """
+
+    def __init__(self, switch_count, ports_per_switch, topology, host_count, target_count,
+                 zone_count, core_switches=2, isls_per_link=1, targets_per_zone=2, speed="32Gbps"):
+        """Lay out the fabric, raising ValueError if it does not fit on the switches."""
+        if switch_count < 1:
+            raise ValueError("At least one switch is required")
+        if not 0 < ports_per_switch <= MAX_SWITCH_PORTS:
+            raise ValueError(f"Ports per switch must be between 1 and {MAX_SWITCH_PORTS}")
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown topology: {topology}")
+
+        self.switch_count = switch_count
+        self.ports_per_switch = ports_per_switch
+        self.topology = topology
+        self.host_count = host_count
+        self.target_count = target_count
+        self.zone_count = zone_count
+        self.targets_per_zone = targets_per_zone
+        self.speed = speed
+
+        self.next_port = [0] * switch_count
+        self.switch_ports = [[] for _ in range(switch_count)]  # switch -> [(port, type, connected WWPN)]
+
+        self.isls = []
+        for switch1, switch2 in isl_links(switch_count, topology, core_switches):
+            for _ in range(isls_per_link):
+                port1 = self._allocate_port(switch1)
+                port2 = self._allocate_port(switch2)
+                self.switch_ports[switch1].append((port1, "E-Port", switch_port_wwpn(switch2, port2)))
+                self.switch_ports[switch2].append((port2, "E-Port", switch_port_wwpn(switch1, port1)))
+                self.isls.append((switch1, switch2))
+
+        cores = min(core_switches, switch_count)
+        if topology == "core-edge" and cores < switch_count:
+            host_switches = list(range(cores, switch_count))
+            target_switches = list(range(cores))
+        else:
+            host_switches = target_switches = list(range(switch_count))
+
+        for host in range(host_count):
+            self._attach(host_switches, host, host_wwpn(host))
+        for target in range(target_count):
+            self._attach(target_switches, target, target_port(target)[3])
+
+    def _allocate_port(self, switch):
+        """Return the next free port index on a switch."""
+        port = self.next_port[switch]
+        if port >= self.ports_per_switch:
+            raise ValueError(f"Switch {switch + 1} has no free ports left "
+                             f"({self.ports_per_switch} ports per switch)")
+        self.next_port[switch] += 1
+        return port
+
+    def _attach(self, switches, index, device_wwpn):
+        """Attach a device to the next switch in round-robin order."""
+        switch = switches[index % len(switches)]
+        self.switch_ports[switch].append((self._allocate_port(switch), "F-Port", device_wwpn))
+
+    @property
+    def port_count(self):
+        """Total number of ports in the fabric (switch ports, hosts and targets)."""
+        return sum(self.next_port) + self.host_count + self.target_count
+
+    def write(self, file):
+        """Write the capture to an open text file."""
+        array_count = math.ceil(self.target_count / TARGET_PORTS_PER_ARRAY)
+
+        file.write("showsys output:\n")
+        for array in range(array_count):
+            serial = array_serial(array)
+            file.write(f"0x{serial:05X}|S{serial}|HPE Alletra Storage|MP|4UW{serial:07d}|"
+                       f"{ARRAY_NODE_COUNT}|0|43917312|789091|37556637\n")
+
+        file.write("\nshowport output:\n")
+        for target in range(self.target_count):
+            _, port_id, wwnn, wwpn = target_port(target)
+            file.write(f"{port_id} | target | ready | {wwnn} | {wwpn} | host | FC | -\n")
+
+        file.write("\n\nshowhost output:\n")
+        for host in range(self.host_count):
+            file.write(f"{host_wwpn(host)}\n")
+
+        file.write("\nshowportdev fcfabric 0:3:1 | grep \"Online\" command output:\n")
+        for switch, ports in enumerate(self.switch_ports):
+            file.write(f"# Switch {switch + 1} ports\n")
+            for port, port_type, connection in ports:
+                remote_type = "E-Port" if port_type == "E-Port" else "N-Port"
+                file.write(f"{port}|{switch_port_wwpn(switch, port)}|{port_type}|Online|{self.speed}|"
+                           f"{connection}|{remote_type}\n")
+            file.write("\n")
+
+        file.write("zoning info:\n")
+        if self.host_count and self.target_count:
+            for zone in range(self.zone_count):
+                host = zone % self.host_count
+                file.write(f"zone host{host}_zone{zone}:\n")
+                file.write(f"{host_wwpn(host)}\n")
+                for member in range(min(self.targets_per_zone, self.target_count)):
+                    target = (zone * self.targets_per_zone + member) % self.target_count
+                    file.write(f"{target_port(target)[3]}\n")
+                file.write("\n")
+
+        file.write("Node information variables:\n")
+        file.write(f"node_count = {ARRAY_NODE_COUNT}\n")
+        file.write("node_version = 10.6.0.12\n\n\n")
+        file.write("host_info = SN1610Q FW:v9.12.01 DVR:v10.02.10.00-k1-debug\n\n")
+
+        file.write("Switch info:\n")
+        for switch in range(self.switch_count):
+            number = switch + 1
+            file.write(f"switch_{number}_name = {switch_wwnn(switch)}\n")
+            file.write(f"switch_{number}_logical_name = synth-switch-{number:04d}\n")
+            file.write(f"switch_{number}_vendor = Brocade Communications, Inc.\n")
+            file.write(f"switch_{number}_model = G620\n")
+            file.write(f"switch_{number}_release = v9.1.1c\n")
+
+
+def generate_capture(file_path, switch_count=4, ports_per_switch=48, topology="core-edge",
+                     host_count=64, target_count=16, zone_count=128, **options):
+    """
+    Generate a synthetic capture file.
+
+    Args:
+        file_path (str): Path of the capture to write
+        switch_count (int): Number of switches
+        ports_per_switch (int): Port count of every switch
+        topology (str): ISL topology, one of "core-edge", "mesh" or "ring"
+        host_count (int): Number of host initiator ports
+        target_count (int): Number of array target ports
+        zone_count (int): Number of zones, each with one host and targets_per_zone targets
+        **options: core_switches, isls_per_link, targets_per_zone and speed for FabricLayout
+
+    Returns:
+        FabricLayout: The generated layout
+    """
+    layout = FabricLayout(switch_count, ports_per_switch, topology, host_count, target_count,
+                          zone_count, **options)
+    with open(file_path, 'w') as file:
+        layout.write(file)
+    return layout
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic SAN capture file.")
+    parser.add_argument("output", help="Path of the capture file to write")
+    parser.add_argument("--switches", type=int, default=4, help="Number of switches")
+    parser.add_argument("--ports-per-switch", type=int, default=48, help="Ports on every switch")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="core-edge", help="ISL topology")
+    parser.add_argument("--core-switches", type=int, default=2, help="Core switches for core-edge")
+    parser.add_argument("--isls-per-link", type=int, default=1, help="Parallel ISLs between linked switches")
+    parser.add_argument("--hosts", type=int, default=64, help="Number of host initiator ports")
+    parser.add_argument("--targets", type=int, default=16, help="Number of array target ports")
+    parser.add_argument("--zones", type=int, default=128, help="Number of zones")
+    parser.add_argument("--targets-per-zone", type=int, default=2, help="Targets in every zone")
+    parser.add_argument("--speed", default="32Gbps", help="Speed reported for every switch port")
+    args = parser.parse_args()
+
+    try:
+        layout = generate_capture(
+            args.output, args.switches, args.ports_per_switch, args.topology,
+            args.hosts, args.targets, args.zones,
+            core_switches=args.core_switches, isls_per_link=args.isls_per_link,
+            targets_per_zone=args.targets_per_zone, speed=args.speed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"Wrote {args.output}: {layout.switch_count} switches ({args.topology}), "
+          f"{len(layout.isls)} ISLs, {layout.host_count} hosts, {layout.target_count} targets, "
+          f"{layout.zone_count} zones, {layout.port_count} ports")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import functools
+import time
+
+
+class Instrumentation:
+    """
+    Records wall time and call counts per phase, plus named event counters.
+
+    Phases are timed with the phase() context manager or the timed()
+    decorator. Nested phases are timed inclusively, so the time of an
+    analysis includes the phases it calls. Counters are incremented with
+    count(); callers in hot loops should accumulate locally and count once.
+    """
+
+    def __init__(self):
+        """Initialize an Instrumentation instance with no recorded data."""
+        self.phases = {}     # phase name -> {"calls": int, "seconds": float}
+        self.counters = {}   # counter name -> int
+
+    def reset(self):
+        """Discard all recorded phases and counters."""
+        self.phases.clear()
+        self.counters.clear()
+
+    def count(self, name, amount=1):
+        """Add amount to a named counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, name, seconds):
+        """Record one call of a phase that took the given wall time."""
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = {"calls": 0, "seconds": 0.0}
+        phase["calls"] += 1
+        phase["seconds"] += seconds
+
+    def phase(self, name):
+        """Return a context manager that times one call of a phase."""
+        return _PhaseTimer(self, name)
+
+    def timed(self, name=None):
+        """
+        Decorator that times every call of a function as a phase.
+
+        Args:
+            name (str): Phase name, defaults to the function name
+        """
+        def decorator(function):
+            phase_name = name or function.__name__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.phase(phase_name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def as_dict(self):
+        """Return the recorded phases and counters as plain data."""
+        return {
+            "phases": {name: dict(phase) for name, phase in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+    def report(self):
+        """
+        Format the recorded phases and counters as a text report.
+
+        Returns:
+            str: Phases in the order they were first run, then counters by name
+        """
+        lines = [f"{'Phase':<36} {'Calls':>8} {'Total (s)':>12} {'Per call (ms)':>14}"]
+        for name, phase in self.phases.items():
+            per_call = phase["seconds"] / phase["calls"] * 1000 if phase["calls"] else 0.0
+            lines.append(f"{name:<36} {phase['calls']:>8} {phase['seconds']:>12.4f} {per_call:>14.3f}")
+        if not self.phases:
+            lines.append("  (no phases recorded)")
+
+        lines.append("")
+        lines.append(f"{'Counter':<36} {'Value':>8}")
+        for name in sorted(self.counters):
+            lines.append(f"{name:<36} {self.counters[name]:>8}")
+        if not self.counters:
+            lines.append("  (no counters recorded)")
+        return "\n".join(lines)
+
+
+class _PhaseTimer:
+    """Context manager that records the wall time of one phase call."""
+
+    __slots__ = ('stats', 'name', 'start')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# Global instrumentation shared by the parser, the port registry, the fabric graph and the CLI
+stats = Instrumentation()
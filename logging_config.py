@@ -0,0 +1,58 @@
+import logging
+import sys
+
+# Verbosity (number of -v flags minus number of -q flags) -> logging level.
+# Phase summaries are logged at INFO, so the default shows them; per-port,
+# per-zone and per-hop diagnostics are logged at DEBUG and need -v.
+VERBOSITY_LEVELS = {
+    -2: logging.ERROR,
+    -1: logging.WARNING,
+    0: logging.INFO,
+    1: logging.DEBUG,
+}
+
+
+def verbosity_from_args(args):
+    """Return the verbosity selected by -v/--verbose and -q/--quiet flags in an argument list."""
+    verbosity = 0
+    for arg in args:
+        if arg in ("-v", "--verbose"):
+            verbosity += 1
+        elif arg in ("-q", "--quiet"):
+            verbosity -= 1
+        elif arg.startswith("-") and not arg.startswith("--") and set(arg[1:]) <= {"v", "q"}:
+            verbosity += arg.count("v") - arg.count("q")
+    return verbosity
+
+
+class LevelPrefixFormatter(logging.Formatter):
+    """Format INFO and DEBUG records as the bare message and prefix warnings and errors with their level."""
+
+    def format(self, record):
+        message = super().format(record)
+        if record.levelno >= logging.WARNING:
+            return f"{record.levelname}: {message}"
+        return message
+
+
+def configure_logging(verbosity=0, stream=None):
+    """
+    Send log records to a stream at the level selected by a verbosity.
+
+    INFO and DEBUG messages are written as-is, so INFO output reads the same
+    as the console output it replaces; warnings and errors are prefixed with
+    their level name (e.g. "WARNING: ...").
+
+    Args:
+        verbosity (int): 0 for the default level, positive for more output, negative for less
+        stream: Output stream, defaults to sys.stdout
+    """
+    verbosity = max(min(verbosity, max(VERBOSITY_LEVELS)), min(VERBOSITY_LEVELS))
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(LevelPrefixFormatter("%(message)s"))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(VERBOSITY_LEVELS[verbosity])
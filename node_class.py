@@ -3,6 +3,8 @@ class TargetNode:
     Represents a target node (storage array) in a Fibre Channel SAN network.
     """
     
+    __slots__ = ('name', 'sw_version')
+    
     def __init__(self, name=None, sw_version=None):
         """
         Initialize a TargetNode instance.
@@ -28,6 +30,8 @@ class SwitchNode:
     Represents a switch node in a Fibre Channel SAN network.
     """
     
+    __slots__ = ('name', 'wwnn', 'release_version', 'model', 'port_count', 'vendor')
+    
     def __init__(self, name=None, wwnn=None, release_version=None, model=None, port_count=None, vendor=None):
         """
         Initialize a SwitchNode instance.
@@ -63,6 +67,8 @@ class InitiatorNode:
     Represents an initiator node (host server) in a Fibre Channel SAN network.
     """
     
+    __slots__ = ('name', 'hba', 'fw_version', 'dvr_version')
+    
     def __init__(self, name=None, hba=None, fw_version=None, dvr_version=None):
         """
         Initialize an InitiatorNode instance.
@@ -71,6 +77,7 @@ class InitiatorNode:
             name (str): Name of the initiator node/host server
             hba (str): Host Bus Adapter model/type
             fw_version (str): Firmware version of the HBA
+            dvr_version (str): Driver version of the HBA
         """
         self.name = name
         self.hba = hba
@@ -90,6 +97,8 @@ class TargetArray:
     Represents a target array (storage system) in a Fibre Channel SAN network.
     """
     
+    __slots__ = ('wwnn', 'name', 'node_count', 'serial_number', 'software_version')
+    
     def __init__(self, wwnn=None, name=None, node_count=0, serial_number=None):
         """
         Initialize a TargetArray instance.
@@ -1,8 +1,21 @@
+from array import array
+import logging
+
+from instrumentation import stats
+
+log = logging.getLogger(__name__)
+
+
 class Port:
     """
     Represents a port in a Fibre Channel SAN network.
     """
     
+    # Declared fields keep each port free of a per-instance __dict__.
+    # speed is a property over _speed that keeps the numeric speed fields in step
+    __slots__ = ('wwpn', 'port_id', 'wwnn', 'port_type', 'if_switch_port',
+                 '_speed', 'speed_gbps', 'data_rate', 'connection')
+    
     def __init__(self, wwpn=None, port_id=None, wwnn=None, port_type=None, 
                  if_switch_port=None, speed=None, connection=None):
         """
@@ -14,16 +27,27 @@ class Port:
             wwnn (str): World Wide Node Name
             port_type (str): Type of port - 'initiator', 'switch', or 'target'
             if_switch_port (str): Switch port type - 'e-port' if applicable
-            speed (str): Port speed
+            speed (str): Port speed, e.g. "32Gbps"; parsed once into speed_gbps and data_rate
             connection (str): Connected port WWPN
         """
         self.wwpn = wwpn
         self.port_id = port_id
         self.wwnn = wwnn
         self.port_type = port_type  # initiator/switch/target
+        self.if_switch_port = if_switch_port
         self.speed = speed
         self.connection = connection  # connected_port_wwpn
     
+    @property
+    def speed(self):
+        """Port speed as reported in the capture, e.g. "32Gbps"."""
+        return self._speed
+    
+    @speed.setter
+    def speed(self, speed):
+        self._speed = speed
+        self.speed_gbps, self.data_rate = parse_speed(speed)
+    
     def __str__(self):
         """String representation of the port."""
         return f"Port(wwpn={self.wwpn}, port_id={self.port_id}, type={self.port_type})"
@@ -52,6 +76,8 @@ class Initiator(Port):
     Represents an initiator port in a Fibre Channel SAN network.
     """
     
+    __slots__ = ('host_name',)
+    
     def __init__(self, wwpn=None, port_id=None, wwnn=None, speed=None, 
                  connection=None, host_name=None):
         """
@@ -77,6 +103,8 @@ class Target(Port):
     Represents a target port in a Fibre Channel SAN network.
     """
     
+    __slots__ = ('array_name',)
+    
     def __init__(self, wwpn=None, port_id=None, wwnn=None, speed=None, 
                  connection=None, array_name=None):
         """
@@ -102,6 +130,8 @@ class Switch(Port):
     Represents a switch port in a Fibre Channel SAN network.
     """
     
+    __slots__ = ('switch_name', 'port_index', 'switch_port_type')
+    
     def __init__(self, wwpn=None, port_id=None, wwnn=None, speed=None, 
                  connection=None, switch_name=None, port_index=None, switch_port_type=None):
         """
@@ -115,89 +145,441 @@ class Switch(Port):
             connection (str): Connected port WWPN
             switch_name (str): Name of the switch
             port_index (int): Physical port index on the switch
+            switch_port_type (str): Switch port type - 'E-Port', 'F-Port', etc.
         """
         super().__init__(wwpn, port_id, wwnn, 'switch', None, speed, connection)
         self.switch_name = switch_name
         self.port_index = port_index
         self.switch_port_type = switch_port_type  # e-port, f-port, etc.
-
+    
+    @property
+    def alt_connections(self):
+        """WWPNs of every port linked or logged in through this port, from the fabric edge table."""
+        edges = list(fabric_edges.edges_of(self.wwpn))[::-1]
+        return [f"{peer:016X}" for peer, kind in edges if kind != EDGE_INTERNAL]
     
     def __str__(self):
         return f"Switch(wwpn={self.wwpn}, switch={self.switch_name}, port={self.port_index})"
 
 
-# Global dictionaries to index ports by their WWPNs
-initiator_index = {}  # WWPN -> Initiator object
-target_index = {}     # WWPN -> Target object  
-switch_index = {}     # WWPN -> Switch object
+def wwpn_to_int(wwpn):
+    """
+    Parse a WWPN into its 64-bit integer value.
+    
+    Accepts the plain 16-digit form or the colon-separated form, in any case,
+    and integers that are already parsed.
+    
+    Returns:
+        int: The WWPN as an integer, or None if it is not a valid WWPN
+    """
+    if isinstance(wwpn, int):
+        return wwpn
+    try:
+        return int(wwpn.replace(':', ''), 16)
+    except (AttributeError, ValueError):
+        return None
+
+
+# Fibre Channel data rate in MB/s per direction by nominal speed in Gbps.
+# 1-8GFC use 8b/10b encoding, 16GFC and 32GFC 64b/66b, and 64GFC and 128GFC
+# 256b/257b, with line rates chosen so that every generation delivers 100 MB/s
+# per nominal Gbps (8GFC: 8.5 GBd, 16GFC: 14.025 GBd, 32GFC: 28.05 GBd).
+FC_DATA_RATES = {1: 100, 2: 200, 4: 400, 8: 800, 16: 1600, 32: 3200, 64: 6400, 128: 12800}
+
+# Speed string -> (nominal Gbps, data rate); captures only use a handful of distinct strings
+_speed_cache = {}
+
+def parse_speed(speed):
+    """
+    Parse a port speed such as "32Gbps", "16Gb", "8G" or "N/A".
+    
+    Returns:
+        tuple: (nominal speed in Gbps, data rate in MB/s per direction). Speeds
+               that are not a number are (0, 0); a number that is not a Fibre
+               Channel speed keeps its nominal value with a data rate of 0
+    """
+    parsed = _speed_cache.get(speed)
+    if parsed is not None:
+        return parsed
+    
+    digits = ""
+    for char in str(speed or "").strip():
+        if not char.isdigit():
+            break
+        digits += char
+    nominal = int(digits) if digits else 0
+    parsed = (nominal, FC_DATA_RATES.get(nominal, 0))
+    _speed_cache[speed] = parsed
+    return parsed
+
+
+class PortRegistry:
+    """
+    Single registry of every port in the fabric, keyed by WWPN.
+    
+    WWPNs are parsed once into 64-bit integers for the main table, so every
+    lookup is one hash probe and is independent of case and colon formatting.
+    Per-type views (initiators, targets, switches) keyed by the WWPN string
+    are kept alongside for callers that iterate over one kind of port.
+    """
+    
+    __slots__ = ('ports', 'initiators', 'targets', 'switches')
+    
+    def __init__(self):
+        """Initialize an empty PortRegistry instance."""
+        self.ports = {}        # integer WWPN -> port object of any type
+        self.initiators = {}   # WWPN -> Initiator object
+        self.targets = {}      # WWPN -> Target object
+        self.switches = {}     # WWPN -> Switch object
+    
+    def __len__(self):
+        return len(self.ports)
+    
+    def __contains__(self, wwpn):
+        return self.get(wwpn) is not None
+    
+    @staticmethod
+    def key(wwpn):
+        """Return the main table key for a WWPN (its integer value when valid)."""
+        value = wwpn_to_int(wwpn)
+        return wwpn if value is None else value
+    
+    def get(self, wwpn):
+        """Return the port registered under a WWPN (string or integer), or None."""
+        return self.ports.get(self.key(wwpn))
+    
+    def _view_for(self, port):
+        """Return the per-type view a port belongs in, or None for generic ports."""
+        if isinstance(port, Initiator):
+            return self.initiators
+        if isinstance(port, Target):
+            return self.targets
+        if isinstance(port, Switch):
+            return self.switches
+        return None
+    
+    def register(self, port):
+        """
+        Register a port.
+        
+        A WWPN is registered only once. If it is already present the existing
+        port is kept, so the same port reported several times (for example a
+        switch port seen by more than one array) maps to one object.
+        
+        Returns:
+            Port: The port now registered under the WWPN
+        """
+        key = self.key(port.wwpn)
+        existing = self.ports.get(key)
+        if existing is not None:
+            return existing
+        self.ports[key] = port
+        view = self._view_for(port)
+        if view is not None:
+            view[port.wwpn] = port
+        return port
+    
+    def register_many(self, ports):
+        """
+        Register many ports in one pass.
+        
+        Returns:
+            int: Number of newly registered ports
+        """
+        count = len(self.ports)
+        for port in ports:
+            self.register(port)
+        return len(self.ports) - count
+    
+    def clear(self):
+        """Remove all registered ports, keeping the per-type view objects."""
+        for name in self.__slots__:
+            getattr(self, name).clear()
+    
+    def restore(self, other):
+        """
+        Replace the contents of this registry with those of another one.
+        
+        The tables are refilled in place, so module-level references to the
+        per-type views stay valid (used when loading a cached snapshot).
+        """
+        for name in self.__slots__:
+            table = getattr(self, name)
+            table.clear()
+            table.update(getattr(other, name))
+
+
+# Edge kinds of the fabric edge table
+EDGE_PHYSICAL = 0   # Cable between a switch port and a device N-port or another switch's E-port
+EDGE_LOGIN = 1      # Further fabric login through an F-port (NPIV ports, Access Gateway uplinks)
+EDGE_INTERNAL = 2   # Switch port to the switch it belongs to
+EDGE_KIND_NAMES = {EDGE_PHYSICAL: "physical", EDGE_LOGIN: "login", EDGE_INTERNAL: "internal"}
+
+
+class EdgeTable:
+    """
+    Shared table of the edges between ports, a port multigraph.
+    
+    Every edge joins two integer WWPNs and has a kind (EDGE_PHYSICAL,
+    EDGE_LOGIN or EDGE_INTERNAL). A port has at most one physical edge: any
+    further edge added as physical on the same first endpoint is recorded as
+    a login, so the second and later logins behind one F-port become logical
+    logins while the first stays the cable.
+    
+    Edges are stored in flat arrays rather than per-port lists. Edge e joins
+    ends[2e] and ends[2e + 1]; the two ends are half-edges 2e and 2e + 1, and
+    the half-edges of a port form a linked list that starts at first_half[port]
+    and continues through next_half. An edge therefore costs a few machine
+    words, and a port costs one dict entry however many logins it has.
+    """
+    
+    __slots__ = ('ends', 'kinds', 'next_half', 'first_half', 'removed')
+    
+    def __init__(self):
+        """Initialize an empty EdgeTable instance."""
+        self.ends = array('Q')       # half-edge -> integer WWPN of its port
+        self.kinds = array('b')      # edge ID -> edge kind, -1 once removed
+        self.next_half = array('l')  # half-edge -> next half-edge of the same port, -1 at the end
+        self.first_half = {}         # integer WWPN -> first half-edge of the port
+        self.removed = 0             # Number of removed edges still taking up a slot
+    
+    def __len__(self):
+        return len(self.kinds) - self.removed
+    
+    def _halves(self, key):
+        """Yield the half-edges of a port given its integer WWPN."""
+        half = self.first_half.get(key, -1)
+        while half != -1:
+            yield half
+            half = self.next_half[half]
+    
+    def edges_of(self, wwpn, kind=None):
+        """
+        Yield the edges of a port, most recently added first.
+        
+        Args:
+            wwpn (str or int): WWPN of the port
+            kind (int): Only yield edges of this kind
+        
+        Returns:
+            iterator: (integer WWPN of the other end, edge kind) tuples
+        """
+        key = wwpn_to_int(wwpn)
+        for half in self._halves(key):
+            edge_kind = self.kinds[half >> 1]
+            if kind is None or edge_kind == kind:
+                yield self.ends[half ^ 1], edge_kind
+    
+    def peers(self, wwpn, kind=None):
+        """Return the integer WWPNs at the other end of a port's edges, in the order they were added."""
+        return [peer for peer, _ in self.edges_of(wwpn, kind)][::-1]
+    
+    def add(self, wwpn, other_wwpn, kind=EDGE_PHYSICAL):
+        """
+        Add an edge between two ports.
+        
+        An edge that already joins the two ports is kept as it is, and a
+        second physical edge on the first port is recorded as a login. Pass the
+        port with fewer edges first: the duplicate check walks its edges.
+        
+        Args:
+            wwpn (str or int): First port, normally the switch port
+            other_wwpn (str or int): Second port
+            kind (int): Edge kind
+        
+        Returns:
+            int: ID of the new or existing edge, or None if a WWPN is invalid or both are the same
+        """
+        key = wwpn_to_int(wwpn)
+        other_key = wwpn_to_int(other_wwpn)
+        if key is None or other_key is None or key == other_key:
+            return None
+        
+        has_physical = False
+        for half in self._halves(key):
+            if self.ends[half ^ 1] == other_key:
+                return half >> 1
+            has_physical = has_physical or self.kinds[half >> 1] == EDGE_PHYSICAL
+        if kind == EDGE_PHYSICAL and has_physical:
+            kind = EDGE_LOGIN
+        
+        edge = len(self.kinds)
+        self.kinds.append(kind)
+        self.ends.extend((key, other_key))
+        self.next_half.extend((self.first_half.get(key, -1), self.first_half.get(other_key, -1)))
+        self.first_half[key] = 2 * edge
+        self.first_half[other_key] = 2 * edge + 1
+        return edge
+    
+    def _unlink(self, key, target_half):
+        """Remove one half-edge from its port's linked list."""
+        previous = -1
+        for half in self._halves(key):
+            if half == target_half:
+                if previous == -1:
+                    if self.next_half[half] == -1:
+                        del self.first_half[key]
+                    else:
+                        self.first_half[key] = self.next_half[half]
+                else:
+                    self.next_half[previous] = self.next_half[half]
+                return
+            previous = half
+    
+    def remove(self, wwpn, other_wwpn):
+        """
+        Remove the edge between two ports.
+        
+        Returns:
+            bool: True if an edge was removed
+        """
+        key = wwpn_to_int(wwpn)
+        other_key = wwpn_to_int(other_wwpn)
+        for half in self._halves(key):
+            if self.ends[half ^ 1] == other_key:
+                self._unlink(key, half)
+                self._unlink(other_key, half ^ 1)
+                self.kinds[half >> 1] = -1
+                self.removed += 1
+                return True
+        return False
+    
+    def records(self, kinds=None):
+        """
+        Return the edges as (WWPN, other WWPN, kind) tuples of integers, in the order they were added.
+        
+        Args:
+            kinds (container): Only return edges of these kinds
+        """
+        return [(self.ends[2 * edge], self.ends[2 * edge + 1], kind)
+                for edge, kind in enumerate(self.kinds)
+                if kind != -1 and (kinds is None or kind in kinds)]
+    
+    def count_by_kind(self):
+        """Return {kind name: number of edges} for the edges in the table."""
+        counts = dict.fromkeys(EDGE_KIND_NAMES.values(), 0)
+        for kind in self.kinds:
+            if kind != -1:
+                counts[EDGE_KIND_NAMES[kind]] += 1
+        return counts
+    
+    def clear(self):
+        """Remove all edges."""
+        for name in ('ends', 'kinds', 'next_half'):
+            del getattr(self, name)[:]
+        self.first_half.clear()
+        self.removed = 0
+    
+    def restore(self, other):
+        """Replace the contents of this table with those of another one, keeping this object."""
+        self.clear()
+        for name in ('ends', 'kinds', 'next_half'):
+            getattr(self, name).extend(getattr(other, name))
+        self.first_half.update(other.first_half)
+        self.removed = other.removed
+
+
+# Global port registry and its per-type views
+port_registry = PortRegistry()
+initiator_index = port_registry.initiators  # WWPN -> Initiator object
+target_index = port_registry.targets        # WWPN -> Target object
+switch_index = port_registry.switches       # WWPN -> Switch object
+
+# Global edge table of the fabric's port multigraph
+fabric_edges = EdgeTable()
+
+# Incremented whenever ports are registered, connected or disconnected so that
+# cached views of the fabric (such as the fabric graph) know when to rebuild
+topology_version = 0
+
+def mark_topology_changed():
+    """Record that the fabric topology has changed."""
+    global topology_version
+    topology_version += 1
+
+def get_port(wwpn):
+    """Get a port object by its WWPN."""
+    return port_registry.get(wwpn)
 
 def register_port(port):
-    """Register a port in the appropriate index based on its type (i/s/t)."""
-    if isinstance(port, Initiator):
-        initiator_index[port.wwpn] = port
-        print(f"Registered Initiator: {port.wwpn}")
-    elif isinstance(port, Target):
-        target_index[port.wwpn] = port
-        print(f"Registered Target: {port.wwpn}")
-    elif isinstance(port, Switch):
-        switch_index[port.wwpn] = port
-        print(f"Registered Switch: {port.wwpn}")
-
-def connect_ports(port1_wwpn, port2_wwpn):
-    """Connect two ports by their WWPNs."""
-    # Find the ports in all indexes
-    port1 = None
-    port2 = None
-    
-    # Look for port1
-    if port1_wwpn in initiator_index:
-        port1 = initiator_index[port1_wwpn]
-    elif port1_wwpn in target_index:
-        port1 = target_index[port1_wwpn]
-    elif port1_wwpn in switch_index:
-        port1 = switch_index[port1_wwpn]
-    
-    # Look for port2
-    if port2_wwpn in initiator_index:
-        port2 = initiator_index[port2_wwpn]
-    elif port2_wwpn in target_index:
-        port2 = target_index[port2_wwpn]
-    elif port2_wwpn in switch_index:
-        port2 = switch_index[port2_wwpn]
+    """
+    Register a port in the port registry and its per-type view (i/s/t).
+    
+    Returns:
+        Port: The port registered under the WWPN (an earlier one if it was already known)
+    """
+    registered = port_registry.register(port)
+    if registered is port:
+        stats.count("ports_registered")
+        log.debug("Registered %s: %s", port.__class__.__name__, port.wwpn)
+        mark_topology_changed()
+    return registered
+
+def register_ports(ports):
+    """
+    Register many ports in one call.
+    
+    Unlike register_port, the topology is marked changed once for the whole
+    batch and no per-port output is produced.
+    
+    Args:
+        ports (iterable): Port objects to register
+    
+    Returns:
+        int: Number of newly registered ports (WWPNs already known keep their existing port)
+    """
+    added = port_registry.register_many(ports)
+    if added:
+        stats.count("ports_registered", added)
+        mark_topology_changed()
+    log.debug("Registered %d new ports", added)
+    return added
+
+def connect_ports(port1_wwpn, port2_wwpn, kind=EDGE_PHYSICAL):
+    """
+    Connect two ports by their WWPNs.
+    
+    The link is added to the fabric edge table. A port's connection field
+    keeps its first link and is only set here when it is still empty, so
+    connecting a port again adds an edge instead of replacing the first one.
+    
+    Args:
+        port1_wwpn (str): First port, normally the switch port
+        port2_wwpn (str): Second port
+        kind (int): Edge kind, EDGE_PHYSICAL by default
+    """
+    port1 = port_registry.get(port1_wwpn)
+    port2 = port_registry.get(port2_wwpn)
     
     if port1 and port2:
-        port1.connect_to(port2_wwpn)
-        port2.connect_to(port1_wwpn)
-        print(f"Connected {port1.port_type} ({port1_wwpn}) to {port2.port_type} ({port2_wwpn})")
+        fabric_edges.add(port1.wwpn, port2.wwpn, kind)
+        if port1.connection is None:
+            port1.connect_to(port2.wwpn)
+        if port2.connection is None:
+            port2.connect_to(port1.wwpn)
+        mark_topology_changed()
+        stats.count("connections_created")
+        log.debug("Connected %s (%s) to %s (%s)", port1.port_type, port1_wwpn, port2.port_type, port2_wwpn)
     else:
-        print(f"Error: Could not find one or both ports - {port1_wwpn}, {port2_wwpn}")
+        log.error("Could not find one or both ports - %s, %s", port1_wwpn, port2_wwpn)
 
 def disconnect_ports(port1_wwpn, port2_wwpn):
     """Disconnect two ports by their WWPNs."""
-    # Find the ports in all indexes
-    port1 = None
-    port2 = None
-    
-    # Look for port1
-    if port1_wwpn in initiator_index:
-        port1 = initiator_index[port1_wwpn]
-    elif port1_wwpn in target_index:
-        port1 = target_index[port1_wwpn]
-    elif port1_wwpn in switch_index:
-        port1 = switch_index[port1_wwpn]
-    
-    # Look for port2
-    if port2_wwpn in initiator_index:
-        port2 = initiator_index[port2_wwpn]
-    elif port2_wwpn in target_index:
-        port2 = target_index[port2_wwpn]
-    elif port2_wwpn in switch_index:
-        port2 = switch_index[port2_wwpn]
+    port1 = port_registry.get(port1_wwpn)
+    port2 = port_registry.get(port2_wwpn)
     
     if port1 and port2:
-        port1.disconnect()
-        port2.disconnect()
-        print(f"Disconnected {port1.port_type} ({port1_wwpn}) from {port2.port_type} ({port2_wwpn})")
+        fabric_edges.remove(port1.wwpn, port2.wwpn)
+        # A connection field pointing at the other port falls back to a remaining link, if any
+        for port, other in ((port1, port2), (port2, port1)):
+            if wwpn_to_int(port.connection) == wwpn_to_int(other.wwpn):
+                port.disconnect()
+                for peer, kind in fabric_edges.edges_of(port.wwpn):
+                    peer_port = port_registry.get(peer)
+                    if kind != EDGE_INTERNAL and peer_port is not None:
+                        port.connect_to(peer_port.wwpn)
+                        break
+        mark_topology_changed()
+        log.debug("Disconnected %s (%s) from %s (%s)", port1.port_type, port1_wwpn, port2.port_type, port2_wwpn)
     else:
-        print(f"Error: Could not find one or both ports - {port1_wwpn}, {port2_wwpn}")
-
+        log.error("Could not find one or both ports - %s, %s", port1_wwpn, port2_wwpn)
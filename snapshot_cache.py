@@ -0,0 +1,85 @@
+"""
+Snapshot cache for fully built fabric models.
+
+Parsing a capture and building the fabric model (ports, connections, nodes,
+zoning, host mapping and the fabric graph) is done once per capture. The
+result is pickled into a cache directory next to the capture, under a name
+derived from the capture's content hash and the parser version, and later
+runs on the same capture load the snapshot instead of rebuilding.
+"""
+import hashlib
+import logging
+import os
+import pickle
+
+from capture_parser import PARSER_VERSION
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR = ".fabric_cache"
+
+
+def capture_hash(file_path):
+    """Return the SHA-256 hex digest of a capture file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_path(file_path, cache_dir=None):
+    """
+    Return the snapshot file path for a capture.
+
+    Args:
+        file_path (str): Path to the capture file
+        cache_dir (str): Optional cache directory, defaults to CACHE_DIR next to the capture
+
+    Returns:
+        str: Path of the snapshot for the capture's current content and PARSER_VERSION
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR)
+    return os.path.join(cache_dir, f"{capture_hash(file_path)}-v{PARSER_VERSION}.pickle")
+
+
+def load_snapshot(file_path, cache_dir=None):
+    """
+    Load the cached fabric model for a capture.
+
+    Returns:
+        object: The model passed to save_snapshot, or None if there is no usable snapshot
+    """
+    try:
+        path = snapshot_path(file_path, cache_dir)
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+        log.warning("Ignoring unreadable fabric snapshot: %s", e)
+        return None
+
+
+def save_snapshot(file_path, model, cache_dir=None):
+    """
+    Write the fabric model for a capture to the cache.
+
+    The snapshot is written to a temporary file and moved into place, so an
+    interrupted run never leaves a truncated snapshot behind.
+
+    Returns:
+        str: Path of the written snapshot, or None if it could not be written
+    """
+    try:
+        path = snapshot_path(file_path, cache_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as file:
+            pickle.dump(model, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        return path
+    except OSError as e:
+        log.warning("Could not write fabric snapshot: %s", e)
+        return None
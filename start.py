@@ -1,22 +1,44 @@
-from collections import deque
+import logging
 import math
+import os
+import sys
 import port_class
 from port_class import (
     Port, Initiator, Target, Switch,
-    register_port, connect_ports, disconnect_ports,
-    initiator_index, target_index, switch_index
+    register_ports,
+    port_registry, initiator_index, target_index, switch_index,
+    fabric_edges, EDGE_PHYSICAL, EDGE_LOGIN, EDGE_INTERNAL
 )
 
 from node_class import TargetNode, SwitchNode, InitiatorNode, TargetArray
+from fabric_graph import FabricGraph
+from zone_database import ZoneDatabase
+from capture_parser import CaptureParser
+from snapshot_cache import load_snapshot, save_snapshot
+from capture_ingest import ingest_captures
+from instrumentation import stats
+from logging_config import configure_logging, verbosity_from_args
 
-# Global dictionaries to store WWPN -> Port object mapping
-target_ports = {}
-host_ports = {}
-switch_ports = {}
-zoning_info = {}
-all_zones = []
+log = logging.getLogger(__name__)
+
+# Per-type views of the port registry, kept under their historical names
+target_ports = target_index
+host_ports = initiator_index
+switch_ports = switch_index
+
+# Zones with an inverted WWPN -> zone index; all_zones keeps the member lists under their historical name
+zone_db = ZoneDatabase()
+all_zones = zone_db.members
 host_mapping = {}
 
+# Switch name -> WWPNs of its ports, filled by index_switch_ports
+switch_port_groups = {}
+
+# Reverse and per-array-node views of host_mapping, filled by build_host_mapping
+target_hosts = {}
+host_nodes = {}
+node_hosts = {}
+
 # Global dictionaries to node objects info
 # here info is mapped by host_name for initiators, node_name for targets, and switch_name for switches
 target_nodes = {}
@@ -26,333 +48,585 @@ initiator_nodes = {}
 # Global dictionary to store target arrays
 target_arrays = {}
 
-def parse_showsys_output(file_path="output 1.txt"):
+# Persistent fabric graph shared by path queries, ISL analysis and the CLI
+fabric_graph = None
+
+def parse_showsys_line(line, state):
     """
-    Parse the showsys output and create TargetArray objects.
+    Parse one line of the showsys section and create a TargetArray object.
     
     Args:
-        file_path (str): Path to the output file
+        line (str): Stripped line from the showsys section
+        state (dict): Shared parser state
     """
     global target_arrays
     
+    # Stop when we hit another section
+    if line.startswith("showport") or line.startswith("showhost") or line.startswith("showportdev"):
+        return
+    
+    if "|" not in line:
+        return
+    
+    # Split by | and clean up whitespace
+    parts = [part.strip() for part in line.split("|")]
+    
+    if len(parts) < 6:
+        log.warning("Insufficient columns in showsys line: %s", line)
+        return
+    
+    wwnn = parts[0][2:]        # First column: WWNN
+    name = parts[1]          # Second column: Name
+    serial_number = parts[4] # Fifth column: Serial Number
+    node_count = parts[5]    # Sixth column: Node Count
+    
+    log.debug("Found showsys data: WWNN=%s, Name=%s, Serial Number=%s, Node Count=%s",
+              wwnn, name, serial_number, node_count)
+    
     try:
-        with open(file_path, 'r') as file:
-            lines = file.readlines()
-        
-        in_showsys_section = False
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Start reading after "showsys output:"
-            if "showsys output:" in line:
-                in_showsys_section = True
-                print("Found showsys output section")
-                continue
-            
-            # Stop when we hit another section
-            if in_showsys_section and (line.startswith("showport") or line.startswith("showhost") or line.startswith("showportdev") or not line):
-                in_showsys_section = False
-                continue
-            
-            # Parse the showsys lines
-            if in_showsys_section and "|" in line:
-                # Split by | and clean up whitespace
-                parts = [part.strip() for part in line.split("|")]
-                
-                if len(parts) >= 6:
-                    wwnn = parts[0][2:]        # First column: WWNN
-                    name = parts[1]          # Second column: Name
-                    serial_number = parts[4] # Fifth column: Serial Number
-                    node_count = parts[5]    # Sixth column: Node Count
-                    
-                    print(f"Found showsys data:")
-                    print(f"  WWNN: {wwnn}")
-                    print(f"  Name: {name}")
-                    print(f"  Serial Number: {serial_number}")
-                    print(f"  Node Count: {node_count}")
-                    
-                    try:
-                        # Convert node_count to integer
-                        node_count_int = int(node_count)
-                        
-                        # Create TargetArray object
-                        target_array = TargetArray(
-                            wwnn=wwnn,
-                            name=name,
-                            node_count=node_count_int,
-                            serial_number=serial_number
-                        )
-                        
-                        # Store in global dictionary with WWNN as key
-                        target_arrays[wwnn] = target_array
-                        print(f"Created TargetArray: {wwnn} -> {target_array}")
-                        
-                    except ValueError:
-                        print(f"Warning: Could not convert node_count '{node_count}' to integer")
-                        
-                        # Create TargetArray object with string node_count as 0
-                        target_array = TargetArray(
-                            wwnn=wwnn,
-                            name=name,
-                            node_count=0,  # Default to 0 if conversion fails
-                            serial_number=serial_number
-                        )
-                        
-                        target_arrays[wwnn] = target_array
-                        print(f"Created TargetArray with default node_count: {wwnn} -> {target_array}")
-                
-                else:
-                    print(f"Warning: Insufficient columns in showsys line: {line}")
+        # Convert node_count to integer
+        node_count_int = int(node_count)
+    except ValueError:
+        log.warning("Could not convert node_count '%s' to integer", node_count)
+        node_count_int = 0  # Default to 0 if conversion fails
+    
+    # Create TargetArray object and store it with WWNN as key
+    target_array = TargetArray(
+        wwnn=wwnn,
+        name=name,
+        node_count=node_count_int,
+        serial_number=serial_number
+    )
+    target_arrays[wwnn] = target_array
+    log.debug("Created TargetArray: %s -> %s", wwnn, target_array)
+
+def parse_showport_line(line, state):
+    """
+    Parse one line of the showport section and create the matching port object.
+    
+    Args:
+        line (str): Stripped line from the showport section
+        state (dict): Shared parser state, created ports are appended to state["ports"]
+    """
+    if "|" not in line:
+        return
+    
+    # Split by | and clean up whitespace
+    parts = [part.strip() for part in line.split("|")]
+    
+    if len(parts) < 5:
+        return
+    
+    port_id = parts[0]          # First column: NSP
+    port_type = parts[1]        # Second column: port type
+    port_status = parts[2]      # Third column: status
+    wwnn = parts[3]             # Fourth column: WWNN  
+    wwpn = parts[4]             # Fifth column: WWPN
+    
+    log.debug("Found port in showport output: ID=%s, Type=%s, Status=%s, WWNN=%s, WWPN=%s",
+              port_id, port_type, port_status, wwnn, wwpn)
+
+    # Create appropriate port object based on type
+    if port_type.lower() == "target":
+        # Extract the first value from port_id (e.g., "0" from "0:3:1")
+        node_number = port_id.split(':')[0] if ':' in port_id else port_id
+        array_name = None
+        wwnn_prefix = wwnn[11:]
+        if wwnn_prefix in target_arrays:
+            array_name = f"{target_arrays[wwnn_prefix].name}-node{node_number}"
+        else:
+            array_name = f"array-node{node_number}"
+        port = Target(
+            wwpn=wwpn,
+            port_id=port_id,
+            wwnn=wwnn,
+            speed="32Gbps",  # Default speed
+            array_name=array_name
+        )
+    elif port_type.lower() == "initiator":
+        port = Initiator(
+            wwpn=wwpn,
+            port_id=port_id,
+            wwnn=wwnn,
+            speed="32Gbps",  # Default speed
+            host_name=f"Host_{port_id.replace(':', '_')}"
+        )
+    else:  # Default to generic Port for other types
+        port = Port(
+            wwpn=wwpn,
+            port_id=port_id,
+            wwnn=wwnn,
+            port_type=port_type,
+            speed="32Gbps"
+        )
+    
+    state["ports"].append(port)
+    log.debug("Created %s port: NSP=%s, WWPN=%s", port_type, port_id, wwpn)
+
+def parse_showhost_line(line, state):
+    """
+    Parse one line of the showhost section and create a host Initiator port.
+    
+    Args:
+        line (str): Stripped line from the showhost section
+        state (dict): Shared parser state, created ports are appended to state["ports"]
+    """
+    wwpn = line
+    
+    # Create an Initiator port for host WWPNs
+    port = Initiator(
+        wwpn=wwpn,
+        port_id="N/A",  # NSP not available in showhost output
+        wwnn="N/A",  # WWNN not available in showhost output
+        speed="32Gbps",  # Default speed
+        host_name=f"Host_{wwpn[-8:]}"  # Use last 8 chars of WWPN for host name
+    )
+    
+    state["ports"].append(port)
+    log.debug("Created host initiator port: WWPN=%s", wwpn)
+
+def parse_showportdev_line(line, state):
+    """
+    Parse one line of the showportdev section and create a Switch port.
+    
+    Args:
+        line (str): Stripped line from the showportdev section
+        state (dict): Shared parser state, created ports are appended to state["ports"]
+    """
+    if line.startswith("#"):
+        # "# Switch N ports" marks the switch the following ports belong to
+        words = line.lstrip("#").split()
+        if len(words) >= 2 and words[0].lower() == "switch" and words[1].isdigit():
+            state["switch_marker"] = words[1]
+        return
+    
+    if "|" not in line:
+        return
+    
+    # Split by | and clean up whitespace
+    parts = [part.strip() for part in line.split("|")]
+    
+    if len(parts) < 6:
+        return
+    
+    port_index = parts[0]           # First column: port index
+    switch_wwpn = parts[1]          # Second column: switch WWPN
+    switch_port_type = parts[2]     # Third column: port type (F-Port, E-Port, etc.)
+    speed = parts[4]                # Fifth column: speed
+    connection = parts[5]
+    
+    # The port may already exist - we keep only the first occurrence, and every
+    # login reported on it becomes an edge in the fabric edge table.
+    # Ports of this parse are registered in bulk afterwards, so look in both places
+    existing_port = state["switch_ports"].get(switch_wwpn) or port_registry.get(switch_wwpn)
+    
+    if existing_port is None:
+        # Create Switch port object
+        existing_port = Switch(
+            wwpn=switch_wwpn,
+            port_id=port_index,
+            wwnn="N/A",  # WWNN not available in showportdev output
+            speed=speed,
+            connection=connection,  # Connected port WWPN
+            switch_name=f"Switch_{switch_wwpn[-8:]}",  # Provisional, see assign_switch_identities
+            port_index=port_index,
+            switch_port_type=switch_port_type  # E-Port, F-Port, etc.
+        )
+        state["ports"].append(existing_port)
+        state["switch_ports"][switch_wwpn] = existing_port
+        if state["switch_marker"] is not None:
+            state["port_switch_numbers"][switch_wwpn] = state["switch_marker"]
+        log.debug("Created switch port: Port=%s, WWPN=%s, Type=%s", port_index, switch_wwpn, switch_port_type)
+    
+    # The first login on a port is its physical link, later ones (NPIV, Access Gateway) are logins
+    if connection and isinstance(existing_port, Switch):
+        fabric_edges.add(switch_wwpn, connection, EDGE_PHYSICAL)
+
+def finish_showportdev_section(state):
+    """
+    End the "# Switch N ports" marker of a showportdev section.
+    
+    Args:
+        state (dict): Shared parser state
+    """
+    state["switch_marker"] = None
+
+def assign_switch_identities(state):
+    """
+    Assign every switch port parsed from showportdev to its real switch.
+    
+    A port is placed, in order of preference:
+      1. on switch N when it follows a "# Switch N ports" marker,
+      2. on the Switch info switch whose WWNN has the same IEEE address. In
+         NAA 1 and NAA 2 names (first digit 1 or 2) the last 12 hex digits
+         are that address, so port 2pppXXXXXXXXXXXX belongs to switch
+         1000XXXXXXXXXXXX,
+      3. otherwise on a switch named after the last 8 digits of its own
+         WWPN, which still groups the ports of a Brocade-style switch.
+    Switches are named by their Switch info logical name, and their WWNN is
+    set on their ports.
+    
+    Args:
+        state (dict): Shared parser state after the capture has been read
+    
+    Returns:
+        int: Number of switch ports assigned by marker or IEEE address
+    """
+    switches = state["switches"]
+    by_address = {}
+    for switch_num, switch_data in switches.items():
+        wwnn = switch_data.get('name', '')
+        if len(wwnn) == 16 and wwnn[0] in "12":
+            by_address[wwnn[4:].upper()] = switch_num
+    
+    assigned = 0
+    port_switch_numbers = state["port_switch_numbers"]
+    for wwpn, switch_port in state["switch_ports"].items():
+        switch_num = port_switch_numbers.get(wwpn)
+        if switch_num is None and len(wwpn) == 16 and wwpn[0] in "12":
+            switch_num = by_address.get(wwpn[4:].upper())
+        if switch_num is None:
+            continue
         
-        print(f"\nTotal TargetArray objects created: {len(target_arrays)}")
-        for wwnn, target_array in target_arrays.items():
-            print(f"  {wwnn}: {target_array}")
+        switch_data = switches.get(switch_num, {})
+        switch_port.switch_name = switch_data.get('logical_name', f"switch_{switch_num}")
+        switch_port.wwnn = switch_data.get('name', switch_port.wwnn)
+        assigned += 1
     
-    except FileNotFoundError:
-        print(f"Error: File {file_path} not found")
-    except Exception as e:
-        print(f"Error parsing showsys output: {e}")
+    log.debug("Assigned %d of %d switch ports to known switches", assigned, len(state["switch_ports"]))
+    return assigned
 
-def parse_showport_output(file_path="output 1.txt"):
+def index_switch_ports():
     """
-    Parse the showport, showhost, showportdev, and zoning output from the file and create Port objects.
+    Rebuild the switch -> ports index from the registered switch ports.
+    
+    Every switch port also gets a switch-internal edge to its switch in the
+    fabric edge table. The switch is its WWNN when Switch info gave one, and
+    otherwise its first port, so a switch costs one edge per port rather
+    than one per pair of ports.
+    
+    Returns:
+        dict: {switch_name: [switch port WWPN, ...]}
+    """
+    switch_port_groups.clear()
+    for wwpn, switch_port in switch_ports.items():
+        switch_port_groups.setdefault(switch_port.switch_name, []).append(wwpn)
+    
+    for wwpns in switch_port_groups.values():
+        hub = switch_ports[wwpns[0]].wwnn
+        if port_class.wwpn_to_int(hub) is None:
+            hub = wwpns[0]
+        for wwpn in wwpns:
+            fabric_edges.add(wwpn, hub, EDGE_INTERNAL)
+    return switch_port_groups
+
+def parse_zoning_line(line, state):
+    """
+    Parse one line of the zoning info section.
+    
+    A "zone <name>:" line opens a new zone and every other line is a WWPN
+    member of the current zone.
+    
+    Args:
+        line (str): Stripped line from the zoning section
+        state (dict): Shared parser state, the open zone is kept in state["current_zone"]
+                      and its name in state["zone_name"]
+    """
+    if line.startswith("zone"):
+        # If we have a previous zone, process it
+        finish_zoning_section(state)
+        state["zone_name"] = line[4:].strip().rstrip(":").strip()
+        return
+    
+    # This is a WWPN in the current zone
+    if not any(keyword in line.lower() for keyword in ['node information', 'host_info', 'switch info']):
+        state["current_zone"].append(line)
+        log.debug("Added WWPN %s to current zone", line)
+
+def finish_zoning_section(state):
+    """
+    Add the zone currently being parsed to the zone database.
+    
+    Args:
+        state (dict): Shared parser state
+    """
+    current_zone = state["current_zone"]
+    if not current_zone:
+        return
+    
+    zone_id = zone_db.add(state.get("zone_name"), current_zone)
+    log.debug("Processed zone %s (%s) with WWPNs: %s", zone_id, zone_db.names[zone_id], current_zone)
+    
+    state["current_zone"] = []
+    state["zone_name"] = None
+
+def parse_node_info_line(line, state):
+    """
+    Parse one key=value line of the Node information variables section.
+    
+    Args:
+        line (str): Stripped line from the node information section
+        state (dict): Shared parser state, values are kept in state["node_count"] and state["node_version"]
+    """
+    if "=" not in line:
+        return
+    
+    key, value = line.split("=", 1)
+    key = key.strip()
+    value = value.strip()
+    
+    log.debug("Found node info key-value pair: %s = %s", key, value)
+    
+    if key == "node_count":
+        state["node_count"] = int(value)
+    elif key == "node_version":
+        state["node_version"] = value
+
+def parse_host_info_line(line, state):
+    """
+    Parse the host_info line.
+    
+    Args:
+        line (str): Stripped host_info line
+        state (dict): Shared parser state, the value is kept in state["host_info"]
+    """
+    if "=" in line:
+        _, value = line.split("=", 1)
+        state["host_info"] = value.strip()
+        log.debug("Found host_info: %s", state["host_info"])
+
+def parse_switch_info_line(line, state):
+    """
+    Parse one key=value line of the Switch info section and create a SwitchNode
+    once all required attributes of a switch have been seen.
+    
+    Args:
+        line (str): Stripped line from the switch info section
+        state (dict): Shared parser state, partial switch data is kept in state["switches"]
+    """
+    global switch_nodes
+    
+    if "=" not in line:
+        return
+    
+    key, value = line.split("=", 1)
+    key = key.strip()
+    value = value.strip()
+    
+    log.debug("Found switch key-value pair: %s = %s", key, value)
+    
+    # Extract switch number and attribute from key
+    # Format: switch_1_name, switch_2_logical_name, etc., or the unnumbered
+    # switch_name, switch_logical_name, etc. where each switch_name starts the next switch
+    if not key.startswith("switch_"):
+        return
+    parts = key.split("_", 2)  # Split into max 3 parts: ['switch', '1', 'name']
+    
+    switches = state["switches"]
+    if len(parts) == 3 and parts[1].isdigit():
+        switch_num = parts[1]
+        attribute = parts[2]  # Handle attributes like 'logical_name'
+    else:
+        attribute = key[len("switch_"):]
+        if attribute == "name" or state.get("switch_number") is None:
+            state["switch_number"] = str(len(switches) + 1)
+        switch_num = state["switch_number"]
+    
+    # Store the attribute
+    switches.setdefault(switch_num, {})[attribute] = value
+    
+    # Check if we have all required attributes for this switch
+    required_attrs = ['name', 'vendor', 'model', 'release']
+    if all(attr in switches[switch_num] for attr in required_attrs):
+        # Create the switch node
+        switch_data = switches[switch_num]
+        logical_name = switch_data.get('logical_name', f"switch_{switch_num}")
+        
+        switch_node = SwitchNode(
+            name=logical_name,
+            wwnn=switch_data['name'],
+            release_version=switch_data['release'],
+            model=switch_data['model'],
+            port_count=None,  # Not available in current data
+            vendor=switch_data['vendor']
+        )
+        
+        switch_nodes[logical_name] = switch_node
+        log.debug("Created SwitchNode %s: %s with model=%s, vendor=%s",
+                  switch_num, logical_name, switch_data['model'], switch_data['vendor'])
+
+def finish_node_information(state, sections):
+    """
+    Create TargetNode and InitiatorNode objects from the parsed node
+    information and host_info values.
+    
+    Only the node sections that were parsed are finished, so a partial
+    parse does not warn about sections it skipped.
+    
+    Args:
+        state (dict): Shared parser state
+        sections (set): Capture sections that were parsed
+    """
+    global target_nodes, initiator_nodes
+    
+    node_count = state.get("node_count")
+    node_version = state.get("node_version")
+    host_info = state.get("host_info")
+    switches = state["switches"]
+    
+    # Create TargetNode objects based on node_count
+    if "node_info" in sections and target_arrays:
+        for wwnn, target_array in target_arrays.items():
+            array_name = target_array.name
+            node_count = target_array.node_count
+            target_array.software_version = node_version
+            
+            log.debug("Processing array: %s with %d nodes", array_name, node_count)
+            
+            for i in range(node_count):
+                node_name = f"{array_name}-node{i}"
+                target_node = TargetNode(
+                    name=node_name,
+                    sw_version=node_version
+                )
+                
+                target_nodes[node_name] = target_node
+                log.debug("Created TargetNode: %s with sw_version=%s", node_name, node_version)
+        log.info("Created %d target nodes for %d arrays", len(target_nodes), len(target_arrays))
+    elif "node_info" in sections:
+        log.warning("Could not find node_count (%s) or node_version (%s) in the file", node_count, node_version)
+    
+    # Create InitiatorNode object based on host_info
+    if "host_info" in sections and host_info:
+        # Parse host_info to extract HBA and firmware version
+        # Format: SN1610Q FW:v9.12.01 DVR:v10.02.10.00-k1-debug
+        hba = None
+        fw_version = None
+        
+        parts = host_info.split()
+        if len(parts) >= 2:
+            hba = parts[0]  # SN1610Q
+            for part in parts[1:]:
+                if part.startswith("FW:"):
+                    fw_version = part[3:]  # v9.12.01
+                    break
+        
+        initiator_node = InitiatorNode(
+            name="host_1",  # Default name
+            hba=hba,
+            fw_version=fw_version
+        )
+        
+        initiator_nodes["host_1"] = initiator_node
+        log.info("Created InitiatorNode: host_1 with hba=%s, fw_version=%s", hba, fw_version)
+    elif "host_info" in sections:
+        log.warning("Could not find host_info in the file")
+    
+    # Summary of created switches
+    if switches:
+        log.info("Total switches processed: %d", len(switches))
+        for switch_num, switch_data in switches.items():
+            log.debug("Switch %s: %s (%s %s)", switch_num,
+                      switch_data.get('logical_name', f"switch_{switch_num}"),
+                      switch_data.get('vendor', 'Unknown'), switch_data.get('model', 'Unknown'))
+
+# Section name -> (line handler, finish handler) used by the streaming capture parser
+SECTION_HANDLERS = {
+    "showsys": (parse_showsys_line, None),
+    "showport": (parse_showport_line, None),
+    "showhost": (parse_showhost_line, None),
+    "showportdev": (parse_showportdev_line, finish_showportdev_section),
+    "zoning": (parse_zoning_line, finish_zoning_section),
+    "node_info": (parse_node_info_line, None),
+    "host_info": (parse_host_info_line, None),
+    "switch_info": (parse_switch_info_line, None),
+}
+
+PORT_SECTIONS = ("showport", "showhost", "showportdev", "zoning")
+NODE_SECTIONS = ("node_info", "host_info", "switch_info")
+
+@stats.timed()
+def parse_capture(file_path="output 1.txt", sections=None):
+    """
+    Parse the capture file in a single streaming pass.
+    
+    The file is read once, line by line, and each line is handed to the
+    handler of the section it belongs to (showsys, showport, showhost,
+    showportdev, zoning, node info, host info and switch info).
     
     Args:
         file_path (str): Path to the output file
+        sections (iterable): Sections to parse, defaults to all sections
     
     Returns:
-        list: List of created Port objects
+        dict: Parser state, including the list of created Port objects under "ports"
+              and the reason parsing stopped early under "parse_error" (None on success)
     """
-    global target_ports, host_ports, switch_ports, zoning_info, all_zones
-    ports = []
-    
-    # Clear global all_zones for fresh parsing
-    all_zones = []
+    if sections is None:
+        sections = SECTION_HANDLERS.keys()
+    sections = set(sections)
+    
+    parser = CaptureParser()
+    parser.state.update({"ports": [], "switch_ports": {}, "current_zone": [], "zone_name": None,
+                         "switches": {}, "switch_number": None, "switch_marker": None,
+                         "port_switch_numbers": {}, "parse_error": None})
+    for section in sections:
+        handler, finish = SECTION_HANDLERS[section]
+        parser.register(section, handler, finish)
+    
+    # Clear the zone database for fresh parsing
+    if "zoning" in sections:
+        zone_db.clear()
     
     try:
-        with open(file_path, 'r') as file:
-            lines = file.readlines()
+        parser.parse(file_path)
         
-        # Find the showport, showhost, showportdev, and zoning output sections
-        in_showport_section = False
-        in_showhost_section = False
-        in_showportdev_section = False
-        in_zoning_section = False
-        current_zone = []
-        all_zones = []
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Start reading after "showport output:"
-            if "showport output:" in line:
-                in_showport_section = True
-                in_showhost_section = False
-                in_showportdev_section = False
-                in_zoning_section = False
-                continue
-            
-            # Start reading after "showhost output:"
-            if "showhost output:" in line:
-                in_showport_section = False
-                in_showhost_section = True
-                in_showportdev_section = False
-                in_zoning_section = False
-                continue
-            
-            # Start reading after "showportdev fcfabric"
-            if "showportdev fcfabric" in line and "grep \"Online\"" in line:
-                in_showport_section = False
-                in_showhost_section = False
-                in_showportdev_section = True
-                in_zoning_section = False
-                continue
-            
-            # Start reading after "zoning info:"
-            if "zoning info:" in line:
-                in_showport_section = False
-                in_showhost_section = False
-                in_showportdev_section = False
-                in_zoning_section = True
-                continue
-            
-            # Stop when we hit another section
-            if in_showhost_section and "showportdev" in line:
-                in_showhost_section = False
-                continue
-            
-            if in_showportdev_section and "zoning info:" in line:
-                in_showportdev_section = False
-                continue
-            
-            # Parse the showport lines
-            if in_showport_section and "|" in line:
-                # Split by | and clean up whitespace
-                parts = [part.strip() for part in line.split("|")]
-                
-                if len(parts) >= 5:
-                    port_id = parts[0]          # First column: NSP
-                    port_type = parts[1]        # Second column: port type
-                    port_status = parts[2]      # Third column: status
-                    wwnn = parts[3]             # Fourth column: WWNN  
-                    wwpn = parts[4]             # Fifth column: WWPN
-                    
-                    # Log complete details for debugging
-                    print(f"Found port in showport output: ID={port_id}, Type={port_type}, Status={port_status}, WWNN={wwnn}, WWPN={wwpn}")
-
-                    # Create appropriate port object based on type
-                    if port_type.lower() == "target":
-                        # Extract the first value from port_id (e.g., "0" from "0:3:1")
-                        node_number = port_id.split(':')[0] if ':' in port_id else port_id
-                        array_name = None
-                        wwnn_prefix = wwnn[11:]
-                        if wwnn_prefix in target_arrays:
-                            array_name = f"{target_arrays[wwnn_prefix].name}-node{node_number}"
-                        else:
-                            array_name = f"array-node{node_number}"
-                        port = Target(
-                            wwpn=wwpn,
-                            port_id=port_id,
-                            wwnn=wwnn,
-                            speed="32Gbps",  # Default speed
-                            array_name=array_name
-                        )
-                    elif port_type.lower() == "initiator":
-                        port = Initiator(
-                            wwpn=wwpn,
-                            port_id=port_id,
-                            wwnn=wwnn,
-                            speed="32Gbps",  # Default speed
-                            host_name=f"Host_{port_id.replace(':', '_')}"
-                        )
-                    else:  # Default to generic Port for other types
-                        port = Port(
-                            wwpn=wwpn,
-                            port_id=port_id,
-                            wwnn=wwnn,
-                            port_type=port_type,
-                            speed="32Gbps"
-                        )
-                    
-                    ports.append(port)
-                    target_ports[wwpn] = port  # Add to global dictionary with WWPN as key
-                    register_port(port)
-                    print(f"Created {port_type} port: NSP={port_id}, WWPN={wwpn}")
-            
-            # Parse the showhost lines
-            if in_showhost_section and line and not line.startswith("showhost"):
-                wwpn = line.strip()
-                if wwpn:  # Make sure it's not an empty line
-                    # Create an Initiator port for host WWPNs
-                    port = Initiator(
-                        wwpn=wwpn,
-                        port_id="N/A",  # NSP not available in showhost output
-                        wwnn="N/A",  # WWNN not available in showhost output
-                        speed="32Gbps",  # Default speed
-                        host_name=f"Host_{wwpn[-8:]}"  # Use last 8 chars of WWPN for host name
-                    )
-                    
-                    ports.append(port)
-                    host_ports[wwpn] = port  # Add to host_ports dictionary
-                    register_port(port)
-                    print(f"Created host initiator port: WWPN={wwpn}")
-            
-            # Parse the showportdev lines
-            if in_showportdev_section and "|" in line:
-                # Split by | and clean up whitespace
-                parts = [part.strip() for part in line.split("|")]
-                
-                if len(parts) >= 6:
-                    port_index = parts[0]           # First column: port index
-                    switch_wwpn = parts[1]          # Second column: switch WWPN
-                    switch_port_type = parts[2]     # Third column: port type (F-Port, E-Port, etc.)
-                    speed = parts[4]                # Fifth column: speed
-                    connection = parts[5]
-                    
-                    # Create Switch port object
-                    switch_port = Switch(
-                        wwpn=switch_wwpn,
-                        port_id=port_index,
-                        wwnn="N/A",  # WWNN not available in showportdev output
-                        speed=speed,
-                        connection=connection,  # Connected port WWPN
-                        switch_name=f"Switch_{switch_wwpn[-8:]}",  # Use last 8 chars of WWPN
-                        port_index=port_index,
-                        switch_port_type=switch_port_type  # E-Port, F-Port, etc.
-                    )
-                    
-                    ports.append(switch_port)
-                    if switch_ports.get(switch_wwpn) is None: switch_ports[switch_wwpn] = switch_port  # Add to switch_ports dictionary
-                    register_port(switch_port)
-                    print(f"Created switch port: Port={port_index}, WWPN={switch_wwpn}, Type={switch_port_type}")
-
-                    # Check if this switch port already exists
-                    if switch_wwpn in switch_ports:
-                        # Port already exists - we'll keep only the first occurrence
-                        # but still track the alternative connections for completeness
-                        existing_port = switch_ports[switch_wwpn]
-                        if not hasattr(existing_port, 'alt_connections'):
-                            existing_port.alt_connections = []
-                        
-                        # Store the connection as an alternative if not already stored
-                        if connection and connection not in existing_port.alt_connections:
-                            existing_port.alt_connections.append(connection)
-                            print(f"Added alternative connection for existing switch port {switch_wwpn}: {connection}")
-                    else:
-                        # First occurrence of this port - add it to the dictionary and port list
-                        ports.append(switch_port)
-                        switch_ports[switch_wwpn] = switch_port
-                        switch_port.alt_connections = []  # Initialize empty alt_connections list
-                        register_port(switch_port)
-                        print(f"Created switch port: Port={port_index}, WWPN={switch_wwpn}, Type={switch_port_type}")
-            
-            # Parse the zoning info
-            if in_zoning_section:
-                if line.startswith("zone"):
-                    # If we have a previous zone, process it
-                    if current_zone:
-                        all_zones.append(current_zone.copy())
-                        print(f"Processed zone with WWPNs: {current_zone}")
-                    
-                    # Start a new zone
-                    current_zone = []
-                elif line and not line.startswith("zone") and not line.startswith("Node information"):
-                    # This is a WWPN in the current zone
-                    wwpn = line.strip()
-                    if wwpn and not any(keyword in wwpn.lower() for keyword in ['node information', 'host_info', 'switch info']):
-                        current_zone.append(wwpn)
-                        print(f"Added WWPN {wwpn} to current zone")
-                
-                # Stop processing zoning when we hit the next section
-                if line.startswith("Node information"):
-                    # Process the final zone before stopping
-                    if current_zone:
-                        all_zones.append(current_zone.copy())
-                        print(f"Processed final zone with WWPNs: {current_zone}")
-                        current_zone = []
-                    in_zoning_section = False
-                    continue
+        if "showsys" in sections:
+            log.info("Total TargetArray objects created: %d", len(target_arrays))
         
-        # Process the last zone if it exists
-        if current_zone:
-            all_zones.append(current_zone.copy())
-            print(f"Processed final zone with WWPNs: {current_zone}")
-    
-        # Now create the zoning_info mapping - each WWPN maps to its zone
-        # But we need to handle the fact that a WWPN can appear in multiple zones
-        # For the ISL analysis, we'll use all_zones directly
-        for i, zone in enumerate(all_zones):
-            for wwpn in zone:
-                zoning_info[wwpn] = zone  # This will overwrite, but that's ok for now
-                # We'll use all_zones for proper zone analysis
+        if sections & set(NODE_SECTIONS):
+            finish_node_information(parser.state, sections)
     
     except FileNotFoundError:
-        print(f"Error: File {file_path} not found")
+        log.error("File %s not found", file_path)
+        parser.state["parse_error"] = f"File {file_path} not found"
     except Exception as e:
-        print(f"Error parsing file: {e}")
+        log.error("Error parsing file: %s", e)
+        parser.state["parse_error"] = str(e)
     
-    return ports
+    # Switch ports are named once the whole capture, including Switch info, has been read
+    if "showportdev" in sections:
+        assign_switch_identities(parser.state)
+    
+    # Ports are collected while parsing and registered in one batch
+    added = register_ports(parser.state["ports"])
+    if "showportdev" in sections:
+        index_switch_ports()
+    if sections & set(PORT_SECTIONS):
+        log.info("Parsed %s: %d ports registered, %d zones", file_path, added, len(all_zones))
+    
+    return parser.state
+
+def parse_showsys_output(file_path="output 1.txt"):
+    """
+    Parse the showsys output and create TargetArray objects.
+    
+    Args:
+        file_path (str): Path to the output file
+    """
+    parse_capture(file_path, sections=("showsys",))
+
+def parse_showport_output(file_path="output 1.txt"):
+    """
+    Parse the showport, showhost, showportdev, and zoning output from the file and create Port objects.
+    
+    Args:
+        file_path (str): Path to the output file
+    
+    Returns:
+        list: List of created Port objects
+    """
+    return parse_capture(file_path, sections=PORT_SECTIONS)["ports"]
 
 def parse_node_information(file_path="output 1.txt"):
     """
@@ -362,371 +636,124 @@ def parse_node_information(file_path="output 1.txt"):
     Args:
         file_path (str): Path to the output file
     """
-    global target_nodes, initiator_nodes, switch_nodes
-    
-    try:
-        with open(file_path, 'r') as file:
-            lines = file.readlines()
-        
-        node_count = None
-        node_version = None
-        host_info = None
-        
-        # Dictionary to store switch information dynamically
-        switches = {}
-        
-        # Find the Node information variables section
-        in_node_info_section = False
-        in_host_info_section = False
-        in_switch_info_section = False
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Start reading after "Node information variables:"
-            if "Node information variables:" in line:
-                in_node_info_section = True
-                in_host_info_section = False
-                in_switch_info_section = False
-                print(f"Found Node information variables section")
-                continue
-            
-            # Start reading after "host_info"
-            if line.startswith("host_info"):
-                in_node_info_section = False
-                in_host_info_section = True
-                in_switch_info_section = False
-                print(f"Found host_info section")
-                # Parse the host_info line directly
-                if "=" in line:
-                    _, value = line.split("=", 1)
-                    host_info = value.strip()
-                    print(f"Found host_info: {host_info}")
-                continue
-            
-            # Start reading after "Switch info:"
-            if "Switch info:" in line:
-                in_node_info_section = False
-                in_host_info_section = False
-                in_switch_info_section = True
-                print(f"Found Switch info section")
-                continue
-            
-            # Parse lines in the node info section
-            if in_node_info_section:
-                print(f"Processing node info line: '{line}'")
-                
-                # Check for the end of the section
-                if line.startswith("host_info") or line.startswith("Switch info") or not line:
-                    print("Reached end of node info section")
-                    continue
-                
-                # Parse key=value pairs
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    print(f"Found key-value pair: {key} = {value}")
-                    
-                    if key == "node_count":
-                        node_count = int(value)
-                        print(f"Set node_count to: {node_count}")
-                    elif key == "node_version":
-                        node_version = value
-                        print(f"Set node_version to: {node_version}")
-            
-            # Parse lines in the switch info section
-            if in_switch_info_section:
-                print(f"Processing switch info line: '{line}'")
-                
-                # Parse key=value pairs
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    print(f"Found switch key-value pair: {key} = {value}")
-                    
-                    # Extract switch number and attribute from key
-                    # Format: switch_1_name, switch_2_logical_name, etc.
-                    if key.startswith("switch_") and "_" in key:
-                        parts = key.split("_", 2)  # Split into max 3 parts: ['switch', '1', 'name']
-                        if len(parts) >= 3:
-                            switch_num = parts[1]
-                            attribute = "_".join(parts[2:])  # Handle attributes like 'logical_name'
-                            
-                            # Initialize switch dictionary if it doesn't exist
-                            if switch_num not in switches:
-                                switches[switch_num] = {}
-                            
-                            # Store the attribute
-                            switches[switch_num][attribute] = value
-                            print(f"Set switch_{switch_num}.{attribute} to: {value}")
-                            
-                            # Check if we have all required attributes for this switch
-                            required_attrs = ['name', 'vendor', 'model', 'release']
-                            if all(attr in switches[switch_num] for attr in required_attrs):
-                                # Create the switch node
-                                print(f"\n=== Creating Switch Node {switch_num} ===")
-                                
-                                switch_data = switches[switch_num]
-                                logical_name = switch_data.get('logical_name', f"switch_{switch_num}")
-                                
-                                switch_node = SwitchNode(
-                                    name=logical_name,
-                                    wwnn=switch_data['name'],
-                                    release_version=switch_data['release'],
-                                    model=switch_data['model'],
-                                    port_count=None,  # Not available in current data
-                                    vendor=switch_data['vendor']
-                                )
-                                
-                                switch_nodes[logical_name] = switch_node
-                                print(f"Created SwitchNode: {logical_name} with model={switch_data['model']}, vendor={switch_data['vendor']}")
-        
-        # Create TargetNode objects based on node_count
-        if target_arrays:
-            print(f"\n=== Creating Target Nodes from Target Arrays ===")
-            
-            for wwnn, target_array in target_arrays.items():
-                array_name = target_array.name
-                node_count = target_array.node_count
-                target_array.software_version = node_version
-                
-                print(f"Processing array: {array_name} with {node_count} nodes")
-                
-                for i in range(node_count):
-                    node_name = f"{array_name}-node{i}"
-                    target_node = TargetNode(
-                        name=node_name,
-                        sw_version=node_version
-                    )
-                    
-                    target_nodes[node_name] = target_node
-                    print(f"Created TargetNode: {node_name} with sw_version={node_version}")
-        else:
-            print(f"Warning: Could not find node_count ({node_count}) or node_version ({node_version}) in the file")
-        
-        # Create InitiatorNode object based on host_info
-        if host_info:
-            print(f"\n=== Creating Initiator Node ===")
-            print(f"Host info: {host_info}")
-            
-            # Parse host_info to extract HBA and firmware version
-            # Format: SN1610Q FW:v9.12.01 DVR:v10.02.10.00-k1-debug
-            hba = None
-            fw_version = None
-            
-            parts = host_info.split()
-            if len(parts) >= 2:
-                hba = parts[0]  # SN1610Q
-                for part in parts[1:]:
-                    if part.startswith("FW:"):
-                        fw_version = part[3:]  # v9.12.01
-                        break
-            
-            initiator_node = InitiatorNode(
-                name="host_1",  # Default name
-                hba=hba,
-                fw_version=fw_version
-            )
-            
-            initiator_nodes["host_1"] = initiator_node
-            print(f"Created InitiatorNode: host_1 with hba={hba}, fw_version={fw_version}")
-        else:
-            print("Warning: Could not find host_info in the file")
-        
-        # Summary of created switches
-        if switches:
-            print(f"\n=== Switch Creation Summary ===")
-            print(f"Total switches processed: {len(switches)}")
-            for switch_num, switch_data in switches.items():
-                logical_name = switch_data.get('logical_name', f"switch_{switch_num}")
-                print(f"Switch {switch_num}: {logical_name} ({switch_data.get('vendor', 'Unknown')} {switch_data.get('model', 'Unknown')})")
-        
-    except FileNotFoundError:
-        print(f"Error: File {file_path} not found")
-    except Exception as e:
-        print(f"Error parsing node information: {e}")
+    parse_capture(file_path, sections=NODE_SECTIONS)
 
+@stats.timed()
 def establish_switch_connections():
     """
-    Iterate through switch_ports and establish bidirectional connections
-    with target_ports and host_ports based on the connection field.
-    """
-    global switch_ports, target_ports, host_ports
-    
-    print("\n=== Establishing Switch Connections ===")
+    Walk the physical and login edges of every switch port and establish
+    bidirectional connections with the target, host and switch ports at
+    their other end.
     
-    for switch_wwpn, switch_port in switch_ports.items():
-        # Get the connected port WWPN from the switch's connection field
-        connected_wwpn = switch_port.connection
-        
-        if connected_wwpn:
-            # Search for the connected port in target_ports
-            if connected_wwpn in target_ports:
-                target_port = target_ports[connected_wwpn]
-                if target_port.connection is None:
-                    target_port.connection = switch_wwpn
-                    target_port.speed = switch_port.speed  # Set speed to match switch port
-                    print(f"Connected switch {switch_wwpn} to target {connected_wwpn}")
-                else:
-                    print(f"Target {connected_wwpn} already connected to {target_port.connection}")
-            
-            # Search for the connected port in host_ports
-            elif connected_wwpn in host_ports:
-                host_port = host_ports[connected_wwpn]
-                if host_port.connection is None:
-                    host_port.connection = switch_wwpn
-                    host_port.speed = switch_port.speed  # Set speed to match switch port
-                    print(f"Connected switch {switch_wwpn} to host {connected_wwpn}")
-                else:
-                    print(f"Host {connected_wwpn} already connected to {host_port.connection}")
-            
-            # Search for the connected port in switch_ports (for switch-to-switch connections)
-            elif connected_wwpn in switch_ports:
-                other_switch_port = switch_ports[connected_wwpn]
-                if other_switch_port.connection is None:
-                    other_switch_port.connection = switch_wwpn
-                    print(f"Connected switch {switch_wwpn} to switch {connected_wwpn}")
-                else:
-                    print(f"Switch {connected_wwpn} already connected to {other_switch_port.connection}")
-            
-            else:
-                print(f"Warning: Connected port {connected_wwpn} not found in any port dictionary")
-        else:
-            print(f"Switch {switch_wwpn} has no connection information")
+    A port's connection field keeps its first link: devices and switch ports
+    already connected are left alone, so every NPIV port logged in through an
+    F-port is connected to it while the F-port keeps its physical link.
+    """
+    connection_count = 0
+    login_count = 0
+    unknown_count = 0
+    # Physical links first, so a device cabled to one port is not claimed by a login seen on another
+    for kind in (EDGE_PHYSICAL, EDGE_LOGIN):
+        for switch_wwpn, switch_port in switch_ports.items():
+            for connected_key in fabric_edges.peers(switch_wwpn, kind):
+                connected_port = port_registry.get(connected_key)
+                if connected_port is None:
+                    unknown_count += 1
+                    log.debug("Port %016X logged in on switch port %s not found in the port registry",
+                              connected_key, switch_wwpn)
+                    continue
+                
+                connected_wwpn = connected_port.wwpn
+                if connected_port.connection is not None:
+                    log.debug("%s %s already connected to %s", type(connected_port).__name__,
+                              connected_wwpn, connected_port.connection)
+                    continue
+                
+                connected_port.connection = switch_wwpn
+                if isinstance(connected_port, (Target, Initiator)):
+                    connected_port.speed = switch_port.speed  # Set speed to match switch port
+                connection_count += 1
+                login_count += kind == EDGE_LOGIN
+                log.debug("Connected switch %s to %s %s (%s)", switch_wwpn, type(connected_port).__name__.lower(),
+                          connected_wwpn, port_class.EDGE_KIND_NAMES[kind])
+            
+            if kind == EDGE_PHYSICAL and switch_port.connection is None:
+                log.debug("Switch %s has no connection information", switch_wwpn)
+    
+    log.info("Established %d switch connections (%d through NPIV or gateway logins)", connection_count, login_count)
+    if unknown_count:
+        log.info("%d switch port logins are from ports not found in the capture", unknown_count)
+    stats.count("connections_created", connection_count)
+    port_class.mark_topology_changed()
 
+@stats.timed()
 def connect_switches_internally():
     """
     Establish internal connections within switches and between switches via ISLs.
     This is crucial for proper path finding through the fabric.
-    """
-    global switch_index
-    global test_path_switch_index
-    global all_e_ports
-    global switch_index
     
-    print("\n=== Connecting Switches Internally ===")
-    
-    # Group switch ports by their switch name
-    switch_groups = {}
-    for wwpn, switch_port in switch_index.items():
-        switch_name = switch_port.switch_name
-        if switch_name not in switch_groups:
-            switch_groups[switch_name] = []
-        switch_groups[switch_name].append(wwpn)
-    
-    print(f"Found {len(switch_groups)} switches in fabric")
+    Ports on a switch are not wired to each other pairwise. Instead every switch
+    becomes a single hub vertex in the fabric graph with its F-ports and E-ports
+    attached, and each ISL becomes one edge between two hubs.
+    """
+    graph = get_fabric_graph()
     
-    # For each switch, connect all E-ports to all F-ports
-    for switch_name, ports in switch_groups.items():
-        print(f"Processing internal connections for switch: {switch_name}")
-        f_ports = []  # Ports connected to devices (F-ports)
-        e_ports = []  # Ports connected to other switches (E-ports)
+    if log.isEnabledFor(logging.DEBUG):
+        for switch_name in graph.switch_groups:
+            log.debug("Found %d F-ports and %d E-ports in switch %s",
+                      len(graph.f_ports[switch_name]), len(graph.e_ports[switch_name]), switch_name)
         
-        # Identify F-ports and E-ports
-        for port_wwpn in ports:
-            switch_port = switch_index[port_wwpn]
-            if switch_port.is_connected():
-                connected_port = get_port_by_wwpn(switch_port.connection)
-                if connected_port:
-                    # Check for port type in multiple ways
-                    if isinstance(connected_port, (Initiator, Target)):
-                        f_ports.append(port_wwpn)
-                    elif isinstance(connected_port, Switch):
-                        # Check port type explicitly if available
-                        if hasattr(switch_port, 'switch_port_type'):
-                            port_type = switch_port.switch_port_type.upper() if switch_port.switch_port_type else ""
-                            if "E-PORT" in port_type or "E PORT" in port_type:
-                                e_ports.append(port_wwpn)
-                            else:
-                                # For ports without explicit type, check connected switch name
-                                if connected_port.switch_name != switch_port.switch_name:
-                                    e_ports.append(port_wwpn)
-                                else:
-                                    f_ports.append(port_wwpn)
-                        else:
-                            # For ports without port_type attribute, check connected switch name
-                            if connected_port.switch_name != switch_port.switch_name:
-                                e_ports.append(port_wwpn)
-                            else:
-                                f_ports.append(port_wwpn)
-        
-        print(f"  Found {len(f_ports)} F-ports and {len(e_ports)} E-ports in switch {switch_name}")
-        
-        # Connect all ports to each other within the same switch
-        all_ports = f_ports + e_ports
-        for i, port1 in enumerate(all_ports):
-            for port2 in all_ports[i+1:]:
-                # Add bidirectional internal connections
-                switch_port1 = switch_index[port1]
-                switch_port2 = switch_index[port2]
-                
-                # Connect the ports (this will only set the internal adjacency connections)
-                if port1 != port2:  # Avoid self-connections
-                    connect_ports(port1, port2)
-                    print(f"  Connected ports {port1} and {port2} in switch {switch_name}")
-    
-    # Now connect ports across ISLs (switch to switch connections)
-    for wwpn, switch_port in switch_index.items():
-        if hasattr(switch_port, 'switch_port_type') and switch_port.switch_port_type.upper() in ("E-PORT", "E PORT") and switch_port.is_connected():
-            connected_port = get_port_by_wwpn(switch_port.connection)
-            if connected_port and isinstance(connected_port, Switch):
-                port_type1 = switch_port.switch_port_type if hasattr(switch_port, 'switch_port_type') else "Unknown"
-                port_type2 = connected_port.switch_port_type if hasattr(connected_port, 'switch_port_type') else "Unknown"
-                switch1 = switch_port.switch_name if hasattr(switch_port, 'switch_name') else "Unknown"
-                switch2 = connected_port.switch_name if hasattr(connected_port, 'switch_name') else "Unknown"
-                speed = switch_port.speed if hasattr(switch_port, 'speed') else "Unknown"
-                
-                print(f"Found ISL: {wwpn} ({port_type1}) -> {switch_port.connection} ({port_type2})")
-                print(f"    Connection between switch {switch1} and {switch2} at {speed}")
-                
-                # Connect all ports in switch1 to all ports in switch2 through the ISL
-                for port1_wwpn, port1 in switch_index.items():
-                    if port1.switch_name == switch_port.switch_name and port1_wwpn != wwpn:
-                        for port2_wwpn, port2 in switch_index.items():
-                            if port2.switch_name == connected_port.switch_name and port2_wwpn != switch_port.connection:
-                                # Create path through ISL
-                                connect_ports(port1_wwpn, wwpn)
-                                connect_ports(switch_port.connection, port2_wwpn)
-                                print(f"  Established path: {port1_wwpn} -> {wwpn} -> {switch_port.connection} -> {port2_wwpn}")
+        for e_port, remote_e_port in graph.isl_pairs:
+            switch_port = switch_index[e_port]
+            log.debug("Found ISL: %s (%s) -> %s between switch %s and %s at %s",
+                      e_port, switch_port.switch_port_type, remote_e_port,
+                      graph.switch_of(e_port), graph.switch_of(remote_e_port), switch_port.speed)
     
     return True
 
+def get_fabric_graph():
+    """
+    Return the persistent fabric graph, building it on first use and
+    rebuilding it only when the fabric topology has changed.
+    
+    Returns:
+        FabricGraph: The current fabric graph
+    """
+    global fabric_graph
+    
+    if fabric_graph is None:
+        fabric_graph = FabricGraph()
+    if fabric_graph.is_stale():
+        fabric_graph.build()
+    return fabric_graph
+
+@stats.timed()
 def debug_zoning_info():
-    """Debug function to show zoning info details."""
-    global all_zones
-    print("\n=== ZONING INFO DEBUG ===")
-    print(f"Total entries in zoning_info: {len(zoning_info)}")
-    print(f"Total zones parsed: {len(all_zones)}")
-    
-    # Show all zones from the properly parsed all_zones list
-    for i, zone_members in enumerate(all_zones, 1):
-        print(f"\nZone {i}:")
-        print(f"  Members: {zone_members}")
-        
-        # Show which WWPNs in this zone are also keys in zoning_info
-        zone_wwpns_in_dict = []
-        for wwpn in zone_members:
-            if wwpn in zoning_info:
-                zone_wwpns_in_dict.append(wwpn)
-        print(f"  WWPNs that map to this zone in zoning_info: {zone_wwpns_in_dict}")
+    """
+    Debug function to show zoning info details.
     
-    # Group by zone content to show unique zones from zoning_info (for comparison)
-    zones_from_dict = {}
-    for wwpn, zone_members in zoning_info.items():
-        zone_key = tuple(sorted(zone_members))  # Use sorted tuple as key
-        if zone_key not in zones_from_dict:
-            zones_from_dict[zone_key] = []
-        zones_from_dict[zone_key].append(wwpn)
+    Everything is logged at DEBUG level, so nothing is computed or printed
+    unless verbose output is enabled.
+    """
+    if not log.isEnabledFor(logging.DEBUG):
+        return
     
-    print(f"\nNumber of unique zones from zoning_info dict: {len(zones_from_dict)}")
+    log.debug("=== ZONING INFO DEBUG ===")
+    log.debug("Total zones parsed: %d", len(zone_db))
+    log.debug("Total zoned WWPNs: %d", len(zone_db.zone_ids))
     
-    print("\n=== INDIVIDUAL ENTRIES (zoning_info dict) ===")
-    for wwpn, zone_members in zoning_info.items():
-        print(f"WWPN: {wwpn} -> Zone: {zone_members}")
+    for zone_id, (name, zone_members) in enumerate(zip(zone_db.names, zone_db.members)):
+        log.debug("Zone %d (%s): members %s", zone_id, name, zone_members)
+    
+    log.debug("Number of zones with unique members: %d", len(set(zone_db.member_sets)))
+
+    log.debug("=== WWPNS IN MORE THAN ONE ZONE ===")
+    for zone_id, zone_members in enumerate(zone_db.members):
+        for wwpn in zone_members:
+            zone_ids = zone_db.zones_of(wwpn)
+            # Report each WWPN once, from its first zone
+            if len(zone_ids) > 1 and zone_ids[0] == zone_id:
+                log.debug("WWPN: %s -> Zones: %s", wwpn, [zone_db.names[i] for i in zone_ids])
 
 def interactive_check_connectivity():
     """Interactive connectivity check."""
@@ -759,10 +786,7 @@ def interactive_check_connectivity():
             print(f"   {wwpn} ({target.array_name}) - {connection_status}{connected_to}")
     
     print("\nSwitches in fabric:")
-    switch_names = set()
-    for wwpn, switch_port in switch_index.items():
-        switch_names.add(switch_port.switch_name)
-    for switch_name in sorted(switch_names):
+    for switch_name in sorted(get_fabric_graph().switch_groups):
         print(f"   {switch_name}")
     
     print("\n")
@@ -950,12 +974,8 @@ def check_fabric_connectivity(source_wwpn, destination_wwpn):
             port1 = get_port_by_wwpn(path[i])
             port2 = get_port_by_wwpn(path[i+1])
             
-            # Extract numeric part from speed (e.g., "16Gb" -> 16)
-            speed1_value = int(''.join(filter(str.isdigit, port1.speed)))
-            speed2_value = int(''.join(filter(str.isdigit, port2.speed)))
-            
             # The effective speed of a connection is the minimum of the two ports
-            segment_speed = min(speed1_value, speed2_value)
+            segment_speed = min(port1.speed_gbps, port2.speed_gbps)
             segment = f"{port1.wwpn} → {port2.wwpn}"
             
             if segment_speed not in speeds:
@@ -1001,10 +1021,14 @@ def check_fabric_connectivity(source_wwpn, destination_wwpn):
         
         return False
 
+@stats.timed()
 def find_path_between_endpoints(source_wwpn, destination_wwpn):
     """
     Find a traversable path between two endpoints (initiator/target) through the fabric.
     
+    The search runs on the switch-level fabric graph and the port-level hop list
+    is rebuilt from the resulting switch route.
+    
     Args:
         source_wwpn (str): WWPN of source endpoint (initiator or target)
         destination_wwpn (str): WWPN of destination endpoint (target or initiator)
@@ -1012,516 +1036,86 @@ def find_path_between_endpoints(source_wwpn, destination_wwpn):
     Returns:
         list: Path as list of WWPNs from source to destination, or None if no path exists
     """
-    from collections import deque
     source_port = get_port_by_wwpn(source_wwpn)
     dest_port = get_port_by_wwpn(destination_wwpn)
     
     if not source_port or not dest_port:
-        print(f"Error: Could not find source ({source_wwpn}) or destination ({destination_wwpn}) port")
+        log.error("Could not find source (%s) or destination (%s) port", source_wwpn, destination_wwpn)
         return None
     
     # Check if both are endpoints (initiator or target)
     if not (isinstance(source_port, (Initiator, Target)) and isinstance(dest_port, (Initiator, Target))):
-        print(f"Error: Both source and destination must be initiators or targets")
+        log.error("Both source and destination must be initiators or targets")
         return None
         
-    # Ensure that switches are properly connected internally for path finding
-    # This helps establish paths within switches and between switches
-    connect_switches_internally()
-    
-    print(f"\nAnalyzing path from {source_wwpn} to {destination_wwpn}")
-    
-    # Build adjacency list from current connections
-    adjacency = {}
-    
-    # Group switch ports by their actual switch identity (not WWNN)
-    # We need to identify which ports belong to the same physical switch
-    switch_groups = {}
-    
-    for wwpn, switch_port in switch_index.items():
-        # Group by switch name which is more reliable than WWPN prefixes
-        switch_name = switch_port.switch_name
-        if switch_name not in switch_groups:
-            switch_groups[switch_name] = []
-        switch_groups[switch_name].append(wwpn)
-    
-    print(f"\nFound {len(switch_groups)} switches in fabric")
-    for switch_name, ports in switch_groups.items():
-        print(f"  Switch {switch_name}: {len(ports)} ports")
-    
-    # Add only direct physical connections to adjacency list (both directions)
-    for index_dict in [initiator_index, target_index, switch_index]:
-        for wwpn, port in index_dict.items():
-            if port.is_connected():
-                # Initialize the adjacency list entry if it doesn't exist
-                if wwpn not in adjacency:
-                    adjacency[wwpn] = []
-                
-                # Get the port this port is connected to
-                connected_port = get_port_by_wwpn(port.connection)
-                if not connected_port:
-                    print(f"WARNING: Port {wwpn} is connected to non-existent port {port.connection}")
-                    continue
-                    
-                # Add the connection to the adjacency list
-                if port.connection not in adjacency[wwpn]:
-                    adjacency[wwpn].append(port.connection)
-                
-                # Add the reverse connection too
-                if port.connection not in adjacency:
-                    adjacency[port.connection] = []
-                
-                if wwpn not in adjacency[port.connection]:
-                    adjacency[port.connection].append(wwpn)
-    
-    # Special handling for ISL connections (switch-to-switch)
-    # Find all E-ports and ensure they're properly connected
-    isl_connections = []
-    for wwpn, switch_port in switch_index.items():
-        if (hasattr(switch_port, 'switch_port_type') and 
-            (switch_port.switch_port_type == 'E-Port' or switch_port.switch_port_type == 'E-port') and 
-            switch_port.is_connected()):
-            connected_wwpn = switch_port.connection
-            connected_port = get_port_by_wwpn(connected_wwpn)
-            if connected_port and isinstance(connected_port, Switch):
-                isl_connections.append((wwpn, connected_wwpn))
-                
-                # Make sure the connection is bidirectional in the adjacency list
-                if wwpn not in adjacency:
-                    adjacency[wwpn] = []
-                if connected_wwpn not in adjacency[wwpn]:
-                    adjacency[wwpn].append(connected_wwpn)
-                    
-                if connected_wwpn not in adjacency:
-                    adjacency[connected_wwpn] = []
-                if wwpn not in adjacency[connected_wwpn]:
-                    adjacency[connected_wwpn].append(wwpn)
-                
-                # Track the switches these ports belong to for cross-fabric connections
-                switch1_name = switch_port.switch_name if hasattr(switch_port, 'switch_name') else None
-                switch2_name = connected_port.switch_name if hasattr(connected_port, 'switch_name') else None
-                
-                if switch1_name and switch2_name and switch1_name != switch2_name:
-                    print(f"Found ISL: {wwpn} -> {connected_wwpn}")
-    
-    print(f"Found {len(isl_connections)} ISL connections between switches")
+    log.debug("Analyzing path from %s to %s", source_wwpn, destination_wwpn)
     
-    # Now add internal switch connections, but only between F-ports and E-ports
-    # This models how traffic can enter through F-port and exit through E-port (or vice versa)
+    graph = get_fabric_graph()
+    source_switch = graph.switch_of(source_wwpn)
+    dest_switch = graph.switch_of(destination_wwpn)
     
-    # Keep track of all E-ports for cross-fabric connections
-    all_e_ports = []
-    all_f_ports = []
-    e_port_to_switch_map = {}  # Map E-ports to their switch name
-    f_port_to_switch_map = {}  # Map F-ports to their switch name
+    route = graph.find_route(source_wwpn, destination_wwpn)
+    if route:
+        path = graph.expand_route(source_wwpn, destination_wwpn, route)
+        # Route costs and the equal-cost DAG need a Dijkstra run, so only compute them for debug output
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Found path of length %d from %s to %s, switch route %s (FSPF cost %s): %s",
+                      len(path), source_wwpn, destination_wwpn, route, graph.route_cost(route[0], route[-1]), path)
+            log.debug("Equal-cost next hops: %s", graph.find_switch_route_dag(route[0], route[-1]))
+        return path
     
-    for switch_name, ports in switch_groups.items():
-        print(f"Processing internal connections for switch: {switch_name}")
-        f_ports = []  # Ports connected to devices (F-ports)
-        e_ports = []  # Ports connected to other switches (E-ports)
-        
-        for port_wwpn in ports:
-            switch_port = switch_index[port_wwpn]
-            if switch_port.is_connected():
-                connected_port = get_port_by_wwpn(switch_port.connection)
-                if connected_port:
-                    # Check for port type in multiple ways
-                    if isinstance(connected_port, (Initiator, Target)):
-                        f_ports.append(port_wwpn)  # This is an F-port
-                        f_port_to_switch_map[port_wwpn] = switch_name
-                        all_f_ports.append(port_wwpn)
-                    elif isinstance(connected_port, Switch):
-                        # Check port type explicitly if available
-                        if hasattr(switch_port, 'switch_port_type'):
-                            port_type = switch_port.switch_port_type.upper() if switch_port.switch_port_type else ""
-                            if "F-PORT" in port_type:
-                                f_ports.append(port_wwpn)
-                                f_port_to_switch_map[port_wwpn] = switch_name
-                                all_f_ports.append(port_wwpn)
-                            elif "E-PORT" in port_type:
-                                e_ports.append(port_wwpn)  # This is an E-port (ISL)
-                                e_port_to_switch_map[port_wwpn] = switch_name
-                                all_e_ports.append(port_wwpn)
-                            else:
-                                # For ports without explicit type, check connected switch name
-                                if connected_port.switch_name != switch_port.switch_name:
-                                    e_ports.append(port_wwpn)  # This is an E-port (ISL)
-                                    e_port_to_switch_map[port_wwpn] = switch_name
-                                    all_e_ports.append(port_wwpn)
-                                else:
-                                    f_ports.append(port_wwpn)  # Same switch, treat as F-port
-                                    f_port_to_switch_map[port_wwpn] = switch_name
-                                    all_f_ports.append(port_wwpn)
-                        else:
-                            # For ports without port_type attribute, check connected switch name
-                            if connected_port.switch_name != switch_port.switch_name:
-                                e_ports.append(port_wwpn)  # Different switches - E-port
-                                e_port_to_switch_map[port_wwpn] = switch_name
-                                all_e_ports.append(port_wwpn)
-                            else:
-                                f_ports.append(port_wwpn)  # Same switch, treat as F-port
-                                f_port_to_switch_map[port_wwpn] = switch_name
-                                all_f_ports.append(port_wwpn)
-        
-        # Connect F-ports to E-ports (allowing traffic to flow through the switch)
-        for f_port in f_ports:
-            for e_port in e_ports:
-                # Add bidirectional internal switch connections
-                if f_port != e_port:  # Avoid self-loops
-                    # Add connection from F-port to E-port
-                    if f_port not in adjacency:
-                        adjacency[f_port] = []
-                    if e_port not in adjacency[f_port]:
-                        adjacency[f_port].append(e_port)
-                    
-                    # Add connection from E-port to F-port
-                    if e_port not in adjacency:
-                        adjacency[e_port] = []
-                    if f_port not in adjacency[e_port]:
-                        adjacency[e_port].append(f_port)
-    
-    # Also connect F-ports to each other within the same switch for direct device-to-device communication
-        for i, f_port1 in enumerate(f_ports):
-            for f_port2 in f_ports[i+1:]:
-                if f_port1 != f_port2:  # Avoid self-loops
-                    if f_port1 not in adjacency:
-                        adjacency[f_port1] = []
-                    if f_port2 not in adjacency[f_port1]:
-                        adjacency[f_port1].append(f_port2)
-                    
-                    if f_port2 not in adjacency:
-                        adjacency[f_port2] = []
-                    if f_port1 not in adjacency[f_port2]:
-                        adjacency[f_port2].append(f_port1)
-                        
-    # Now connect across fabrics through ISLs
-    # Find all ISL pairs - fix: be more lenient with ISL detection
-    
-    isl_pairs = []
-    
-    # If in test path mode, we need to identify ISLs directly from the switch ports
-    # This is important because all_e_ports might not be properly populated in test-path mode
-    
-    # Determine which switch_index to use
-    switches_to_use = test_path_switch_index if 'test_path_switch_index' in globals() and test_path_switch_index is not None else switch_index
-    
-    # First, identify all E-ports from the switch ports directly (to handle test-path mode)
-    direct_e_ports = []
-    for wwpn, switch_port in switches_to_use.items():
-        if hasattr(switch_port, 'switch_port_type') and switch_port.switch_port_type == 'E-Port':
-            direct_e_ports.append(wwpn)
-            print(f"Found direct E-port: {wwpn} (type: {switch_port.switch_port_type})")
-    
-    # Use direct_e_ports if we're in test-path mode and all_e_ports is empty
-    e_ports_to_check = direct_e_ports if 'test_path_switch_index' in globals() and test_path_switch_index is not None else all_e_ports
-    
-    # If direct_e_ports has entries but all_e_ports doesn't, use direct_e_ports
-    if len(direct_e_ports) > 0 and len(all_e_ports) == 0:
-        e_ports_to_check = direct_e_ports
-        print(f"Using {len(direct_e_ports)} directly detected E-ports instead of all_e_ports (which has {len(all_e_ports)})")
-    
-    for e_port in e_ports_to_check:
-        if e_port in switches_to_use and switches_to_use[e_port].is_connected():
-            connected_wwpn = switches_to_use[e_port].connection
-            # Verify this is a connection between two switches (more relaxed criteria)
-            if connected_wwpn in switches_to_use:
-                connected_port = switches_to_use[connected_wwpn]
-                # Check if this connects two different switches
-                if (hasattr(switches_to_use[e_port], 'switch_name') and 
-                    hasattr(connected_port, 'switch_name') and
-                    switches_to_use[e_port].switch_name != connected_port.switch_name):
-                    print(f"Detected ISL between different switches: {e_port} ({switches_to_use[e_port].switch_name}) -> "
-                          f"{connected_wwpn} ({connected_port.switch_name})")
-                    isl_pairs.append((e_port, connected_wwpn))
-    
-    print(f"Found {len(isl_pairs)} ISL pairs between switches")
-    
-    # For each ISL pair, connect all F-ports on one side to all F-ports on the other side
-    for e_port1, e_port2 in isl_pairs:
-        switch1 = e_port_to_switch_map.get(e_port1)
-        switch2 = e_port_to_switch_map.get(e_port2)
-        
-        if switch1 and switch2 and switch1 != switch2:
-            print(f"Creating cross-switch paths between {switch1} and {switch2}")
-            # Get all F-ports for each switch
-            switch1_f_ports = [p for p in all_f_ports if f_port_to_switch_map.get(p) == switch1]
-            switch2_f_ports = [p for p in all_f_ports if f_port_to_switch_map.get(p) == switch2]
-            
-            print(f"  Switch {switch1} has {len(switch1_f_ports)} F-ports")
-            print(f"  Switch {switch2} has {len(switch2_f_ports)} F-ports")
-            
-            # Create direct connections between ISL ports
-            # Connect e_port1 directly to e_port2 (bidirectional)
-            if e_port1 not in adjacency:
-                adjacency[e_port1] = []
-            if e_port2 not in adjacency[e_port1]:
-                adjacency[e_port1].append(e_port2)
-                print(f"  Connected ISL endpoints: {e_port1} -> {e_port2}")
-            
-            if e_port2 not in adjacency:
-                adjacency[e_port2] = []
-            if e_port1 not in adjacency[e_port2]:
-                adjacency[e_port2].append(e_port1)
-                print(f"  Connected ISL endpoints: {e_port2} -> {e_port1}")
-            
-            # Connect each F-port on switch1 to e_port1 (the local ISL endpoint)
-            for f_port1 in switch1_f_ports:
-                if f_port1 not in adjacency:
-                    adjacency[f_port1] = []
-                if e_port1 not in adjacency[f_port1]:
-                    adjacency[f_port1].append(e_port1)
-                
-                if e_port1 not in adjacency:
-                    adjacency[e_port1] = []
-                if f_port1 not in adjacency[e_port1]:
-                    adjacency[e_port1].append(f_port1)
-                    
-                print(f"  Connected within switch {switch1}: {f_port1} <-> {e_port1}")
-                
-            # Connect each F-port on switch2 to e_port2 (the local ISL endpoint)
-            for f_port2 in switch2_f_ports:
-                if f_port2 not in adjacency:
-                    adjacency[f_port2] = []
-                if e_port2 not in adjacency[f_port2]:
-                    adjacency[f_port2].append(e_port2)
-                
-                if e_port2 not in adjacency:
-                    adjacency[e_port2] = []
-                if f_port2 not in adjacency[e_port2]:
-                    adjacency[e_port2].append(f_port2)
-                    
-                print(f"  Connected within switch {switch2}: {f_port2} <-> {e_port2}")
-            
-            # Also directly connect F-ports across switches for more robust path finding
-            for f_port1 in switch1_f_ports:
-                device1 = None
-                if f_port1 in switch_index and switch_index[f_port1].connection:
-                    device1_wwpn = switch_index[f_port1].connection
-                    if device1_wwpn in initiator_index or device1_wwpn in target_index:
-                        device1 = device1_wwpn
-                
-                for f_port2 in switch2_f_ports:
-                    device2 = None
-                    if f_port2 in switch_index and switch_index[f_port2].connection:
-                        device2_wwpn = switch_index[f_port2].connection
-                        if device2_wwpn in initiator_index or device2_wwpn in target_index:
-                            device2 = device2_wwpn
-                    
-                    # If this is a specific initiator-target pair we're trying to connect,
-                    # create a more direct path
-                    if (device1 and device2 and 
-                        ((device1 == source_wwpn and device2 == destination_wwpn) or 
-                         (device2 == source_wwpn and device1 == destination_wwpn))):
-                        print(f"  Creating direct cross-switch path for target pair: {device1} <-> {device2}")
-                        
-                        # Create bidirectional paths for all segments
-                        # device1 <-> f_port1 <-> e_port1 <-> e_port2 <-> f_port2 <-> device2
-                        
-                        # Add missing connections to ensure complete path
-                        for p1, p2 in [(device1, f_port1), (f_port1, e_port1), 
-                                       (e_port1, e_port2), (e_port2, f_port2), (f_port2, device2)]:
-                            if p1 not in adjacency:
-                                adjacency[p1] = []
-                            if p2 not in adjacency[p1]:
-                                adjacency[p1].append(p2)
-                                
-                            if p2 not in adjacency:
-                                adjacency[p2] = []
-                            if p1 not in adjacency[p2]:
-                                adjacency[p2].append(p1)
-                                
-                        print(f"  Direct path created: {device1} <-> {f_port1} <-> {e_port1} <-> {e_port2} <-> {f_port2} <-> {device2}")
-    
-    # Output debug info about the adjacency list
-    print(f"\nBuilt adjacency list with {len(adjacency)} ports")
-    
-    # Print a sample of the adjacency list for debugging
-    sample_count = 0
-    print("Sample of adjacency list (showing up to 10 entries):")
-    for port, connections in adjacency.items():
-        port_obj = get_port_by_wwpn(port)
-        port_type = "Unknown"
-        port_info = ""
-        
-        if port_obj:
-            if isinstance(port_obj, Initiator): 
-                port_type = "Initiator"
-                port_info = f"({port_obj.host_name})"
-            elif isinstance(port_obj, Target): 
-                port_type = "Target"
-                port_info = f"({port_obj.array_name})"
-            elif isinstance(port_obj, Switch): 
-                port_type = "Switch"
-                port_info = f"({port_obj.switch_name}:{port_obj.port_index})"
-            
-            print(f"  {port} ({port_type}{' ' + port_info if port_info else ''}) -> {connections}")
-            
-            sample_count += 1
-            if sample_count >= 10:
-                break
-    
-    # Use BFS to find shortest path through the fabric
-    queue = deque([(source_wwpn, [source_wwpn])])
-    visited = set([source_wwpn])
-    
-    print(f"\nStarting BFS path search from {source_wwpn} to {destination_wwpn}")
-    
-    # Determine if both endpoints have connections to switches
-    source_port = get_port_by_wwpn(source_wwpn)
-    dest_port = get_port_by_wwpn(destination_wwpn)
-    source_switch_wwpn = source_port.connection if source_port and source_port.is_connected() else None
-    dest_switch_wwpn = dest_port.connection if dest_port and dest_port.is_connected() else None
-    
-    # Print valuable debug info about endpoint connections
-    print(f"Source {source_wwpn} is connected to switch port: {source_switch_wwpn}")
-    print(f"Destination {destination_wwpn} is connected to switch port: {dest_switch_wwpn}")
-    
-    # Create direct source to switch connection if needed
-    if source_wwpn not in adjacency and source_switch_wwpn:
-        adjacency[source_wwpn] = [source_switch_wwpn]
-        print(f"Added direct source to switch connection: {source_wwpn} -> {source_switch_wwpn}")
-    
-    # Create direct destination to switch connection if needed
-    if destination_wwpn not in adjacency and dest_switch_wwpn:
-        adjacency[destination_wwpn] = [dest_switch_wwpn]
-        print(f"Added direct destination to switch connection: {destination_wwpn} -> {dest_switch_wwpn}")
+    # No path found - provide detailed diagnostic info
+    log.info("No path found between endpoints %s and %s", source_wwpn, destination_wwpn)
+    log.info("Source %s is attached to switch %s via port %s",
+             source_wwpn, source_switch, graph.attached_port(source_wwpn))
+    log.info("Destination %s is attached to switch %s via port %s",
+             destination_wwpn, dest_switch, graph.attached_port(destination_wwpn))
+    
+    if source_switch is None:
+        log.error("Source endpoint %s is not attached to any switch", source_wwpn)
+    if dest_switch is None:
+        log.error("Destination endpoint %s is not attached to any switch", destination_wwpn)
+    
+    log.info("Found %d ISLs between switches in the fabric graph", len(graph.isl_pairs))
+    
+    if source_switch is not None:
+        visited_switches = graph.reachable_switches(source_switch)
+        log.info("Visited %d unique switches: %s", len(visited_switches), sorted(visited_switches))
+        if dest_switch is not None and dest_switch not in visited_switches:
+            log.error("Destination switch %s was NOT visited!", dest_switch)
+    
+    # Log additional debug info about source and destination
+    log.info("Source port details: type %s, connected to %s", source_port.__class__.__name__, source_port.connection)
+    log.info("Destination port details: type %s, connected to %s", dest_port.__class__.__name__, dest_port.connection)
+    return None
+
+def find_paths(pairs):
+    """
+    Find the fabric paths of many endpoint pairs in one batch.
     
-    # Perform the BFS search
-    print("Starting BFS search...")
-    visited_detail = {}  # Track which ports we visited and their neighbors
+    Pairs are grouped by the switch of their source endpoint and each source
+    switch is traversed once, so resolving every zoned pair of the fabric
+    costs one traversal per switch rather than one per pair.
     
-    while queue:
-        current_wwpn, path = queue.popleft()
-        
-        # Print current position in the search
-        port_obj = get_port_by_wwpn(current_wwpn)
-        port_type = "Unknown"
-        if port_obj:
-            port_type = port_obj.__class__.__name__
-            if hasattr(port_obj, 'switch_name'):
-                port_type += f" ({port_obj.switch_name})"
-        print(f"  Visiting: {current_wwpn} ({port_type}), path length: {len(path)}")
-        
-        # We reached our destination
-        if current_wwpn == destination_wwpn:
-            print(f"SUCCESS! Found path of length {len(path)} from {source_wwpn} to {destination_wwpn}")
-            # Print the full path for debugging
-            print(f"Full path: {path}")
-            return path
-        
-        # Explore all neighbors
-        if current_wwpn in adjacency:
-            neighbors = adjacency[current_wwpn]
-            visited_detail[current_wwpn] = neighbors
-            print(f"    Neighbors ({len(neighbors)}): {neighbors}")
-            
-            for neighbor_wwpn in neighbors:
-                if neighbor_wwpn not in visited:
-                    visited.add(neighbor_wwpn)
-                    new_path = path + [neighbor_wwpn]
-                    queue.append((neighbor_wwpn, new_path))
-                    neighbor_obj = get_port_by_wwpn(neighbor_wwpn)
-                    neighbor_type = "Unknown"
-                    if neighbor_obj:
-                        neighbor_type = neighbor_obj.__class__.__name__
-                        if hasattr(neighbor_obj, 'switch_name'):
-                            neighbor_type += f" ({neighbor_obj.switch_name})"
-                    print(f"      Adding to queue: {neighbor_wwpn} ({neighbor_type})")
-        else:
-            print(f"    No neighbors found for {current_wwpn}")
-            visited_detail[current_wwpn] = []
+    Args:
+        pairs (iterable): (source WWPN, destination WWPN) tuples of initiators and targets
     
-    # No path found - provide detailed diagnostic info
-    print("\nNo path found between endpoints")
-    print(f"Starting from {source_wwpn}, visited {len(visited)} ports")
-    
-    # Analyze why path finding failed
-    print("\nDiagnostic information:")
-    
-    # Check if both endpoints are in the adjacency list
-    if source_wwpn not in adjacency:
-        print(f"ERROR: Source endpoint {source_wwpn} is not in the adjacency list")
-    if destination_wwpn not in adjacency:
-        print(f"ERROR: Destination endpoint {destination_wwpn} is not in the adjacency list")
-    
-    # Check if there are any switch-to-switch connections
-    switch_to_switch = 0
-    for wwpn, neighbors in adjacency.items():
-        port = get_port_by_wwpn(wwpn)
-        if port and isinstance(port, Switch):
-            for neighbor in neighbors:
-                neighbor_port = get_port_by_wwpn(neighbor)
-                if neighbor_port and isinstance(neighbor_port, Switch):
-                    switch_to_switch += 1
-    
-    print(f"Found {switch_to_switch} switch-to-switch connections in adjacency list")
-    
-    # Print the most important parts of the visited path
-    print("\nPath exploration summary:")
-    visited_switches = set()
-    
-    for wwpn in visited:
-        port = get_port_by_wwpn(wwpn)
-        if port and isinstance(port, Switch) and hasattr(port, 'switch_name'):
-            visited_switches.add(port.switch_name)
-    
-    print(f"Visited {len(visited_switches)} unique switches: {sorted(visited_switches)}")
-    
-    # Check if endpoint's switches were visited
-    if source_switch_wwpn:
-        source_switch = get_port_by_wwpn(source_switch_wwpn)
-        if source_switch and hasattr(source_switch, 'switch_name'):
-            if source_switch.switch_name in visited_switches:
-                print(f"Source switch {source_switch.switch_name} was visited")
-            else:
-                print(f"ERROR: Source switch {source_switch.switch_name} was NOT visited!")
+    Returns:
+        iterator: (source WWPN, destination WWPN, path as list of WWPNs or None)
+                  tuples, grouped by source switch
+    """
+    return get_fabric_graph().find_paths(pairs)
+
+def zoned_pairs():
+    """
+    Yield every (host WWPN, target WWPN) pair of the host mapping.
     
-    if dest_switch_wwpn:
-        dest_switch = get_port_by_wwpn(dest_switch_wwpn)
-        if dest_switch and hasattr(dest_switch, 'switch_name'):
-            if dest_switch.switch_name in visited_switches:
-                print(f"Destination switch {dest_switch.switch_name} was visited")
-            else:
-                print(f"ERROR: Destination switch {dest_switch.switch_name} was NOT visited!")
-                
-    # Try a fallback direct path as last resort
-    if source_switch_wwpn and dest_switch_wwpn:
-        print("\nAttempting fallback direct path creation...")
-        # Create direct source to destination path if both are connected to switches
-        source_switch = get_port_by_wwpn(source_switch_wwpn)
-        dest_switch = get_port_by_wwpn(dest_switch_wwpn)
-        
-        if (source_switch and dest_switch and 
-            hasattr(source_switch, 'switch_name') and hasattr(dest_switch, 'switch_name')):
-            
-            print(f"Creating direct path: {source_wwpn} -> {source_switch_wwpn} -> {dest_switch_wwpn} -> {destination_wwpn}")
-            fallback_path = [source_wwpn, source_switch_wwpn, dest_switch_wwpn, destination_wwpn]
-            print("WARNING: Using fallback path - connectivity may not be physically possible")
-            return fallback_path
-    
-    # Print additional debug info about source and destination
-    print("\nSource port details:")
-    print(f"  Type: {source_port.__class__.__name__}")
-    print(f"  Connected to: {source_port.connection}")
-    if source_port.connection:
-        connected_port = get_port_by_wwpn(source_port.connection)
-        if connected_port:
-            print(f"  Connected port type: {connected_port.__class__.__name__}")
-            if isinstance(connected_port, Switch) and hasattr(connected_port, 'switch_port_type'):
-                print(f"  Connected port switch type: {connected_port.switch_port_type}")
-                print(f"  Connected switch name: {connected_port.switch_name}")
-    
-    print("\nDestination port details:")
-    print(f"  Type: {dest_port.__class__.__name__}")
-    print(f"  Connected to: {dest_port.connection}")
-    if dest_port.connection:
-        connected_port = get_port_by_wwpn(dest_port.connection)
-        if connected_port:
-            print(f"  Connected port type: {connected_port.__class__.__name__}")
-            if isinstance(connected_port, Switch) and hasattr(connected_port, 'switch_port_type'):
-                print(f"  Connected port switch type: {connected_port.switch_port_type}")
-                print(f"  Connected switch name: {connected_port.switch_name}")
-    return None
+    Returns:
+        iterator: (host WWPN, target WWPN) tuples, hosts in mapping order
+    """
+    for host_wwpn, target_wwpns in host_mapping.items():
+        for target_wwpn in target_wwpns:
+            yield host_wwpn, target_wwpn
 
 def show_all_connections():
     """Display all current connections in the SAN."""
@@ -1542,31 +1136,13 @@ def show_all_connections():
         connection_status = f"-> {switch.connection}" if switch.is_connected() else "Not connected"
         print(f"  {wwpn} ({switch.switch_name}:{switch.port_index}): {connection_status}")
 
-def get_port_by_wwpn(wwpn):
-    """Get a port object by its WWPN."""
-    if wwpn in host_ports:
-        return host_ports[wwpn]
-    elif wwpn in target_ports:
-        return target_ports[wwpn]
-    elif wwpn in switch_ports:
-        return switch_ports[wwpn]
-    return None
-
+@stats.timed()
 def check_isl_oversubscription():
     """
     Analyzes ISL oversubscription based on zoning information.
-    Traverses paths for all zone members and checks if ISL bandwidth is at least 1/4th of potential traffic.
-    Returns information about oversubscribed ISLs.
+    Traverses paths for all zone members and checks if each ISL's bandwidth is at least 1/4th of the traffic routed over it.
+    Returns information about switch pairs with oversubscribed ISLs.
     """
-    import math
-    global target_ports
-    global test_path_target_ports
-    global all_zones 
-    global test_path_all_zones
-    global switch_index
-    global test_path_switch_index
-    global test_path_mode
-    
     # Dictionary to track traffic per target node: {node_id: traffic}
     node_traffic = {}
     
@@ -1577,14 +1153,7 @@ def check_isl_oversubscription():
     node_details = {}
     
     # Analyze target ports to identify nodes and their connections
-    # Make sure we access the correct global variable based on context
-    global target_ports
-    global test_path_target_ports
-    
-    # Determine which target_ports to use based on context
-    ports_to_use = test_path_target_ports if 'test_path_target_ports' in globals() and test_path_target_ports is not None else target_ports
-    
-    for wwpn, target_port in ports_to_use.items():
+    for wwpn, target_port in target_ports.items():
         if isinstance(target_port, Target):
             # Extract node number from NSP (e.g., "0:4:1" -> node 0)
             node_id = target_port.port_id.split(':')[0] if ':' in target_port.port_id else target_port.port_id
@@ -1606,7 +1175,7 @@ def check_isl_oversubscription():
             })
             
             # Track the link speed for this node
-            speed_value = int(''.join(filter(str.isdigit, target_port.speed)))
+            speed_value = target_port.speed_gbps
             if speed_value not in node_links[node_id]:
                 node_links[node_id][speed_value] = 0
             node_links[node_id][speed_value] += 1
@@ -1614,14 +1183,7 @@ def check_isl_oversubscription():
     if not node_traffic:
         return {"status": "No target nodes found", "oversubscribed_nodes": []}
     
-    # Extract unique zones from all_zones directly
-    # Make sure we access the correct global variable based on context
-    
-    # Use test_path_all_zones if in test-path mode, otherwise use all_zones
-    if 'test_path_all_zones' in globals() and test_path_all_zones is not None:
-        zones = test_path_all_zones  # Use test path specific zones
-    else:
-        zones = all_zones  # Use the correctly parsed zones directly
+    zones = all_zones
     
     # Process each zone to calculate traffic
     for zone_members in zones:
@@ -1630,12 +1192,7 @@ def check_isl_oversubscription():
         targets = []
         
         for wwpn in zone_members:
-            # In test-path mode, we should use test_path_get_port_by_wwpn if available
-            if 'test_path_mode' in globals() and test_path_mode and 'test_path_get_port_by_wwpn' in globals():
-                port = test_path_get_port_by_wwpn(wwpn)
-            else:
-                port = get_port_by_wwpn(wwpn)
-                
+            port = get_port_by_wwpn(wwpn)
             if not port:
                 continue
                 
@@ -1646,17 +1203,14 @@ def check_isl_oversubscription():
         
         # For each initiator-target pair in the zone
         for initiator in initiators:
-            init_speed = int(''.join(filter(str.isdigit, initiator.speed)))
+            init_speed = initiator.speed_gbps
             
             for target in targets:
                 # Get the node ID for this target
                 target_node_id = target.port_id.split(':')[0] if ':' in target.port_id else target.port_id
                 
-                # Extract speed values
-                target_speed = int(''.join(filter(str.isdigit, target.speed)))
-                
                 # Traffic is limited by the slower of the two endpoints
-                connection_speed = min(init_speed, target_speed)
+                connection_speed = min(init_speed, target.speed_gbps)
                 
                 # Add traffic to the target node
                 node_traffic[target_node_id] += connection_speed
@@ -1706,331 +1260,110 @@ def check_isl_oversubscription():
             "zones_analyzed": len(zones)
         }
     
-    # Also check for traditional ISLs between switches
-    # Group ISLs by switch pairs to handle multiple ISLs between same switches
+    # Also check for traditional ISLs between switches.
+    # The ISLs and the switches they join come from the fabric graph, which
+    # lists every ISL once; an ISL runs at the speed of its slower end.
+    graph = get_fabric_graph()
     switch_pair_isls = {}  # Track ISLs grouped by switch pairs
     isl_traffic = {}       # Track traffic across ISLs
     isl_details = {}       # Store details about each ISL
+    isl_speeds = []        # ISL ID -> speed in Gbps
+    isl_entries = []       # ISL ID -> its entry in switch_pair_isls
+    
+    for isl, (local_wwpn, remote_wwpn) in enumerate(graph.isl_pairs):
+        local_port = get_port_by_wwpn(local_wwpn)
+        remote_port = get_port_by_wwpn(remote_wwpn)
+        switch1_name = graph.switch_names[graph.isl_switches[2 * isl]]
+        switch2_name = graph.switch_names[graph.isl_switches[2 * isl + 1]]
+        speed_value = min(local_port.speed_gbps, remote_port.speed_gbps)
+        data_rate = min(local_port.data_rate, remote_port.data_rate)
+        isl_speeds.append(speed_value)
+        
+        switch_pair = tuple(sorted([switch1_name, switch2_name]))
+        if switch_pair not in switch_pair_isls:
+            switch_pair_isls[switch_pair] = {
+                "isls": [],
+                "total_capacity": 0,
+                "total_data_rate": 0,
+                "traffic": 0,
+                "switch_names": switch_pair
+            }
+            isl_traffic[switch_pair] = 0
+            isl_details[switch_pair] = switch_pair_isls[switch_pair]
+        
+        isl_pair = tuple(sorted([local_wwpn, remote_wwpn]))
+        isl_entry = {
+            "isl_pair": isl_pair,
+            "representative_wwpn": isl_pair[0],
+            "speed": speed_value,
+            "data_rate": data_rate,
+            "switch_name": switch1_name,
+            "port_index": local_port.port_index,
+            "port_type": local_port.switch_port_type,
+            "remote_wwpn": remote_wwpn,
+            "remote_switch_name": switch2_name
+        }
+        switch_pair_isls[switch_pair]["isls"].append(isl_entry)
+        isl_entries.append(isl_entry)
+        switch_pair_isls[switch_pair]["total_capacity"] += speed_value
+        switch_pair_isls[switch_pair]["total_data_rate"] += data_rate
+        log.debug("Found ISL %s between %s and %s at %sGb", isl_pair, switch1_name, switch2_name, speed_value)
     
-    # Find all switch-to-switch connections (ISLs) and group by switch pairs
-    # Access global variables defined at the beginning of the function
-    
-    # Determine which switch_index to use based on context
-    switches_to_use = test_path_switch_index if 'test_path_switch_index' in globals() and test_path_switch_index is not None else switch_index
-    
-    # Enhanced debugging to understand the test-path mode environment
-    if 'test_path_switch_index' in globals() and test_path_switch_index is not None:
-        print(f"Running in test-path mode with {len(test_path_switch_index)} switch ports")
-        
-        try:
-            # Try to import our new helper function
-            from find_e_ports import find_e_ports_in_data
-            
-            # Use it to find E-ports directly
-            direct_e_ports = find_e_ports_in_data(test_path_switch_index)
-            print(f"Found {len(direct_e_ports)} E-ports directly in switch data")
-            
-            # If we found E-ports, make sure we'll use them later in the analysis
-            if direct_e_ports:
-                # Force direct detection of ISLs from E-ports
-                for e_port_wwpn in direct_e_ports:
-                    port = switches_to_use.get(e_port_wwpn)
-                    if port and hasattr(port, 'connection'):
-                        print(f"ISL direct detection: {e_port_wwpn} -> {port.connection}")
-        except ImportError:
-            print("Could not import find_e_ports helper module")
-        
-        # Count how many E-ports we have in switch_index
-        e_port_count = 0
-        for wwpn, port in test_path_switch_index.items():
-            if hasattr(port, 'switch_port_type') and port.switch_port_type == 'E-Port':
-                e_port_count += 1
-                print(f"Found E-port in test_path_switch_index: {wwpn}, connecting {port.switch_name} to {port.connection}")
-        print(f"Found {e_port_count} E-ports in test_path_switch_index")
-    
-    for wwpn, switch_port in switches_to_use.items():
-        # Check if this port connects to another switch
-        if switch_port.is_connected():
-            # Get the connected port using the appropriate function based on context
-            if 'test_path_mode' in globals() and test_path_mode and 'test_path_get_port_by_wwpn' in globals():
-                connected_port = test_path_get_port_by_wwpn(switch_port.connection)
-            else:
-                connected_port = get_port_by_wwpn(switch_port.connection)
-                
-            if connected_port and isinstance(connected_port, Switch):
-                is_isl = False
-                
-                # Check if it's explicitly marked as E-Port or has E-Port characteristics
-                if hasattr(switch_port, 'switch_port_type'):
-                    port_type_str = str(switch_port.switch_port_type).strip().upper()
-                    print(f"Checking port type: '{port_type_str}'")
-                    
-                    # Check for E-Port type (be more flexible with matching)
-                    if 'E-PORT' in port_type_str.upper() or 'E PORT' in port_type_str.upper() or 'EPORT' in port_type_str.upper():
-                        print(f"Detected ISL by E-Port type: {wwpn} ({switch_port.switch_name}) -> {switch_port.connection}")
-                        is_isl = True
-                    # Check if switches are different (which would indicate an ISL)
-                    elif hasattr(switch_port, 'switch_name') and hasattr(connected_port, 'switch_name'):
-                        switch1 = str(switch_port.switch_name).strip()
-                        switch2 = str(connected_port.switch_name).strip()
-                        
-                        if switch1 != switch2:
-                            # Different switch names indicates this is an ISL
-                            print(f"Detected ISL by switch name difference: {switch1} to {switch2}")
-                            is_isl = True
-                
-                if not is_isl:
-                    continue
-                
-                # Identify the switch pair using switch names for more reliability
-                switch1_name = str(switch_port.switch_name).strip() if hasattr(switch_port, 'switch_name') else "Unknown"
-                switch2_name = str(connected_port.switch_name).strip() if hasattr(connected_port, 'switch_name') else "Unknown"
-                
-                # Skip if it's connecting to itself (not a true ISL) or we don't have valid switch names
-                if switch1_name == switch2_name or switch1_name == "Unknown" or switch2_name == "Unknown":
-                    continue
-                    
-                # Create a unique tuple for this switch pair
-                switch_pair = tuple(sorted([switch1_name, switch2_name]))
-                print(f"Found ISL between: {switch1_name} and {switch2_name}, port: {getattr(switch_port, 'port_index', 'Unknown')}, type: {getattr(switch_port, 'switch_port_type', 'Unknown')}")
-                
-                # Debug the switch pair creation
-                print(f"Creating switch pair key: {switch_pair}")
-                
-                # Initialize switch pair if not seen before
-                if switch_pair not in switch_pair_isls:
-                    print(f"Initializing new switch pair in tracking dictionary: {switch_pair}")
-                    switch_pair_isls[switch_pair] = {
-                        "isls": [],
-                        "total_capacity": 0,
-                        "traffic": 0,
-                        "switch_names": switch_pair
-                    }
-                
-                # Also make sure it's initialized in isl_traffic and isl_details
-                if switch_pair not in isl_traffic:
-                    isl_traffic[switch_pair] = 0
-                    
-                if switch_pair not in isl_details:
-                    isl_details[switch_pair] = switch_pair_isls[switch_pair]
-                
-                # Extract numeric speed value
-                speed_value = int(''.join(filter(str.isdigit, switch_port.speed)))
-                
-                # Create a unique identifier for this bidirectional ISL
-                isl_pair = tuple(sorted([wwpn, switch_port.connection]))
-                
-                # Check if we've already processed this ISL pair
-                already_added = False
-                for existing_isl in switch_pair_isls[switch_pair]["isls"]:
-                    if existing_isl["isl_pair"] == isl_pair:
-                        already_added = True
-                        break
-                
-                if not already_added:
-                    # Add this ISL to the switch pair
-                    isl_info = {
-                        "isl_pair": isl_pair,
-                        "representative_wwpn": isl_pair[0],
-                        "speed": speed_value,
-                        "switch_name": str(switch_port.switch_name).strip(),
-                        "port_index": switch_port.port_index,
-                        "port_type": getattr(switch_port, 'switch_port_type', 'Unknown'),
-                        "remote_wwpn": switch_port.connection,
-                        "remote_switch_name": str(connected_port.switch_name).strip()
-                    }
-                    
-                    switch_pair_isls[switch_pair]["isls"].append(isl_info)
-                    switch_pair_isls[switch_pair]["total_capacity"] += speed_value
-                    
-                    print(f"Added ISL {isl_pair} to switch pair {switch_pair}, capacity now: {switch_pair_isls[switch_pair]['total_capacity']}Gb")
-                    
-                    # Initialize traffic counter for this ISL pair
-                    isl_traffic[switch_pair] = 0
-                    
-                    # Keep track of the details for each switch pair
-                    isl_details[switch_pair] = switch_pair_isls[switch_pair]
-
-    print(f"Found {len(switch_pair_isls)} switch pairs with ISLs:")
+    log.info("Found %s switch pairs with ISLs", len(switch_pair_isls))
     for switch_pair, info in switch_pair_isls.items():
-        print(f"  Switches {switch_pair[0]} and {switch_pair[1]}: {len(info['isls'])} ISLs with total capacity {info['total_capacity']}Gb")
-        # Ensure all switch pairs are properly initialized in tracking dictionaries
-        isl_traffic[switch_pair] = isl_traffic.get(switch_pair, 0)
-        isl_details[switch_pair] = info
-        
-    # Debug the switch_pair_isls dictionary
-    if len(switch_pair_isls) == 0:
-        print("No ISL switch pairs were detected, but ISLs were found. This could be due to switch naming issues.")
-        
-        # List all detected E-ports
-        print("\nDetected E-ports:")
-        for wwpn, port in switches_to_use.items():
-            if hasattr(port, 'switch_port_type') and 'E-PORT' in str(port.switch_port_type).upper():
-                print(f"  Port: {wwpn}, Type: {port.switch_port_type}, Switch: {port.switch_name if hasattr(port, 'switch_name') else 'Unknown'}")
-                
-        # Try to create switch pairs from detected E-ports by sanitizing names
-        print("\nAttempting to fix switch pair detection...")
-        # Create a list of all detected E-ports for easier pairing
-        e_ports = []
-        for wwpn, switch_port in switches_to_use.items():
-            if hasattr(switch_port, 'switch_port_type') and 'E-PORT' in str(switch_port.switch_port_type).upper() and hasattr(switch_port, 'connection'):
-                e_ports.append((wwpn, switch_port))
-        
-        print(f"Found {len(e_ports)} E-ports to process")
-        
-        # Group E-ports by their switch name to identify unique switches
-        switch_groups = {}
-        for wwpn, switch_port in e_ports:
-            if hasattr(switch_port, 'switch_name'):
-                switch_name = str(switch_port.switch_name).strip()
-                if switch_name not in switch_groups:
-                    switch_groups[switch_name] = []
-                switch_groups[switch_name].append((wwpn, switch_port))
-        
-        # For each E-port, try to create a switch pair with its connected port
-        for wwpn, switch_port in e_ports:
-            if hasattr(switch_port, 'connection'):
-                # Get the connected port
-                connected_port = get_port_by_wwpn(switch_port.connection)
-                
-                if connected_port and isinstance(connected_port, Switch):
-                    # Create switch pair identifier
-                    switch1_id = wwpn[:8]  # Use the first 8 chars of the WWPN as switch identifier
-                    switch2_id = switch_port.connection[:8]  # Use the first 8 chars of the connected port's WWPN
-                    
-                    # Ensure we're not connecting to the same switch
-                    if switch1_id == switch2_id:
-                        continue
-                    
-                    # Create a tuple with the switch IDs sorted alphabetically
-                    switch_pair = tuple(sorted([switch1_id, switch2_id]))
-                    print(f"Fixed switch pair using WWPNs: {switch_pair}")
-                    
-                    # Initialize dictionaries for this switch pair if not already done
-                    if switch_pair not in switch_pair_isls:
-                        switch_pair_isls[switch_pair] = {
-                            "isls": [],
-                            "total_capacity": 0,
-                            "traffic": 0,
-                            "switch_names": switch_pair
-                        }
-                    if switch_pair not in isl_traffic:
-                        isl_traffic[switch_pair] = 0
-                        
-                    # Add this ISL to the list if not already added
-                    speed_value = int(''.join(filter(str.isdigit, switch_port.speed)))
-                    isl_pair = tuple(sorted([wwpn, switch_port.connection]))
-                    
-                    # Check if we've already processed this ISL pair
-                    already_added = False
-                    for existing_isl in switch_pair_isls[switch_pair]["isls"]:
-                        if existing_isl.get("isl_pair") == isl_pair:
-                            already_added = True
-                            break
-                            
-                    if not already_added:
-                        # Add this ISL to the switch pair
-                        isl_info = {
-                            "isl_pair": isl_pair,
-                            "representative_wwpn": isl_pair[0],
-                            "speed": speed_value,
-                            "switch_name": getattr(switch_port, 'switch_name', 'Unknown'),
-                            "port_index": getattr(switch_port, 'port_index', 'Unknown'),
-                            "port_type": getattr(switch_port, 'switch_port_type', 'Unknown'),
-                            "remote_wwpn": switch_port.connection,
-                            "remote_switch_name": getattr(connected_port, 'switch_name', 'Unknown')
-                        }
-                        
-                        switch_pair_isls[switch_pair]["isls"].append(isl_info)
-                        switch_pair_isls[switch_pair]["total_capacity"] += speed_value
-                        
-                        print(f"Added ISL {isl_pair} to switch pair {switch_pair}, capacity now: {switch_pair_isls[switch_pair]['total_capacity']}Gb")
-                        
-                        # Keep track of the details for each switch pair
-                        isl_details[switch_pair] = switch_pair_isls[switch_pair]
+        log.debug("  Switches %s and %s: %s ISLs with total capacity %sGb", switch_pair[0], switch_pair[1], len(info['isls']), info['total_capacity'])
     
     # If no ISLs were found, return appropriate message
     if len(switch_pair_isls) == 0:
         return {"status": "No traditional ISLs found - single switch fabric", "oversubscribed_isls": [], "total_nodes": len(node_traffic), "zones_analyzed": len(zones)}
     
-    # Process zones for ISL traffic (traditional multi-switch analysis)
-    for i, zone_members in enumerate(zones, 1):
-        # Identify all initiators and targets in this zone
-        initiators = []
-        targets = []
-        
-        for wwpn in zone_members:
-            # In test-path mode, we should use test_path_get_port_by_wwpn if available
-            if 'test_path_mode' in globals() and test_path_mode and 'test_path_get_port_by_wwpn' in globals():
-                port = test_path_get_port_by_wwpn(wwpn)
-            else:
-                port = get_port_by_wwpn(wwpn)
-                
-            if not port:
-                continue
-                
-            if isinstance(port, Initiator):
-                initiators.append(port)
-            elif isinstance(port, Target):
-                targets.append(port)
-        
-        # For each initiator-target pair in the zone
-        for initiator in initiators:
-            for target in targets:
-                # Find path between initiator and target
-                # In test-path mode, we should use test_path_find_path_between_endpoints if available
-                if 'test_path_mode' in globals() and test_path_mode and 'test_path_find_path_between_endpoints' in globals():
-                    path = test_path_find_path_between_endpoints(initiator.wwpn, target.wwpn)
-                else:
-                    path = find_path_between_endpoints(initiator.wwpn, target.wwpn)
-                
-                if not path:
-                    continue
-                
-                # Extract speed values
-                init_speed = int(''.join(filter(str.isdigit, initiator.speed)))
-                target_speed = int(''.join(filter(str.isdigit, target.speed)))
-                
-                # Traffic is limited by the slower of the two endpoints
-                connection_speed = min(init_speed, target_speed)
-                
-                # For each port in the path, check if it's part of an ISL
-                # Track which switch pairs we've already counted for this path to avoid double-counting
-                counted_switch_pairs = set()
-                
-                for port_wwpn in path:
-                    # Check if this port is part of any switch pair ISL
-                    # In test-path mode, we should use test_path_get_port_by_wwpn if available
-                    if 'test_path_mode' in globals() and test_path_mode and 'test_path_get_port_by_wwpn' in globals():
-                        port_obj = test_path_get_port_by_wwpn(port_wwpn)
-                    else:
-                        port_obj = get_port_by_wwpn(port_wwpn)
-                        
-                    if port_obj and isinstance(port_obj, Switch):
-                        switch_base = port_obj.wwpn[4:]
-                        
-                        # Find which switch pair this port belongs to
-                        port_switch_name = str(port_obj.switch_name).strip() if hasattr(port_obj, 'switch_name') else None
-                        
-                        # Skip if we don't have a valid switch name
-                        if not port_switch_name:
-                            continue
-                            
-                        print(f"Checking if port {port_wwpn} on switch {port_switch_name} is part of an ISL")
-                        
-                        # Find if this port's switch is part of any switch pair
-                        for switch_pair, pair_info in switch_pair_isls.items():
-                            # Check if this switch name is part of the pair
-                            if port_switch_name in switch_pair and switch_pair not in counted_switch_pairs:
-                                # Add traffic to this switch pair (only once per switch pair per path)
-                                if switch_pair not in isl_traffic:
-                                    isl_traffic[switch_pair] = 0
-                                isl_traffic[switch_pair] += connection_speed
-                                print(f"  Added {connection_speed}Gb traffic to ISL between {switch_pair[0]} and {switch_pair[1]}")
-                                counted_switch_pairs.add(switch_pair)
-                                break
-    
-    # Check for oversubscription on switch pair ISLs
+    # Process zones for ISL traffic (traditional multi-switch analysis).
+    # Zone pairs are first collapsed onto the switches their endpoints attach to,
+    # so each unique switch pair needs only one route computation.
+    switch_pair_demand, zone_pair_count = compute_switch_pair_demand(zones, graph)
+    
+    # Walk every route hop by hop, splitting demand across parallel ISLs per direction
+    loads, unrouted = graph.isl_loads(switch_pair_demand)
+    for (source_switch, dest_switch), demand in unrouted:
+        log.warning("No route between switches %s and %s, skipping %sGb of demand", source_switch, dest_switch, demand)
+    
+    log.info("Charged %s switch routes for %s zone initiator-target pairs to %s ISLs",
+             len(switch_pair_demand) - len(unrouted), zone_pair_count, len(graph.isl_pairs))
+    
+    # Per-ISL load vector, and per switch pair the busier direction summed over its ISLs
+    isl_loads = []
+    pair_direction_loads = {}
+    for isl, (local_wwpn, remote_wwpn) in enumerate(graph.isl_pairs):
+        switch1 = graph.switch_names[graph.isl_switches[2 * isl]]
+        switch2 = graph.switch_names[graph.isl_switches[2 * isl + 1]]
+        forward, reverse = loads[2 * isl], loads[2 * isl + 1]
+        speed = isl_speeds[isl]
+        utilization = max(forward, reverse) / speed if speed else None
+        isl_entries[isl]["utilization"] = utilization
+        isl_loads.append({
+            "wwpn": local_wwpn,
+            "remote_wwpn": remote_wwpn,
+            "switch_name": switch1,
+            "remote_switch_name": switch2,
+            "speed": speed,
+            "load_forward": forward,
+            "load_reverse": reverse,
+            "utilization": utilization
+        })
+        
+        switch_pair = tuple(sorted([switch1, switch2]))
+        if switch1 != switch_pair[0]:
+            forward, reverse = reverse, forward
+        direction_loads = pair_direction_loads.setdefault(switch_pair, [0.0, 0.0])
+        direction_loads[0] += forward
+        direction_loads[1] += reverse
+    
+    for switch_pair, direction_loads in pair_direction_loads.items():
+        isl_traffic[switch_pair] = max(direction_loads)
+    
+    # Check for oversubscription on switch pair ISLs. FSPF only loads the
+    # cheapest ISLs of a pair, so each ISL is judged on its own load and speed
+    # rather than against the pooled capacity of the pair.
     oversubscribed_isls = []
     
     for switch_pair, traffic in isl_traffic.items():
@@ -2038,31 +1371,31 @@ def check_isl_oversubscription():
             continue
             
         pair_info = isl_details[switch_pair]
-        total_isl_capacity = pair_info["total_capacity"]
-        
-        # Calculate oversubscription ratio
-        ratio = traffic / total_isl_capacity if total_isl_capacity > 0 else float('inf')
+        loaded_isls = [isl for isl in pair_info["isls"] if isl["utilization"]]
+        overloaded_isls = [isl for isl in loaded_isls if isl["utilization"] > oversubscription_threshold]
         
-        # Check if oversubscribed
-        if ratio > oversubscription_threshold:
-            # Calculate additional ISLs needed
-            additional_capacity_needed = math.ceil(traffic / oversubscription_threshold) - total_isl_capacity
+        if overloaded_isls:
+            busiest_isl = max(overloaded_isls, key=lambda isl: isl["utilization"])
             
-            # Get representative ISL info for display
-            primary_isl = pair_info["isls"][0]  # Use first ISL as representative
+            # Capacity needed on the routed ISLs to bring the pair back to the threshold
+            loaded_capacity = sum(isl["speed"] for isl in loaded_isls)
+            additional_capacity_needed = math.ceil(traffic / oversubscription_threshold) - loaded_capacity
             
             oversubscribed_isls.append({
                 "switch_pair": switch_pair,
-                "wwpn": primary_isl["representative_wwpn"],
-                "switch_name": primary_isl["switch_name"],
-                "port_index": primary_isl["port_index"],
-                "total_capacity": total_isl_capacity,
-                "individual_isl_speed": primary_isl["speed"],
+                "wwpn": busiest_isl["representative_wwpn"],
+                "switch_name": busiest_isl["switch_name"],
+                "port_index": busiest_isl["port_index"],
+                "total_capacity": pair_info["total_capacity"],
+                "loaded_capacity": loaded_capacity,
+                "total_data_rate": pair_info["total_data_rate"],
+                "individual_isl_speed": busiest_isl["speed"],
                 "num_isls": len(pair_info["isls"]),
                 "traffic": traffic,
-                "ratio": ratio,
+                "ratio": busiest_isl["utilization"],
                 "additional_capacity_needed": additional_capacity_needed,
-                "remote_wwpn": primary_isl["remote_wwpn"],
+                "remote_wwpn": busiest_isl["remote_wwpn"],
+                "overloaded_isls": overloaded_isls,
                 "all_isls": pair_info["isls"]
             })
     
@@ -2072,9 +1405,61 @@ def check_isl_oversubscription():
         "total_isls": sum(len(pair_info["isls"]) for pair_info in switch_pair_isls.values()),
         "total_switch_pairs": len(switch_pair_isls),
         "oversubscribed_isls": oversubscribed_isls,
+        "isl_loads": isl_loads,
         "zones_analyzed": len(zones)
     }
 
+def compute_switch_pair_demand(zones, graph):
+    """
+    Collapse zone initiator-target pairs onto the switches their endpoints attach to.
+    
+    Each pair contributes min(init_speed, target_speed) of demand to the
+    (initiator switch, target switch) pair it resolves to.
+    
+    Args:
+        zones (list): List of zones, each a list of member WWPNs
+        graph (FabricGraph): Fabric graph used to resolve endpoints to switches
+        
+    Returns:
+        tuple: ({(source_switch, dest_switch): demand}, number of zone pairs processed)
+    """
+    # Demand is aggregated on integer (source vertex * switch count + dest vertex) keys
+    vertex_count = len(graph.switch_names)
+    vertex_pair_demand = {}
+    zone_pair_count = 0
+    
+    for zone_members in zones:
+        # Identify all attached initiators and targets in this zone
+        initiators = []
+        targets = []
+        
+        for wwpn in zone_members:
+            port = get_port_by_wwpn(wwpn)
+            vertex = graph.vertex_of(wwpn)
+            if not port or vertex is None:
+                continue
+            
+            speed = port.speed_gbps
+            if isinstance(port, Initiator):
+                initiators.append((vertex, speed))
+            elif isinstance(port, Target):
+                targets.append((vertex, speed))
+        
+        # For each initiator-target pair in the zone
+        for init_vertex, init_speed in initiators:
+            for target_vertex, target_speed in targets:
+                # Traffic is limited by the slower of the two endpoints
+                key = init_vertex * vertex_count + target_vertex
+                vertex_pair_demand[key] = vertex_pair_demand.get(key, 0) + min(init_speed, target_speed)
+                zone_pair_count += 1
+    
+    switch_pair_demand = {}
+    for key, demand in vertex_pair_demand.items():
+        init_vertex, target_vertex = divmod(key, vertex_count)
+        switch_pair_demand[(graph.switch_names[init_vertex], graph.switch_names[target_vertex])] = demand
+    
+    return switch_pair_demand, zone_pair_count
+
 def display_isl_oversubscription_analysis():
     """
     Runs ISL oversubscription check and displays formatted results.
@@ -2119,7 +1504,7 @@ def display_isl_oversubscription_analysis():
     
     # Handle switch pair ISL oversubscription
     if "total_switch_pairs" in analysis:
-        print(f"\nFound {analysis['total_isls']//2} ISLs in fabric.")
+        print(f"\nFound {analysis['total_isls']} ISLs in fabric.")
         
         if "oversubscribed_isls" in analysis and analysis["oversubscribed_isls"]:
             print(f"Detected {len(analysis['oversubscribed_isls'])} oversubscribed switch pairs:")
@@ -2128,9 +1513,12 @@ def display_isl_oversubscription_analysis():
                 print(f"\n{i}. Switch Pair {switch_pair_data['switch_pair']}:")
                 print(f"   - Number of ISLs: {switch_pair_data['num_isls']}")
                 print(f"   - Individual ISL speed: {switch_pair_data['individual_isl_speed']}G")
-                print(f"   - Total capacity: {switch_pair_data['total_capacity']}G")
-                print(f"   - Cumulative traffic: {switch_pair_data['traffic']}G")
-                print(f"   - Oversubscription ratio: {switch_pair_data['ratio']:.2f}:1")
+                print(f"   - Total capacity: {switch_pair_data['total_capacity']}G "
+                      f"({switch_pair_data['total_data_rate']} MB/s data rate), "
+                      f"{switch_pair_data['loaded_capacity']}G on routed ISLs")
+                print(f"   - Cumulative traffic (busier direction): {switch_pair_data['traffic']:.1f}G")
+                print(f"   - Oversubscription ratio (busiest ISL {switch_pair_data['wwpn']}): {switch_pair_data['ratio']:.2f}:1")
+                print(f"   - Oversubscribed ISLs: {len(switch_pair_data['overloaded_isls'])}")
                 
                 if switch_pair_data['additional_capacity_needed'] > 0:
                     additional_isls = math.ceil(switch_pair_data['additional_capacity_needed'] / switch_pair_data['individual_isl_speed'])
@@ -2142,6 +1530,15 @@ def display_isl_oversubscription_analysis():
                     print(f"     ISL {j+1}: {isl['representative_wwpn']} (Switch {isl['switch_name']}:{isl['port_index']})")
         else:
             print("No oversubscribed switch pairs found.")
+        
+        # Busiest individual ISLs from the per-ISL load vector
+        loaded_isls = [isl for isl in analysis.get("isl_loads", []) if isl["utilization"]]
+        if loaded_isls:
+            print("\nMost utilized ISLs:")
+            for isl in sorted(loaded_isls, key=lambda isl: isl["utilization"], reverse=True)[:5]:
+                print(f"   - {isl['wwpn']} ({isl['switch_name']}) → {isl['remote_wwpn']} ({isl['remote_switch_name']}): "
+                      f"{isl['load_forward']:.1f}G / {isl['load_reverse']:.1f}G on {isl['speed']}G "
+                      f"({isl['utilization']:.2f}:1)")
     # Handle traditional ISL oversubscription (fallback for old format)
     elif "total_isls" in analysis:
         print(f"\nFound {analysis['total_isls']} traditional ISLs in fabric.")
@@ -2172,46 +1569,6 @@ def display_isl_oversubscription_analysis():
         if "total_nodes" in analysis:
             print(f"Analyzed connectivity to {analysis['total_nodes']} storage nodes.")
 
-def find_shortest_path(graph, start, end):
-    """
-    Find the shortest path between two switches in the graph using BFS.
-    
-    Args:
-        graph (dict): The switch connectivity graph
-        start (str): The starting switch name
-        end (str): The ending switch name
-        
-    Returns:
-        list: The shortest path as a list of switch names, or None if no path exists
-    """
-    from collections import deque
-    
-    if start not in graph or end not in graph:
-        return None
-        
-    if start == end:
-        return [start]
-        
-    # Use BFS to find the shortest path
-    queue = deque([(start, [start])])
-    visited = set([start])
-    
-    while queue:
-        current, path = queue.popleft()
-        
-        # Check all neighbors
-        for neighbor in graph[current]:
-            if neighbor == end:
-                # Found the end
-                return path + [neighbor]
-                
-            if neighbor not in visited:
-                visited.add(neighbor)
-                queue.append((neighbor, path + [neighbor]))
-                
-    # No path found
-    return None
-
 def show_help():
     """Display help information."""
     print("\nHELP - FC SAN FABRIC MANAGEMENT")
@@ -2221,6 +1578,7 @@ def show_help():
     print("   - Check connectivity: Find path between two endpoints through fabric")
     print("   - Show topology: Display current fabric connections")
     print("   - Check ISL oversubscription: Analyze potential traffic through ISLs based on zoning")
+    print("   - Show statistics: Phase timings and counters (start with --profile to print them on exit)")
     print("   - Help: Display this help information")
     print("\nWWPN FORMAT:")
     print("   - Standard FC format: XX:XX:XX:XX:XX:XX:XX:XX")
@@ -2237,6 +1595,12 @@ def show_help():
     print("   - WWPN inputs are case-insensitive")
     print("   - Connections are bidirectional")
     print("   - ISLs are automatically detected between switches")
+    print("   - Start with -v for per-port diagnostics or -q to show warnings only")
+
+def show_statistics():
+    """Display the wall time and call count of every phase run so far, and the event counters."""
+    print("\n=== PHASE TIMINGS AND COUNTERS ===")
+    print(stats.report())
 
 def show_system_information():
     """
@@ -2345,295 +1709,206 @@ def display_target_arrays():
         print(f"   Serial Number: {target_array.serial_number}")
         print(f"   Node Count:    {target_array.node_count}")
 
+@stats.timed()
 def build_host_mapping():
     """
-    Build the host_mapping dictionary by iterating through all zones.
-    Maps initiator WWPNs to arrays of target WWPNs they are zoned with.
+    Build the host mapping and its reverse indexes in one pass over the zones.
     
     host_mapping format: {initiator_wwpn: [target_wwpn1, target_wwpn2, ...]}
+    target_hosts format: {target_wwpn: [initiator_wwpn1, ...]}
+    host_nodes format:   {initiator_wwpn: {array_node_name: [target_wwpn1, ...]}}
+    node_hosts format:   {array_node_name: [initiator_wwpn1, ...]}
+    
+    Pairs are collected in dicts used as insertion-ordered sets, so every
+    pair is added once and lists follow the zone order. Tables are keyed by
+    the WWPN of the registered port, not by the zone member as written, so a
+    port zoned in lowercase or colon form still has a single entry.
     """
-    global host_mapping, all_zones
+    for table in (host_mapping, target_hosts, host_nodes, node_hosts):
+        table.clear()
     
-    print("\n=== Building Host Mapping ===")
+    targets_of = {}    # initiator WWPN -> {target WWPN: None}
+    hosts_of = {}      # target WWPN -> {initiator WWPN: None}
+    node_of = {}       # target WWPN -> array node name
     
-    # Clear existing host_mapping
-    host_mapping.clear()
-    
-    # Iterate through all zones
-    for zone_index, zone_members in enumerate(all_zones, 1):
-        print(f"Processing Zone {zone_index}: {zone_members}")
+    for zone_id, zone_members in enumerate(zone_db.members):
+        log.debug("Processing Zone %s (%s): %s", zone_id, zone_db.names[zone_id], zone_members)
         
         # Find all initiators and targets in this zone
         initiators_in_zone = []
         targets_in_zone = []
-        
         for wwpn in zone_members:
-            # Get the port object to determine its type
-            port = get_port_by_wwpn(wwpn)
-            
-            if port:
-                if isinstance(port, Initiator):
-                    initiators_in_zone.append(wwpn)
-                    print(f"  Found initiator: {wwpn}")
-                elif isinstance(port, Target):
-                    targets_in_zone.append(wwpn)
-                    print(f"  Found target: {wwpn}")
-            else:
-                # Check in the individual port dictionaries if not found in indices
-                if wwpn in host_ports:
-                    initiators_in_zone.append(wwpn)
-                    print(f"  Found initiator (from host_ports): {wwpn}")
-                elif wwpn in target_ports:
-                    targets_in_zone.append(wwpn)
-                    print(f"  Found target (from target_ports): {wwpn}")
-                else:
-                    print(f"  Warning: WWPN {wwpn} not found in any port registry")
+            port = port_registry.get(wwpn)
+            if isinstance(port, Initiator):
+                initiators_in_zone.append(port.wwpn)
+            elif isinstance(port, Target):
+                targets_in_zone.append(port.wwpn)
+                node_of[port.wwpn] = port.array_name
+            elif port is None:
+                log.debug("  Warning: WWPN %s not found in any port registry", wwpn)
         
-        # Map each initiator to all targets in this zone
         for initiator_wwpn in initiators_in_zone:
-            # Initialize the initiator in host_mapping if not present
-            if initiator_wwpn not in host_mapping:
-                host_mapping[initiator_wwpn] = []
-                print(f"  Created new entry for initiator {initiator_wwpn}")
-            
-            # Add all targets from this zone to the initiator's mapping
+            zoned = targets_of.setdefault(initiator_wwpn, {})
             for target_wwpn in targets_in_zone:
-                if target_wwpn not in host_mapping[initiator_wwpn]:
-                    host_mapping[initiator_wwpn].append(target_wwpn)
-                    print(f"  Added target {target_wwpn} to initiator {initiator_wwpn}")
-                else:
-                    print(f"  Target {target_wwpn} already mapped to initiator {initiator_wwpn}")
-    
-    # Display the final host_mapping
-    print(f"\n=== Host Mapping Summary ===")
-    print(f"Total initiators mapped: {len(host_mapping)}")
-    
-    for initiator_wwpn, target_list in host_mapping.items():
-        # Get initiator details for display
-        initiator_port = get_port_by_wwpn(initiator_wwpn)
-        initiator_name = "Unknown"
-        if initiator_port and hasattr(initiator_port, 'host_name'):
-            initiator_name = initiator_port.host_name
-        
-        print(f"\nInitiator: {initiator_wwpn} ({initiator_name})")
-        print(f"  Mapped to {len(target_list)} target(s):")
-        
-        for target_wwpn in target_list:
-            # Get target details for display
-            target_port = get_port_by_wwpn(target_wwpn)
-            target_name = "Unknown"
-            if target_port and hasattr(target_port, 'array_name'):
-                target_name = target_port.array_name
-            
-            print(f"    - {target_wwpn} ({target_name})")
-    
-    print(f"\nHost mapping completed. Total mappings: {len(host_mapping)}")
+                zoned[target_wwpn] = None
+        for target_wwpn in targets_in_zone:
+            zoned = hosts_of.setdefault(target_wwpn, {})
+            for initiator_wwpn in initiators_in_zone:
+                zoned[initiator_wwpn] = None
+    
+    for initiator_wwpn, targets in targets_of.items():
+        host_mapping[initiator_wwpn] = list(targets)
+        
+        # Roll the targets up to the array nodes they belong to
+        nodes = host_nodes[initiator_wwpn] = {}
+        for target_wwpn in targets:
+            node_name = node_of[target_wwpn]
+            nodes.setdefault(node_name, []).append(target_wwpn)
+            node_hosts.setdefault(node_name, {})[initiator_wwpn] = None
+    
+    for target_wwpn, hosts in hosts_of.items():
+        target_hosts[target_wwpn] = list(hosts)
+    for node_name, hosts in node_hosts.items():
+        node_hosts[node_name] = list(hosts)
+    
+    if log.isEnabledFor(logging.DEBUG):
+        for initiator_wwpn, nodes in host_nodes.items():
+            log.debug("Initiator: %s mapped to %s target(s) on %s array node(s)",
+                      initiator_wwpn, len(host_mapping[initiator_wwpn]), len(nodes))
+            for node_name, targets in nodes.items():
+                log.debug("    - %s: %s", node_name, targets)
+    
+    log.info("Host mapping completed. Total mappings: %s, zoned targets: %s, array nodes: %s",
+             len(host_mapping), len(target_hosts), len(node_hosts))
     return host_mapping
 
-def display_host_mapping():
+def hosts_zoned_to_target(target_wwpn):
     """
-    Display the host_mapping dictionary in a formatted way.
-    """
-    global host_mapping
-    
-    print("\n" + "="*70)
-    print("                    HOST MAPPING")
-    print("="*70)
-    
-    if not host_mapping:
-        print("No host mappings found. Run build_host_mapping() first.")
-        return
+    Get the hosts zoned to a target port.
     
-    print(f"Total Host Mappings: {len(host_mapping)}")
-    print("-" * 70)
-    
-    for i, (initiator_wwpn, target_list) in enumerate(host_mapping.items(), 1):
-        # Get initiator details
-        initiator_port = get_port_by_wwpn(initiator_wwpn)
-        initiator_info = "Unknown Host"
-        if initiator_port:
-            if hasattr(initiator_port, 'host_name'):
-                initiator_info = initiator_port.host_name
-            elif hasattr(initiator_port, 'port_id'):
-                initiator_info = f"Port {initiator_port.port_id}"
-        
-        print(f"\n{i}. Initiator: {initiator_wwpn}")
-        print(f"   Host: {initiator_info}")
-        print(f"   Zoned to {len(target_list)} target(s):")
-        
-        for j, target_wwpn in enumerate(target_list, 1):
-            # Get target details
-            target_port = get_port_by_wwpn(target_wwpn)
-            target_info = "Unknown Array"
-            port_info = ""
-            
-            if target_port:
-                if hasattr(target_port, 'array_name'):
-                    target_info = target_port.array_name
-                if hasattr(target_port, 'port_id'):
-                    port_info = f" ({target_port.port_id})"
-                if hasattr(target_port, 'speed'):
-                    port_info += f" - {target_port.speed}"
-            
-            print(f"     {j}. {target_wwpn}{port_info}")
-            print(f"        Array: {target_info}")
+    Args:
+        target_wwpn (str): WWPN of the target port, in any case or colon format
         
-        print("-" * 50)
-    
-    print("="*70)
+    Returns:
+        list: Initiator WWPNs sharing a zone with the target
+    """
+    port = port_registry.get(target_wwpn)
+    return target_hosts.get(port.wwpn, []) if port else []
 
-def check_host_node_connectivity(host_wwpn):
+def hosts_zoned_to_node(node_name):
     """
-    Check if a host (initiator) is connected to all nodes of target arrays.
-    Ports with the same array_name are considered as one single connection to that node.
+    Get the hosts zoned to any target port of an array node.
     
     Args:
-        host_wwpn (str): The WWPN of the host/initiator to check
+        node_name (str): Array node name, e.g. "S4256-node0"
         
     Returns:
-        dict: Dictionary containing connectivity analysis results
+        list: Initiator WWPNs zoned to at least one port of the node
     """
-    global host_mapping, target_arrays, target_ports
+    return node_hosts.get(node_name, [])
+
+@stats.timed()
+def compute_hosts_connectivity(host_wwpns=None):
+    """
+    Compute the array node coverage of many hosts in one batch.
     
-    print(f"\n=== Checking Host Node Connectivity for {host_wwpn} ===")
+    Array membership of every zoned array node, the expected node count of
+    every array and the fabric component of every zoned target are looked
+    up once, so each host costs one pass over its entries in host_nodes.
+    A target has a fabric path from a host when both are in the same
+    fabric component.
     
-    # Check if host exists in host_mapping
-    if host_wwpn not in host_mapping:
-        print(f"Host {host_wwpn} not found in host_mapping dictionary")
-        return {"error": "Host not found in mapping"}
-        
-    # Make sure host is properly connected to fabric
-    host_port = get_port_by_wwpn(host_wwpn)
-    if not host_port or not host_port.is_connected():
-        print(f"Warning: Host {host_wwpn} is not connected to any switch")
-        # Continue anyway since we're checking zoning, not physical connectivity
-    
-    # Get the target WWPNs this host is mapped to
-    mapped_targets = host_mapping[host_wwpn]
-    print(f"Host {host_wwpn} is mapped to {len(mapped_targets)} target(s):")
-    for target in mapped_targets:
-        print(f"  - {target}")
-    
-    # Group targets by array (based on array_name)
-    arrays_connectivity = {}
-    
-    for target_wwpn in mapped_targets:
-        # Get the target port object
-        target_port = get_port_by_wwpn(target_wwpn)
+    Args:
+        host_wwpns (iterable): Hosts to evaluate, defaults to every host in host_mapping
         
-        if target_port and hasattr(target_port, 'array_name'):
-            array_name = target_port.array_name
-            
-            # Extract the base array name (remove node suffix)
-            # For example: "S4256-node0" -> "S4256"
-            base_array_name = array_name.split('-node')[0] if '-node' in array_name else array_name
-            
-            if base_array_name not in arrays_connectivity:
-                arrays_connectivity[base_array_name] = {
-                    'connected_nodes': set(),  # Use set to track unique node names
-                    'connected_targets': [],   # Keep list for detailed reporting
-                    'expected_nodes': 0,
-                    'array_info': None
+    Returns:
+        list: One row per host and zoned array, as dicts with the keys
+              host_wwpn, array_name, expected_nodes, connected_nodes, reachable_nodes,
+              connected_node_names, zoned_targets, targets_without_path,
+              is_fully_connected and connectivity_percentage
+    """
+    graph = get_fabric_graph()
+    
+    # Array of every zoned node, e.g. "S4256-node0" -> "S4256"
+    node_array = {node_name: node_name.split('-node')[0] for node_name in node_hosts}
+    expected_nodes = {target_array.name: target_array.node_count for target_array in target_arrays.values()}
+    target_component = {target_wwpn: graph.component_of(target_wwpn) for target_wwpn in target_hosts}
+    
+    rows = []
+    for host_wwpn in (host_mapping if host_wwpns is None else host_wwpns):
+        host_component = graph.component_of(host_wwpn)
+        host_rows = {}
+        for node_name, targets in host_nodes.get(host_wwpn, {}).items():
+            array_name = node_array[node_name]
+            row = host_rows.get(array_name)
+            if row is None:
+                row = host_rows[array_name] = {
+                    'host_wwpn': host_wwpn,
+                    'array_name': array_name,
+                    'expected_nodes': expected_nodes.get(array_name, 0),
+                    'connected_nodes': 0,
+                    'reachable_nodes': 0,
+                    'connected_node_names': [],
+                    'zoned_targets': 0,
+                    'targets_without_path': 0,
                 }
-            
-            # Add the full array_name (including node) to the set of connected nodes
-            arrays_connectivity[base_array_name]['connected_nodes'].add(array_name)
-            
-            # Also add to the detailed list for reporting
-            arrays_connectivity[base_array_name]['connected_targets'].append({
-                'wwpn': target_wwpn,
-                'array_name': array_name,
-                'port_id': getattr(target_port, 'port_id', 'Unknown')
-            })
-    
-    # Get expected node counts from target_arrays
-    for wwnn, target_array in target_arrays.items():
-        array_name = target_array.name
-        if array_name in arrays_connectivity:
-            arrays_connectivity[array_name]['expected_nodes'] = target_array.node_count
-            arrays_connectivity[array_name]['array_info'] = target_array
-    
-    # Analyze connectivity for each array
-    connectivity_results = {}
-    
-    print(f"\n=== Connectivity Analysis ===")
+            without_path = 0
+            if host_component is None:
+                without_path = len(targets)
+            else:
+                for target_wwpn in targets:
+                    if target_component[target_wwpn] != host_component:
+                        without_path += 1
+            row['connected_nodes'] += 1
+            row['reachable_nodes'] += without_path < len(targets)
+            row['connected_node_names'].append(node_name)
+            row['zoned_targets'] += len(targets)
+            row['targets_without_path'] += without_path
+        
+        for row in host_rows.values():
+            expected = row['expected_nodes']
+            row['is_fully_connected'] = row['connected_nodes'] == expected
+            row['connectivity_percentage'] = row['connected_nodes'] / expected * 100 if expected > 0 else 0
+            rows.append(row)
+    
+    stats.count("hosts_evaluated", len(host_mapping) if host_wwpns is None else len(host_wwpns))
+    return rows
+
+def summarize_hosts_connectivity(rows):
+    """
+    Roll a host coverage table up to one summary per host.
     
-    for array_name, connectivity_info in arrays_connectivity.items():
-        # Count unique nodes (not ports)
-        connected_node_count = len(connectivity_info['connected_nodes'])
-        expected_count = connectivity_info['expected_nodes']
-        
-        is_fully_connected = connected_node_count == expected_count
-        connectivity_percentage = (connected_node_count / expected_count * 100) if expected_count > 0 else 0
-        
-        connectivity_results[array_name] = {
-            'array_name': array_name,
-            'connected_nodes': connected_node_count,
-            'expected_nodes': expected_count,
-            'is_fully_connected': is_fully_connected,
-            'connectivity_percentage': connectivity_percentage,
-            'connected_targets': connectivity_info['connected_targets'],
-            'connected_node_names': list(connectivity_info['connected_nodes']),
-            'array_info': connectivity_info['array_info']
-        }
-        
-        print(f"\nArray: {array_name}")
-        print(f"  Expected nodes: {expected_count}")
-        print(f"  Connected nodes: {connected_node_count}")
-        print(f"  Connectivity: {connectivity_percentage:.1f}%")
-        print(f"  Status: {'✓ FULLY CONNECTED' if is_fully_connected else '✗ PARTIAL CONNECTION'}")
-        
-        if not is_fully_connected:
-            missing_nodes = expected_count - connected_node_count
-            print(f"  Missing connections: {missing_nodes} node(s)")
-        
-        print(f"  Connected nodes: {list(connectivity_info['connected_nodes'])}")
-        print(f"  Connected targets (by node):")
-        
-        # Group targets by node for better display
-        targets_by_node = {}
-        for target in connectivity_info['connected_targets']:
-            node_name = target['array_name']
-            if node_name not in targets_by_node:
-                targets_by_node[node_name] = []
-            targets_by_node[node_name].append(target)
+    Args:
+        rows (list): Rows returned by compute_hosts_connectivity
         
-        for node_name, targets in targets_by_node.items():
-            print(f"    Node {node_name}: {len(targets)} port(s)")
-            for target in targets:
-                print(f"      - {target['wwpn']} (Port: {target['port_id']})")
-    
-    # Overall summary
-    total_arrays = len(connectivity_results)
-    fully_connected_arrays = sum(1 for result in connectivity_results.values() if result['is_fully_connected'])
-    
-    print(f"\n=== Overall Summary ===")
-    print(f"Host: {host_wwpn}")
-    print(f"Total arrays analyzed: {total_arrays}")
-    print(f"Fully connected arrays: {fully_connected_arrays}")
-    print(f"Partially connected arrays: {total_arrays - fully_connected_arrays}")
-    
-    if total_arrays > 0:
-        overall_percentage = (fully_connected_arrays / total_arrays * 100)
-        print(f"Overall connectivity: {overall_percentage:.1f}%")
+    Returns:
+        dict: {host_wwpn: {'total_arrays', 'fully_connected', 'partially_connected', 'overall_percentage'}}
+    """
+    summaries = {}
+    for row in rows:
+        summary = summaries.get(row['host_wwpn'])
+        if summary is None:
+            summary = summaries[row['host_wwpn']] = {'total_arrays': 0, 'fully_connected': 0,
+                                                     'partially_connected': 0, 'overall_percentage': 0}
+        summary['total_arrays'] += 1
+        if row['is_fully_connected']:
+            summary['fully_connected'] += 1
+        else:
+            summary['partially_connected'] += 1
     
-    return {
-        'host_wwpn': host_wwpn,
-        'arrays': connectivity_results,
-        'summary': {
-            'total_arrays': total_arrays,
-            'fully_connected': fully_connected_arrays,
-            'partially_connected': total_arrays - fully_connected_arrays,
-            'overall_percentage': overall_percentage if total_arrays > 0 else 0
-        }
-    }
+    for summary in summaries.values():
+        summary['overall_percentage'] = summary['fully_connected'] / summary['total_arrays'] * 100
+    return summaries
 
+@stats.timed()
 def check_all_hosts_connectivity():
     """
-    Check connectivity for all hosts in the host_mapping dictionary.
-    """
-    global host_mapping
+    Check connectivity for all hosts in the host_mapping dictionary and
+    print the per-array report of every host followed by a summary report.
     
+    Returns:
+        list: The host coverage table from compute_hosts_connectivity
+    """
     print("\n" + "="*80)
     print("                    ALL HOSTS CONNECTIVITY CHECK")
     print("="*80)
@@ -2642,32 +1917,53 @@ def check_all_hosts_connectivity():
         print("No host mappings found. Run build_host_mapping() first.")
         return
     
-    all_results = {}
+    rows = compute_hosts_connectivity()
     
-    for host_wwpn in host_mapping.keys():
+    rows_by_host = {}
+    for row in rows:
+        rows_by_host.setdefault(row['host_wwpn'], []).append(row)
+    
+    # Per-host report, one block per zoned array
+    for host_wwpn in host_mapping:
         print(f"\n{'-'*60}")
-        result = check_host_node_connectivity(host_wwpn)
-        all_results[host_wwpn] = result
+        print(f"\n=== Checking Host Node Connectivity for {host_wwpn} ===")
+        print(f"Host {host_wwpn} is mapped to {len(host_mapping[host_wwpn])} target(s)")
+        
+        for row in rows_by_host.get(host_wwpn, []):
+            print(f"\nArray: {row['array_name']}")
+            print(f"  Expected nodes: {row['expected_nodes']}")
+            print(f"  Connected nodes: {row['connected_nodes']}")
+            print(f"  Connectivity: {row['connectivity_percentage']:.1f}%")
+            print(f"  Status: {'✓ FULLY CONNECTED' if row['is_fully_connected'] else '✗ PARTIAL CONNECTION'}")
+            
+            if not row['is_fully_connected']:
+                missing_nodes = row['expected_nodes'] - row['connected_nodes']
+                print(f"  Missing connections: {missing_nodes} node(s)")
+            
+            print(f"  Connected nodes: {row['connected_node_names']}")
+            if row['targets_without_path']:
+                print(f"  Targets without fabric path: {row['targets_without_path']} of {row['zoned_targets']}")
     
     # Summary report
     print(f"\n" + "="*80)
     print("                    CONNECTIVITY SUMMARY REPORT")
     print("="*80)
     
-    for host_wwpn, result in all_results.items():
-        if 'error' not in result:
-            summary = result['summary']
-            print(f"\nHost: {host_wwpn}")
-            print(f"  Arrays: {summary['total_arrays']}")
-            print(f"  Fully Connected: {summary['fully_connected']}")
-            print(f"  Partially Connected: {summary['partially_connected']}")
-            print(f"  Overall: {summary['overall_percentage']:.1f}%")
-    
-    return all_results
+    summaries = summarize_hosts_connectivity(rows)
+    for host_wwpn in host_mapping:
+        summary = summaries.get(host_wwpn, {'total_arrays': 0, 'fully_connected': 0,
+                                            'partially_connected': 0, 'overall_percentage': 0})
+        print(f"\nHost: {host_wwpn}")
+        print(f"  Arrays: {summary['total_arrays']}")
+        print(f"  Fully Connected: {summary['fully_connected']}")
+        print(f"  Partially Connected: {summary['partially_connected']}")
+        print(f"  Overall: {summary['overall_percentage']:.1f}%")
+    
+    return rows
 
 def get_port_by_wwpn(wwpn):
     """
-    Get port object by WWPN from all indexes and dictionaries.
+    Get port object by WWPN from the port registry.
     
     Args:
         wwpn (str): The WWPN to search for
@@ -2675,17 +1971,7 @@ def get_port_by_wwpn(wwpn):
     Returns:
         Port object or None if not found
     """
-    # Check in the global index dictionaries first
-    port = initiator_index.get(wwpn) or target_index.get(wwpn) or switch_index.get(wwpn)
-    
-    if port:
-        return port
-    
-    # Check in the individual port dictionaries
-    port = target_ports.get(wwpn) or host_ports.get(wwpn) or switch_ports.get(wwpn)
-    
-    return port
-
+    return port_registry.get(wwpn)
 
 def run_interactive_cli():
     """Main interactive CLI loop."""
@@ -2697,10 +1983,11 @@ def run_interactive_cli():
     while True:
         try:
             display_menu()
-            choice = input("\nEnter your choice (0-5): ").strip()
+            choice = input("\nEnter your choice (0-7): ").strip()
             
             if choice == '1':
                 show_system_information()
+                display_target_arrays()
             elif choice == '2':
                 interactive_check_connectivity()
             elif choice == '3':
@@ -2711,12 +1998,14 @@ def run_interactive_cli():
                 check_all_hosts_connectivity()
             elif choice == '6':
                 show_help()
+            elif choice in ('7', 'stats'):
+                show_statistics()
             elif choice == '0':
                 print("\nThank you for using FC SAN Fabric Management System!")
                 print("Exiting...")
                 break
             else:
-                print("Invalid choice. Please select from: 0, 1, 2, 3, 4, 5.")
+                print("Invalid choice. Please select from: 0, 1, 2, 3, 4, 5, 6, 7.")
             
             input("\nPress Enter to continue...")
             
@@ -2744,37 +2033,181 @@ def display_menu():
     print("4. Check ISL oversubscription")
     print("5. Check host connectivity")
     print("6. Help")
+    print("7. Show statistics")
     print("0. Exit")
     print("-" * 50)
 
-if __name__ == "__main__":
+def build_fabric_model(file_path="output 1.txt"):
+    """
+    Parse a capture and build the full fabric model from it.
     
-    parse_showsys_output()
-    print("Parsing showport, showhost, showportdev, and zoning output...")
-    created_ports = parse_showport_output()
-
-    # Parse node information and create TargetNode objects
-    parse_node_information()
+    Returns:
+        dict: Parser state from parse_capture(), with the created Port objects under "ports"
+    """
+    # Parse showsys, showport, showhost, showportdev, zoning and node information in one pass
+    log.info("Parsing showsys, showport, showhost, showportdev, zoning and node information output...")
+    state = parse_capture(file_path)
+    
+    link_fabric_model()
+    
+    return state
 
+def link_fabric_model():
+    """
+    Connect the parsed ports and build the fabric graph and host mapping.
+    
+    Runs after the ports, zones and nodes of one or more captures are in the
+    global tables.
+    """
     # Establish switch connections
     establish_switch_connections()
     
     # Connect switches internally for proper path finding
     connect_switches_internally()
 
+    # Build the fabric graph once; path queries reuse it until the topology changes
+    get_fabric_graph()
+
     # Debug zoning info
     debug_zoning_info()
     
     build_host_mapping()
 
+def reset_fabric_model():
+    """Empty the global port registry, zoning and node tables and drop the fabric graph."""
+    global fabric_graph
+    
+    port_registry.clear()
+    fabric_edges.clear()
+    zone_db.clear()
+    for table in (switch_port_groups, host_mapping, target_hosts, host_nodes, node_hosts,
+                  target_nodes, switch_nodes, initiator_nodes, target_arrays):
+        table.clear()
+    fabric_graph = None
+    port_class.mark_topology_changed()
+
+def load_captures(source, workers=None):
+    """
+    Build one fabric model from several captures, parsed in parallel.
+    
+    Args:
+        source (str): A capture file, a directory of captures, or a glob pattern
+        workers (int): Number of worker processes, defaults to the CPU count
+    
+    Returns:
+        int: Number of captures ingested, 0 if none matched
+    """
+    merged = ingest_captures(source, workers)
+    if merged is None:
+        return 0
+    
+    reset_fabric_model()
+    register_ports(merged["ports"])
+    fabric_edges.restore(merged["edges"])
+    index_switch_ports()
+    for name, members in merged["zones"]:
+        zone_db.add(name, members)
+    for name in ("target_arrays", "target_nodes", "switch_nodes", "initiator_nodes"):
+        globals()[name].update(merged[name])
+    
+    link_fabric_model()
+    return len(merged["captures"])
+
+def snapshot_fabric_model():
+    """Return the built fabric model as one picklable object."""
+    return {
+        "port_registry": port_registry,
+        "fabric_edges": fabric_edges,
+        "zone_db": zone_db,
+        "switch_port_groups": switch_port_groups,
+        "host_mapping": host_mapping,
+        "target_hosts": target_hosts,
+        "host_nodes": host_nodes,
+        "node_hosts": node_hosts,
+        "target_nodes": target_nodes,
+        "switch_nodes": switch_nodes,
+        "initiator_nodes": initiator_nodes,
+        "target_arrays": target_arrays,
+        "fabric_graph": fabric_graph,
+    }
+
+def restore_fabric_model(model):
+    """
+    Install a fabric model loaded from a snapshot.
+    
+    Global dictionaries are refilled in place, since other modules and
+    aliases hold references to them.
+    """
+    global fabric_graph
+    
+    port_registry.restore(model["port_registry"])
+    fabric_edges.restore(model["fabric_edges"])
+    zone_db.restore(model["zone_db"])
+    for name in ("switch_port_groups", "host_mapping", "target_hosts", "host_nodes", "node_hosts",
+                 "target_nodes", "switch_nodes", "initiator_nodes", "target_arrays"):
+        table = globals()[name]
+        table.clear()
+        table.update(model[name])
+    
+    # The restored graph matches the restored ports, so it is current
+    port_class.mark_topology_changed()
+    fabric_graph = model["fabric_graph"]
+    if fabric_graph is not None:
+        fabric_graph.topology_version = port_class.topology_version
+
+def load_fabric(file_path="output 1.txt", use_cache=True):
+    """
+    Load the fabric model for a capture, from its snapshot when one exists.
+    
+    On a cache miss the model is built from the capture and a snapshot is
+    written for the next run. Snapshots are keyed by the capture's content
+    hash and the parser version, so an edited capture or a parser change
+    always triggers a rebuild.
+    
+    Args:
+        file_path (str): Path to the capture file
+        use_cache (bool): Whether to read and write the snapshot cache
+    """
+    if use_cache and os.path.exists(file_path):
+        with stats.phase("load_snapshot"):
+            model = load_snapshot(file_path)
+            if model is not None:
+                restore_fabric_model(model)
+        if model is not None:
+            log.info("Loaded fabric snapshot for %s: %d ports, %d zones",
+                     file_path, len(port_registry), len(all_zones))
+            return
+    
+    state = build_fabric_model(file_path)
+    
+    # A capture that failed to parse is not cached, so the next run reports the error again
+    if use_cache and os.path.exists(file_path) and not state["parse_error"]:
+        with stats.phase("save_snapshot"):
+            save_snapshot(file_path, snapshot_fabric_model())
+
+if __name__ == "__main__":
+    
+    profile = "--profile" in sys.argv[1:]
+    configure_logging(verbosity_from_args(sys.argv[1:]))
+    
+    # --captures SOURCE loads every capture in a directory or glob instead of the default capture
+    if "--captures" in sys.argv[1:-1]:
+        load_captures(sys.argv[sys.argv.index("--captures") + 1])
+    else:
+        load_fabric("output 1.txt", use_cache="--no-cache" not in sys.argv[1:])
+    if profile:
+        show_statistics()
+
     run_interactive_cli()
+    if profile:
+        show_statistics()
 
     '''
     print(f"\nTotal ports created: {len(created_ports)}")
     print(f"Target ports dictionary size: {len(target_ports)}")
     print(f"Host ports dictionary size: {len(host_ports)}")
     print(f"Switch ports dictionary size: {len(switch_ports)}")
-    print(f"Zoning info dictionary size: {len(zoning_info)}")
+    print(f"Zone database size: {len(zone_db)}")
     print(f"Target nodes dictionary size: {len(target_nodes)}")
     
     # Show all registered ports
@@ -2820,10 +2253,10 @@ if __name__ == "__main__":
     for name, node in switch_nodes.items():
         print(f"Name: {name} -> {node}")
     
-    # Display zoning_info dictionary
-    print("\n=== Zoning Info Dictionary ===")
-    for wwpn, zone_members in zoning_info.items():
-        print(f"WWPN: {wwpn} -> Zone: {zone_members}")
+    # Display zone database
+    print("\n=== Zone Database ===")
+    for name, zone_members in zip(zone_db.names, zone_db.members):
+        print(f"Zone: {name} -> Members: {zone_members}")
     
     '''
 
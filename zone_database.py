@@ -0,0 +1,120 @@
+from port_class import PortRegistry
+
+
+class ZoneDatabase:
+    """
+    Zones of a fabric with an inverted index from WWPN to zone.
+
+    Zones get dense IDs in the order they are added. For each zone the
+    database keeps its name (from the "zone <name>:" line), its members in
+    capture order and its member set. The inverted index maps a WWPN to the
+    IDs of every zone it belongs to, so zone queries cost the size of their
+    result. Whether two WWPNs share a zone is checked by walking the shorter
+    of their zone lists against the member sets of those zones, so pair
+    queries cost the zone count of the less zoned WWPN and nothing is stored
+    per pair of zone and WWPN beyond the index itself. WWPNs are keyed like
+    the port registry, so lookups are independent of case and colon formatting.
+    """
+
+    __slots__ = ('names', 'members', 'member_sets', 'zone_ids', 'ids_by_name')
+
+    def __init__(self):
+        """Initialize an empty ZoneDatabase instance."""
+        self.names = []         # zone ID -> zone name
+        self.members = []       # zone ID -> list of member WWPNs, as written in the capture
+        self.member_sets = []   # zone ID -> frozenset of member keys
+        self.zone_ids = {}      # member key -> list of zone IDs
+        self.ids_by_name = {}   # zone name -> ID of the first zone with that name
+
+    def __len__(self):
+        return len(self.members)
+
+    def add(self, name, members):
+        """
+        Add a zone.
+
+        Args:
+            name (str): Zone name, or None to name it after its ID
+            members (list): Member WWPNs of the zone
+
+        Returns:
+            int: ID of the new zone
+        """
+        zone_id = len(self.members)
+        if not name:
+            name = f"zone_{zone_id}"
+        keys = frozenset(PortRegistry.key(wwpn) for wwpn in members)
+
+        self.names.append(name)
+        self.members.append(list(members))
+        self.member_sets.append(keys)
+        self.ids_by_name.setdefault(name, zone_id)
+        for key in keys:
+            self.zone_ids.setdefault(key, []).append(zone_id)
+        return zone_id
+
+    def clear(self):
+        """Remove all zones, keeping the table objects."""
+        for name in self.__slots__:
+            getattr(self, name).clear()
+
+    def restore(self, other):
+        """
+        Replace the contents of this database with those of another one.
+
+        The tables are refilled in place, so module-level references to them
+        stay valid (used when loading a cached snapshot).
+        """
+        for name in self.__slots__:
+            table = getattr(self, name)
+            table.clear()
+            if isinstance(table, list):
+                table.extend(getattr(other, name))
+            else:
+                table.update(getattr(other, name))
+
+    def zones_of(self, wwpn):
+        """Return the IDs of all zones containing a WWPN, in zone order."""
+        return self.zone_ids.get(PortRegistry.key(wwpn), [])
+
+    def _shared_candidates(self, wwpn, other_wwpn):
+        """Return the shorter zone ID list of two WWPNs and the key of the other WWPN."""
+        key = PortRegistry.key(wwpn)
+        other_key = PortRegistry.key(other_wwpn)
+        ids = self.zone_ids.get(key, [])
+        other_ids = self.zone_ids.get(other_key, [])
+        if len(other_ids) < len(ids):
+            return other_ids, key
+        return ids, other_key
+
+    def shares_zone(self, wwpn, other_wwpn):
+        """Return True if two WWPNs are members of at least one common zone."""
+        ids, other_key = self._shared_candidates(wwpn, other_wwpn)
+        return any(other_key in self.member_sets[zone_id] for zone_id in ids)
+
+    def common_zones(self, wwpn, other_wwpn):
+        """Return the IDs of the zones containing both WWPNs, in zone order."""
+        ids, other_key = self._shared_candidates(wwpn, other_wwpn)
+        return [zone_id for zone_id in ids if other_key in self.member_sets[zone_id]]
+
+    def zone_named(self, name):
+        """Return the ID of the first zone with a name, or None."""
+        return self.ids_by_name.get(name)
+
+    def zoned_with(self, wwpn):
+        """
+        Return every WWPN that shares a zone with a WWPN.
+
+        Returns:
+            list: Member WWPNs of the WWPN's zones, each once, in zone order, excluding the WWPN itself
+        """
+        own_key = PortRegistry.key(wwpn)
+        seen = {own_key}
+        peers = []
+        for zone_id in self.zone_ids.get(own_key, ()):
+            for member in self.members[zone_id]:
+                key = PortRegistry.key(member)
+                if key not in seen:
+                    seen.add(key)
+                    peers.append(member)
+        return peers